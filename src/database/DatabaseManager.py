@@ -83,6 +83,8 @@ class DatabaseManager:
                     "PositionCoord": object_item.PositionCoord,
                     "ContID": object_item.ContID,
                     "PhotoPath": object_item.PhotoPath,
+                    "CamID": object_item.CamID,
+                    "TrackID": object_item.TrackID,
                 },
                 "Container": {
                     "ContID": container_item.ContID if container_item else None,
@@ -101,26 +103,38 @@ class DatabaseManager:
             if conn:
                 conn.close()
 
-    def get_all_objects(self) -> Optional[List[Dict[str, Any]]]:
+    def get_all_objects(self, cam_id: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Находит последние записи одной камеры (все объекты одного кадра).
+
+        Args:
+            cam_id: Идентификатор камеры; по умолчанию камера самой последней записи.
+
+        Returns:
+            Список словарей с данными объектов или None, если записей нет.
+        """
         conn = None
         try:
             # Подключаемся к базе данных Objects
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
-            # Находим последние записи по времени (в пределах 1ой секунды)
+            # Находим последние записи по времени; камеры одного батча пишутся
+            # с одинаковым Time, поэтому записи отбираются по одной камере
             query = """
                 WITH lt AS (
-                    SELECT Time
+                    SELECT Time, CamID
                     FROM Objects
+                    WHERE ? IS NULL OR CamID = ?
                     ORDER BY Time DESC
                     LIMIT 1
                 )
                 SELECT *
                 FROM Objects
-                WHERE Time = (SELECT Time FROM lt);
+                WHERE Time = (SELECT Time FROM lt)
+                  AND CamID = (SELECT CamID FROM lt);
 
             """
-            cursor.execute(query)
+            cursor.execute(query, (cam_id, cam_id))
             object_row = cursor.fetchall()
 
             if not object_row:
@@ -139,6 +153,8 @@ class DatabaseManager:
                     "PositionCoord": object_item.PositionCoord,
                     "ContID": object_item.ContID,
                     "PhotoPath": object_item.PhotoPath,
+                    "CamID": object_item.CamID,
+                    "TrackID": object_item.TrackID,
                 },
             } for object_item in object_items]
 
@@ -151,6 +167,29 @@ class DatabaseManager:
             if conn:
                 conn.close()
 
+    def get_max_track_id(self) -> Optional[int]:
+        """
+        Находит наибольший сохраненный TrackID, чтобы трекер продолжил нумерацию
+        после предыдущего запуска.
+
+        Returns:
+            Наибольший TrackID или None, если записей с TrackID нет.
+        """
+        conn = None
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute("SELECT MAX(TrackID) FROM Objects")
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            return None
+        finally:
+            if conn:
+                conn.close()
+
     def push_objects(self, item: ObjectItem):
         try:
             self.lock.acquire()
@@ -15,17 +15,29 @@ class Objects:
                 PositionCoord TEXT NOT NULL,
                 ContID INTEGER NOT NULL,
                 PhotoPath TEXT NOT NULL,
+                CamID TEXT NOT NULL DEFAULT '0',
+                TrackID INTEGER,
                 FOREIGN KEY (ContID) REFERENCES Containers(ContID)
             )
         '''
         self.connection.execute(query)
+
+        # Databases created before multi-camera support lack the CamID column
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(Objects)")]
+        if "CamID" not in columns:
+            self.connection.execute(
+                "ALTER TABLE Objects ADD COLUMN CamID TEXT NOT NULL DEFAULT '0'")
+        # Track ids were added with the object tracker
+        if "TrackID" not in columns:
+            self.connection.execute("ALTER TABLE Objects ADD COLUMN TrackID INTEGER")
         self.connection.commit()
 
     def create(self, item: ObjectItem) -> int:
-        query = "INSERT INTO Objects (Name, Time, PositionCoord, ContID, PhotoPath) VALUES (?, ?, ?, ?, ?)"
+        query = "INSERT INTO Objects (Name, Time, PositionCoord, ContID, PhotoPath, CamID, TrackID) VALUES (?, ?, ?, ?, ?, ?, ?)"
         cursor = self.connection.cursor()
         cursor.execute(query, (item.Name, item.Time,
-                       item.PositionCoord, item.ContID, item.PhotoPath))  # Исправлено здесь
+                       item.PositionCoord, item.ContID, item.PhotoPath,
+                       item.CamID, item.TrackID))  # Исправлено здесь
         self.connection.commit()
         return cursor.lastrowid
 
@@ -36,11 +48,14 @@ class Objects:
         row = cursor.fetchone()
         # Добавляем ObjrecID в создание ObjectItem
         return ObjectItem(
+            ObjrecID=row[0],
             Name=row[1],
             Time=row[2],
             PositionCoord=row[3],
             PhotoPath=row[5],
-            ContID=row[4]
+            ContID=row[4],
+            CamID=row[6],
+            TrackID=row[7]
         ) if row else None
 
     def delete(self, obj_id: int) -> bool:
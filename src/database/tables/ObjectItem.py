@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional
 
 
 @dataclass
@@ -9,3 +10,5 @@ class ObjectItem:
     PositionCoord: str
     ContID: int
     PhotoPath: str
+    CamID: str = "0"
+    TrackID: Optional[int] = None
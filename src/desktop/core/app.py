@@ -1,3 +1,4 @@
+from PySide6.QtCore import Signal
 from PySide6.QtWidgets import QMainWindow
 from ..ui.ui_main import Ui_MainWindow
 from .home_screen import HomeScreen
@@ -20,7 +21,12 @@ class ApplicationWindow(QMainWindow):
         cur_screen (str): The current active screen name.
         runner_status (int): A status flag for the runner (default: 0).
         screens (dict): A dictionary of all initialized screen objects.
+        model_view_changed (Signal): Emitted with True when annotated frames
+            become visible (video screen with the model checkbox ticked) and
+            with False when they are hidden.
     """
+    model_view_changed = Signal(bool)
+
     def __init__(self):
         super().__init__()
         self.ui = Ui_MainWindow()
@@ -44,6 +50,7 @@ class ApplicationWindow(QMainWindow):
             lambda: self.show_screen('model'))
         self.ui.videoPlaybackButton_2.clicked.connect(
             lambda: self.show_screen('video'))
+        self.ui.CheckBoxModel.stateChanged.connect(self._notify_model_view)
 
         # Show the home screen by default
         self.show_screen('home')
@@ -70,6 +77,20 @@ class ApplicationWindow(QMainWindow):
         logging.debug(f"Switched to screen: {screen_name}")
         self.ui.stackedWidget.setCurrentWidget(screen_map[screen_name])
         self.cur_screen = screen_name
+        self._notify_model_view()
+
+    def is_model_view_visible(self):
+        """
+        Checks whether annotated frames are on screen.
+
+        Returns:
+            bool: True if the video screen is shown with the model checkbox ticked.
+        """
+        return self.cur_screen == 'video' and self.ui.CheckBoxModel.isChecked()
+
+    def _notify_model_view(self):
+        """Emits model_view_changed with the current visibility of annotated frames."""
+        self.model_view_changed.emit(self.is_model_view_visible())
 
     def update_frame(self, image1, image2, error_msg=None):
         """
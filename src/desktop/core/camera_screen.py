@@ -1,11 +1,11 @@
 import json
-import os
 import re
 from pathlib import Path
 from typing import Dict, Tuple
 from PySide6.QtWidgets import QMessageBox
 from PySide6.QtCore import QObject, Signal, QEvent
 from utils.camera_settings_validator import CameraSettingsValidator
+from utils.settings_file import merge_settings_file
 
 """
 Camera Settings Module
@@ -206,6 +206,4 @@ class CameraScreen(QObject):
     def save_settings(self, settings: Dict[str, str]):
         """Saves the settings to a JSON file"""
         self.window.update_frame(None, None, "Loading video")
-        os.makedirs(self.SETTINGS_PATH.parent, exist_ok=True)
-        with open(self.SETTINGS_PATH, 'w', encoding='utf-8') as f:
-            json.dump(settings, f, ensure_ascii=False, indent=4)
\ No newline at end of file
+        merge_settings_file(self.SETTINGS_PATH, settings)
\ No newline at end of file
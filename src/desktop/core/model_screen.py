@@ -5,6 +5,7 @@ from typing import Dict, Tuple
 from PySide6.QtWidgets import QMessageBox, QFileDialog
 
 from utils.model_settings_validator import ModelSettingsValidator
+from utils.settings_file import merge_settings_file
 
 
 class ModelScreen:
@@ -271,9 +272,7 @@ class ModelScreen:
             settings (Dict): The settings to save.
         """
         self.window.update_frame(None, None, "Loading video")
-        os.makedirs(self.SETTINGS_PATH.parent, exist_ok=True)
-        with open(self.SETTINGS_PATH, 'w', encoding='utf-8') as f:
-            json.dump(settings, f, ensure_ascii=False, indent=4)
+        merge_settings_file(self.SETTINGS_PATH, settings)
 
     def load_settings(self):
         """
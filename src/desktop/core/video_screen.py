@@ -28,7 +28,7 @@ class VideoScreen:
         is_running (bool): Flag indicating if video capture is running.
         current_image1 (QImage): Stores the primary video frame.
         current_image2 (QImage): Stores the processed/model video frame.
-        current_pixmap (QPixmap): Current pixmap being displayed.
+        current_pixmap (QPixmap): Current pixmap being displayed (scaled to the label).
     """
 
     SETTINGS_PATH = Path(__file__).parent.parent.parent.parent / \
@@ -90,13 +90,8 @@ class VideoScreen:
         Args:
             event: The resize event.
         """
-        if self.current_pixmap:
-            scaled_pixmap = self.current_pixmap.scaled(
-                self.ui.video_label.size(),
-                Qt.KeepAspectRatio,
-                Qt.SmoothTransformation
-            )
-            self.ui.video_label.setPixmap(scaled_pixmap)
+        if self.current_image1 is not None:
+            self._update_displayed_image()
         event.accept()
 
     def update_frame(self, image1, image2, error_msg=None):
@@ -148,10 +143,11 @@ class VideoScreen:
         use_model_view = self.ui.CheckBoxModel.isChecked()
         image_to_show = self.current_image2 if (use_model_view and self.current_image2) else self.current_image1
 
-        self.current_pixmap = QPixmap.fromImage(image_to_show)
-        scaled_pixmap = self.current_pixmap.scaled(
+        # Scale the frame first, so only the displayed pixels are converted to a pixmap
+        scaled_image = image_to_show.scaled(
             self.ui.video_label.size(),
             Qt.KeepAspectRatio,
             Qt.SmoothTransformation
         )
-        self.ui.video_label.setPixmap(scaled_pixmap)
+        self.current_pixmap = QPixmap.fromImage(scaled_image)
+        self.ui.video_label.setPixmap(self.current_pixmap)
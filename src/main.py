@@ -1,4 +1,5 @@
 import logging
+import multiprocessing
 import sys
 from time import sleep, time
 from threading import Thread
@@ -8,6 +9,7 @@ from PySide6.QtCore import QObject, Signal, QTimer
 
 from desktop.core.app import ApplicationWindow
 from model.model_manager import ModelManager
+from model.tracker import TRACK_IDS
 from database.DatabaseManager import DatabaseManager
 from server.server import run_server
 
@@ -21,7 +23,10 @@ root_logger.addHandler(console_handler)
 
 class ModelThreadController(QObject):
     """Handles the model and database operations in a separate thread."""
-    
+
+    # Seconds between two logs of the processing counters
+    STATS_LOG_INTERVAL = 30.0
+
     update_signal = Signal(object, object, object)
     finished = Signal()
 
@@ -31,7 +36,8 @@ class ModelThreadController(QObject):
         self.app = app
         self.window = window
         self.db_manager = db_manager
-        self.model_manager = ModelManager()
+        # The detector is loaded (and benchmarked for "auto") on the model thread, see run()
+        self.model_manager = ModelManager(connect=False)
         self._running = True
         self._last_error_time = None  # Track when error first appeared
 
@@ -57,26 +63,62 @@ class ModelThreadController(QObject):
             except Exception as e:
                 root_logger.error(f"Error pushing to database: {e}")
 
+    def log_stats(self, use_pipeline):
+        """
+        Logs the analysis rate, the frame counters (drops and staleness) of
+        every camera, and the counters of the detector cache, the cascade and
+        the snapshot writer.
+        """
+        root_logger.info(f"Analysis rate: {self.model_manager.get_rate_stats()}")
+        if use_pipeline:
+            root_logger.info(f"Pipeline stats: {self.model_manager.get_pipeline_stats()}")
+        for camera_id, stats in self.model_manager.get_frame_stats().items():
+            root_logger.info(f"Camera {camera_id} frames: {stats}")
+        root_logger.info(f"Model cache: {self.model_manager.get_model_cache_stats()}")
+        cascade_stats = self.model_manager.get_cascade_stats()
+        if cascade_stats is not None:
+            root_logger.info(f"Cascade: {cascade_stats}")
+        root_logger.info(f"Snapshots: {self.model_manager.get_snapshot_stats()}")
+
     def run(self):
         """Run the model processing loop, handle settings, and communicate with the main thread."""
-        st = self.model_manager._get_settings()
-        target_fps = 20
-        if st and st.get("fps"):
-            target_fps = st["fps"]
-        print(target_fps)
+        # Track ids continue after the ones recorded by earlier sessions
+        TRACK_IDS.seed(self.db_manager.get_max_track_id())
+        self.model_manager.update_settings()
+        st = self.model_manager.get_settings()
+        use_pipeline = bool(st and st.get("pipeline"))
 
         last_settings_check = time()
         settings_check_interval = 1.0  # Check settings every 1 second
+        last_stats_log = time()
 
         try:
+            if use_pipeline:
+                # Collect, infer, render and persist run as overlapping stages
+                self.model_manager.start_pipeline(self.db_manager)
+
             while self._running and self.app.instance() is not None:
                 start_time = time()
 
-                # Process frame and send to database
-                self.model_manager.write_to_db(self.db_manager)
+                if start_time - last_stats_log >= self.STATS_LOG_INTERVAL:
+                    self.log_stats(use_pipeline)
+                    last_stats_log = start_time
+
+                if use_pipeline:
+                    # Forward every rendered frame; errors are forwarded at least once a second
+                    self.model_manager.wait_for_images(1.0)
+                else:
+                    # Process frame and send to database
+                    self.model_manager.write_to_db(self.db_manager)
                 frame, boxes = self.model_manager.get_images()
                 error_message = self.model_manager.get_error()
 
+                # Apply edited settings, e.g. new thresholds, without waiting for an error
+                if start_time - last_settings_check >= settings_check_interval:
+                    last_settings_check = start_time
+                    if self.model_manager.settings_changed():
+                        self.model_manager.update_settings()
+
                 # Handle error message persistence
                 if error_message:
                     current_time = time()
@@ -92,9 +134,11 @@ class ModelThreadController(QObject):
                 # Send signal with frame data to main thread
                 self.update_signal.emit(frame, boxes, error_message)
 
-                # Control FPS by adjusting the time spent processing each frame
-                processing_time = time() - start_time
-                remaining_time = (1.0 / target_fps) - processing_time
+                if use_pipeline:
+                    continue
+
+                # The scheduler adapts the rate to the processing time and CPU headroom
+                remaining_time = self.model_manager.scheduler.delay()
                 if remaining_time > 0:
                     sleep(remaining_time)
 
@@ -110,6 +154,9 @@ class ModelThreadController(QObject):
 
 
 if __name__ == '__main__':
+    # Needed for the capture processes of frozen (e.g. PyInstaller) builds
+    multiprocessing.freeze_support()
+
     # Initialize the application
     app = QApplication(sys.argv)
     window = ApplicationWindow()
@@ -121,6 +168,9 @@ if __name__ == '__main__':
     # Create the model controller and connect its signals to the window
     controller = ModelThreadController(app, window, db_manager)
     controller.update_signal.connect(window.update_frame)
+    # Boxes are only drawn while someone looks at the model view
+    window.model_view_changed.connect(controller.model_manager.set_model_view)
+    controller.model_manager.set_model_view(window.is_model_view_visible())
     
     window.show()
 
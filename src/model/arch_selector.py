@@ -0,0 +1,263 @@
+# arch_selector.py
+"""
+Picks the detector architecture for the "auto" value of the "model_arch" setting.
+
+Every candidate is benchmarked on this host against a local calibration clip
+and the most accurate one (by the COCO mAP of its weights) whose latency fits
+the "latency_budget_ms" setting is selected. Measurements are cached per host
+and clip, so later starts only repeat the selection, not the benchmark.
+
+Run from the src directory to see the measurements, e.g.:
+
+    python -m model.arch_selector --clip recording.mp4 --budget 80
+"""
+import argparse
+import json
+import os
+import platform
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+
+import torch
+
+from model.architectures import ARCHITECTURES, DEFAULT_ARCHITECTURE
+from model.backends import DEFAULT_EXPORT_DIR
+from model.benchmark import load_frames, measure_throughput
+from model.detector import Detector
+
+import logging
+from utils.logger import setup_logger
+setup_logger(__name__)
+
+
+BENCHMARK_FRAMES = 16
+CACHE_FILE = DEFAULT_EXPORT_DIR / "architecture_benchmarks.json"
+
+_lock = Lock()
+_measurements = {}
+_selections = {}
+
+
+def host_key():
+    """Identifies the host and the torch build the measurements are valid for."""
+    return (f"{platform.node()}|{platform.machine()}|{os.cpu_count()} cpus|"
+            f"torch {torch.__version__}|{torch.get_num_threads()} threads")
+
+
+def clip_key(clip):
+    """Identifies the calibration clip; a changed file invalidates its measurements."""
+    if not clip:
+        return "synthetic"
+    path = Path(clip)
+    stat = path.stat()
+    return f"{path.resolve()}|{stat.st_size}|{int(stat.st_mtime)}"
+
+
+def clip_settings(clip):
+    """Frame source settings of the calibration clip (synthetic frames without one)."""
+    if not clip:
+        return {"source_type": "synthetic", "source_resolution": [1280, 720], "source_seed": 0}
+    return {"source_type": "images" if os.path.isdir(clip) else "video", "source_path": clip}
+
+
+def load_cache(path=CACHE_FILE):
+    """
+    Reads the cached measurements.
+
+    Args:
+        path (Path): Cache file.
+
+    Returns:
+        dict: Measurements keyed by host, clip and variant; empty if there are none.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache, path=CACHE_FILE):
+    """Writes the measurements through a temporary file, so a crash never leaves a partial cache."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=4)
+    os.replace(tmp, path)
+
+
+def variant_key(name, settings):
+    """Cache key of an architecture on the configured backend and precision."""
+    return f"{name}|{settings.get('backend') or 'eager'}|{settings.get('precision') or 'fp32'}"
+
+
+def candidates(settings):
+    """Architectures that can run on the configured backend and precision."""
+    return [architecture for architecture in ARCHITECTURES.values()
+            if architecture.supports(settings.get("backend"), settings.get("precision"))]
+
+
+def benchmark_architecture(name, settings, frames):
+    """
+    Measures the per-frame latency of an architecture.
+
+    Args:
+        name (str): Architecture name.
+        settings (dict): Model settings (thresholds, backend, precision).
+        frames (list): HxWx3 uint8 RGB frames of the calibration clip.
+
+    Returns:
+        dict: ms_per_frame, box_map and the time of the measurement.
+    """
+    detector = Detector({**settings, "model_arch": name})
+
+    def predict(batch, size):
+        for frame in batch:
+            detector.predict([frame])
+
+    result = measure_throughput(predict, frames, 1)
+    return {
+        "ms_per_frame": result["ms_per_frame"],
+        "box_map": detector.architecture.box_map,
+        "measured": str(datetime.now()),
+    }
+
+
+def benchmark_architectures(settings, cache_path=CACHE_FILE):
+    """
+    Returns the measurements of all candidates, benchmarking the ones that are not cached yet.
+
+    Args:
+        settings (dict): Model settings with calibration_clip, backend and precision.
+        cache_path (Path): Cache file.
+
+    Returns:
+        dict: Measurements keyed by architecture name.
+    """
+    clip = settings.get("calibration_clip")
+    key = (str(cache_path), host_key(), clip_key(clip))
+    with _lock:
+        # The settings are re-read every second, keep the file out of that path
+        measurements = _measurements.get(key, {})
+        if any(variant_key(architecture.name, settings) not in measurements
+               for architecture in candidates(settings)):
+            cache = load_cache(cache_path)
+            measurements = cache.setdefault(key[1], {}).setdefault(key[2], {})
+            missing = [architecture.name for architecture in candidates(settings)
+                       if variant_key(architecture.name, settings) not in measurements]
+
+            if missing:
+                frames = load_frames(clip_settings(clip), BENCHMARK_FRAMES)
+                for name in missing:
+                    logging.info(f"Benchmarking {name} on {len(frames)} calibration frames")
+                    measurements[variant_key(name, settings)] = benchmark_architecture(
+                        name, settings, frames)
+                save_cache(cache, cache_path)
+            _measurements[key] = measurements
+
+        return {architecture.name: measurements[variant_key(architecture.name, settings)]
+                for architecture in candidates(settings)}
+
+
+def pick_architecture(measurements, latency_budget_ms):
+    """
+    Picks the most accurate architecture within the latency budget.
+
+    Args:
+        measurements (dict): See `benchmark_architectures()`.
+        latency_budget_ms (float): Per-frame latency budget.
+
+    Returns:
+        str: Architecture name; the fastest one if none fits the budget.
+    """
+    if not measurements:
+        return DEFAULT_ARCHITECTURE
+    fitting = [name for name, result in measurements.items()
+               if result["ms_per_frame"] <= latency_budget_ms]
+    if not fitting:
+        return min(measurements, key=lambda name: measurements[name]["ms_per_frame"])
+    return max(fitting, key=lambda name: measurements[name]["box_map"])
+
+
+def select_architecture(settings, cache_path=CACHE_FILE):
+    """
+    Resolves the "auto" architecture for the settings.
+
+    Args:
+        settings (dict): Model settings with latency_budget_ms, calibration_clip,
+            backend and precision.
+        cache_path (Path): Cache file.
+
+    Returns:
+        str: Architecture name.
+    """
+    measurements = benchmark_architectures(settings, cache_path)
+    budget = float(settings.get("latency_budget_ms") or 100.0)
+    name = pick_architecture(measurements, budget)
+    logging.debug(f"Selected {name} for a latency budget of {budget:g} ms: {measurements}")
+    return name
+
+
+def resolve_architecture(settings, cache_path=CACHE_FILE):
+    """
+    Replaces the "auto" value of the "model_arch" setting by the selected architecture.
+
+    The selection is made once per clip, backend, precision and latency budget
+    in the process. If the benchmark fails (e.g. the calibration clip cannot
+    be read), the error is logged and the default architecture is used.
+
+    Args:
+        settings (dict): Model settings.
+        cache_path (Path): Measurement cache file.
+
+    Returns:
+        dict: The settings, copied with the architecture name if it was "auto".
+    """
+    if settings.get("model_arch") != "auto":
+        return settings
+
+    key = (str(cache_path), settings.get("calibration_clip"), variant_key("auto", settings),
+           settings.get("latency_budget_ms"))
+    name = _selections.get(key)
+    if name is None:
+        try:
+            name = select_architecture(settings, cache_path)
+            logging.info(f"Selected the {name} architecture")
+        except Exception as e:
+            name = DEFAULT_ARCHITECTURE
+            logging.error(f"Architecture selection failed, using {name}: {e}")
+        _selections[key] = name
+    return {**settings, "model_arch": name}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Detector architecture selection")
+    parser.add_argument("--clip", default="", help="Calibration video file or image directory")
+    parser.add_argument("--budget", type=float, default=100.0, help="Per-frame latency budget in ms")
+    parser.add_argument("--backend", default="eager")
+    parser.add_argument("--precision", default="fp32")
+    parser.add_argument("--cache", default=str(CACHE_FILE), help="Measurement cache file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    settings = {
+        "score_thresh": 0.5,
+        "nms_thresh": 0.3,
+        "detections_per_image": 10,
+        "backend": args.backend,
+        "precision": args.precision,
+        "calibration_clip": args.clip or None,
+        "latency_budget_ms": args.budget,
+    }
+    measurements = benchmark_architectures(settings, Path(args.cache))
+    for name, result in measurements.items():
+        print(f"{name:>28}  {result['ms_per_frame']:>8} ms  mAP {result['box_map']}")
+    print(f"Selected: {pick_architecture(measurements, args.budget)}")
+
+
+if __name__ == "__main__":
+    main()
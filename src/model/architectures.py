@@ -0,0 +1,88 @@
+# architectures.py
+from dataclasses import dataclass
+from typing import Callable
+
+from torchvision.models.detection import (
+    FasterRCNN_MobileNet_V3_Large_320_FPN_Weights,
+    FasterRCNN_MobileNet_V3_Large_FPN_Weights,
+    SSDLite320_MobileNet_V3_Large_Weights,
+    fasterrcnn_mobilenet_v3_large_320_fpn,
+    fasterrcnn_mobilenet_v3_large_fpn,
+    ssdlite320_mobilenet_v3_large
+)
+
+
+@dataclass
+class Architecture:
+    """
+    A torchvision detector the shared `Detector` can run.
+
+    Attributes:
+        name (str): Value of the "model_arch" setting.
+        builder (Callable): torchvision model builder taking the weights.
+        weights: COCO weights of the model.
+        family (str): "ssd" (single-stage, runs on every backend and precision)
+            or "rcnn" (two-stage, runs eager in fp32 only).
+    """
+    name: str
+    builder: Callable
+    weights: object
+    family: str
+
+    @property
+    def model_name(self):
+        """Name of the weights, used for cache keys and export file names."""
+        return str(self.weights).replace(".", "_")
+
+    @property
+    def box_map(self):
+        """COCO val2017 box mAP published with the weights."""
+        return float(self.weights.meta["_metrics"]["COCO-val2017"]["box_map"])
+
+    def supports(self, backend, precision):
+        """
+        Checks whether the architecture can run on a backend in a precision.
+
+        Args:
+            backend (str): Backend name, see `model.backends.BACKENDS`.
+            precision (str): "fp32", "int8" or "bf16".
+
+        Returns:
+            bool: True if the combination is supported.
+        """
+        if self.family == "ssd":
+            return True
+        return (backend or "eager") == "eager" and (precision or "fp32") == "fp32"
+
+
+# Ordered from the fastest to the most accurate
+ARCHITECTURES = {
+    architecture.name: architecture for architecture in (
+        Architecture("ssdlite320", ssdlite320_mobilenet_v3_large,
+                     SSDLite320_MobileNet_V3_Large_Weights.COCO_V1, "ssd"),
+        Architecture("fasterrcnn_mobilenet_320", fasterrcnn_mobilenet_v3_large_320_fpn,
+                     FasterRCNN_MobileNet_V3_Large_320_FPN_Weights.COCO_V1, "rcnn"),
+        Architecture("fasterrcnn_mobilenet", fasterrcnn_mobilenet_v3_large_fpn,
+                     FasterRCNN_MobileNet_V3_Large_FPN_Weights.COCO_V1, "rcnn"),
+    )
+}
+DEFAULT_ARCHITECTURE = "ssdlite320"
+
+
+def get_architecture(name=None):
+    """
+    Looks up an architecture by the value of the "model_arch" setting.
+
+    Args:
+        name (str, optional): Architecture name; the default architecture if omitted.
+
+    Returns:
+        Architecture: The architecture.
+
+    Raises:
+        ValueError: If the name is unknown.
+    """
+    architecture = ARCHITECTURES.get(name or DEFAULT_ARCHITECTURE)
+    if architecture is None:
+        raise ValueError(f"Unknown model architecture: {name}")
+    return architecture
@@ -0,0 +1,341 @@
+# backends.py
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import cv2
+import torch
+import torchvision
+from torch import nn
+
+import logging
+from utils.logger import setup_logger
+setup_logger(__name__)
+
+
+DEFAULT_EXPORT_DIR = Path(__file__).parent.parent.parent / "models"
+# Version of the exported core (inputs, outputs and export options);
+# bump it when SSDCore or the export functions change
+EXPORT_VERSION = 1
+
+
+class SSDCore(nn.Module):
+    """
+    The runtime-dependent part of a torchvision SSD model: backbone and heads.
+
+    Takes the normalized, resized NCHW batch produced by `model.transform` and
+    returns the raw head outputs. Preprocessing, anchors and postprocessing
+    (box decoding, score thresholds, NMS) stay in torch for every backend, so
+    all backends produce the same detections.
+    """
+
+    def __init__(self, model):
+        super().__init__()
+        self.backbone = model.backbone
+        self.head = model.head
+
+    def forward(self, images):
+        features = list(self.backbone(images).values())
+        outputs = self.head(features)
+        return outputs["bbox_regression"], outputs["cls_logits"]
+
+
+def trace_core(core, image_size=(320, 320)):
+    """
+    Traces an SSD core to TorchScript.
+
+    Args:
+        core (torch.nn.Module): SSDCore (or a reduced-precision variant) in eval mode.
+        image_size (tuple): (height, width) of the model input.
+
+    Returns:
+        torch.jit.ScriptModule: The traced module.
+    """
+    example = torch.zeros(1, 3, *image_size)
+    with torch.no_grad():
+        return torch.jit.trace(core.eval(), example, strict=False)
+
+
+def export_torchscript(core, path, image_size=(320, 320)):
+    """
+    Traces an SSD core to a TorchScript file.
+
+    Args:
+        core (torch.nn.Module): SSDCore in eval mode, e.g. `SSDCore(model)`.
+        path (str or Path): Output file.
+        image_size (tuple): (height, width) of the model input.
+
+    Returns:
+        Path: The written file.
+    """
+    path = Path(path)
+    traced = trace_core(core, image_size)
+    _write_atomic(path, lambda tmp: traced.save(str(tmp)))
+    logging.info(f"Exported TorchScript model to {path}")
+    return path
+
+
+def export_onnx(core, path, image_size=(320, 320), opset=17):
+    """
+    Exports an SSD core to ONNX with a dynamic batch axis.
+
+    Args:
+        core (torch.nn.Module): fp32 SSDCore in eval mode, e.g. `SSDCore(model)`.
+        path (str or Path): Output file.
+        image_size (tuple): (height, width) of the model input.
+        opset (int): ONNX opset version.
+
+    Returns:
+        Path: The written file.
+    """
+    path = Path(path)
+    core = core.eval()
+    example = torch.zeros(1, 3, *image_size)
+
+    def export(tmp):
+        torch.onnx.export(
+            core, (example,), str(tmp),
+            input_names=["images"],
+            output_names=["bbox_regression", "cls_logits"],
+            dynamic_axes={name: {0: "batch"} for name in ("images", "bbox_regression", "cls_logits")},
+            opset_version=opset,
+            dynamo=False
+        )
+
+    with torch.no_grad():
+        _write_atomic(path, export)
+    logging.info(f"Exported ONNX model to {path}")
+    return path
+
+
+def _write_atomic(path, write):
+    """Writes a file through a temporary name so readers never see a partial export."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def export_stamp(core):
+    """
+    Describes what an export of the core depends on: the torch and
+    torchvision versions, `EXPORT_VERSION` and a hash of the weights.
+
+    Args:
+        core (torch.nn.Module): SSDCore (or a reduced-precision variant).
+
+    Returns:
+        dict: The stamp.
+    """
+    digest = hashlib.sha1()
+    for name, value in core.state_dict().items():
+        if isinstance(value, torch.Tensor):
+            digest.update(name.encode())
+            digest.update(value.detach().cpu().contiguous().view(-1).view(torch.uint8).numpy())
+    return {
+        "torch": torch.__version__,
+        "torchvision": torchvision.__version__,
+        "export_version": EXPORT_VERSION,
+        "weights": digest.hexdigest(),
+    }
+
+
+def stamp_path(path):
+    """Path of the stamp file written next to an exported model."""
+    return path.with_name(path.name + ".stamp.json")
+
+
+def ensure_export(core, path, image_size, export, force=False):
+    """
+    Exports the core unless the file exists and its stamp matches the current
+    torch and torchvision versions, `EXPORT_VERSION` and weights.
+
+    Args:
+        core (torch.nn.Module): SSDCore in eval mode.
+        path (Path): Exported model file.
+        image_size (tuple): (height, width) of the model input.
+        export (callable): `export_torchscript` or `export_onnx`.
+        force (bool): Export even if the file is up to date.
+
+    Returns:
+        Path: The exported file.
+    """
+    path = Path(path)
+    stamp = export_stamp(core)
+    if not force and path.exists():
+        try:
+            with open(stamp_path(path), "r", encoding="utf-8") as f:
+                if json.load(f) == stamp:
+                    return path
+        except (OSError, ValueError):
+            pass
+        logging.info(f"Exported model {path} is outdated, exporting it again")
+
+    export(core, path, image_size)
+
+    def write_stamp(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(stamp, f, indent=4)
+
+    _write_atomic(stamp_path(path), write_stamp)
+    return path
+
+
+class InferenceBackend:
+    """
+    Runs the SSD core on a normalized NCHW float batch.
+
+    Backends that need an exported model create it on first use and keep it
+    in the export directory, unless `persist` is off (e.g. for a quantized core
+    that depends on its calibration frames). A kept export is replaced when
+    torch, torchvision, the weights or `EXPORT_VERSION` change, see `ensure_export()`.
+
+    Attributes:
+        NAME (str): Value of the "backend" setting that selects the backend.
+    """
+    NAME = None
+
+    def __init__(self, core, export_dir, image_size, model_name="ssd", persist=True):
+        """
+        Prepares the backend for an SSD core.
+
+        Args:
+            core (torch.nn.Module): SSDCore (or a reduced-precision variant) in eval mode.
+            export_dir (Path): Directory of exported model files.
+            image_size (tuple): (height, width) of the model input.
+            model_name (str): Name of the model weights, used for export file names.
+            persist (bool): Keep exported models in the export directory.
+        """
+        self.core = core
+        self.export_dir = Path(export_dir)
+        self.image_size = image_size
+        self.model_name = model_name
+        self.persist = persist
+
+    def export_path(self, suffix):
+        """Path of the exported model file, unique per weights and input size."""
+        h, w = self.image_size
+        return self.export_dir / f"{self.model_name}_{h}x{w}{suffix}"
+
+    def run(self, images):
+        """
+        Runs the backbone and the heads.
+
+        Args:
+            images (torch.Tensor): Normalized Nx3xHxW float batch.
+
+        Returns:
+            tuple: (bbox_regression, cls_logits) tensors of shapes NxAx4 and NxAxC.
+        """
+        raise NotImplementedError
+
+
+class EagerBackend(InferenceBackend):
+    """Plain eager PyTorch execution of the core."""
+    NAME = "eager"
+
+    def run(self, images):
+        return self.core(images)
+
+
+class TorchScriptBackend(InferenceBackend):
+    """TorchScript module traced from the core and cached in the export directory."""
+    NAME = "torchscript"
+
+    def __init__(self, core, export_dir, image_size, model_name="ssd", persist=True):
+        super().__init__(core, export_dir, image_size, model_name, persist)
+        if not persist:
+            self.module = trace_core(core, image_size)
+            return
+        path = ensure_export(core, self.export_path(".torchscript.pt"), image_size,
+                             export_torchscript)
+        self.module = torch.jit.load(str(path)).eval()
+
+    def run(self, images):
+        return self.module(images)
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """ONNX Runtime CPU session (requires the onnx and onnxruntime packages)."""
+    NAME = "onnxruntime"
+
+    def __init__(self, core, export_dir, image_size, model_name="ssd", persist=True):
+        super().__init__(core, export_dir, image_size, model_name, persist)
+        try:
+            import onnxruntime
+        except ImportError:
+            raise RuntimeError("The onnxruntime backend requires 'pip install onnx onnxruntime'")
+
+        path = ensure_export(core, self.export_path(".onnx"), image_size, export_onnx)
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(
+            str(path), options, providers=["CPUExecutionProvider"])
+
+    def run(self, images):
+        bbox_regression, cls_logits = self.session.run(
+            ["bbox_regression", "cls_logits"], {"images": images.contiguous().numpy()})
+        return torch.from_numpy(bbox_regression), torch.from_numpy(cls_logits)
+
+
+class OpenCvDnnBackend(InferenceBackend):
+    """OpenCV DNN module running the ONNX export (exporting requires the onnx package)."""
+    NAME = "opencv"
+
+    def __init__(self, core, export_dir, image_size, model_name="ssd", persist=True):
+        super().__init__(core, export_dir, image_size, model_name, persist)
+        path = ensure_export(core, self.export_path(".onnx"), image_size, export_onnx)
+        self.net = cv2.dnn.readNetFromONNX(str(path))
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+
+    def run(self, images):
+        self.net.setInput(images.contiguous().numpy(), "images")
+        bbox_regression, cls_logits = self.net.forward(["bbox_regression", "cls_logits"])
+        return torch.from_numpy(bbox_regression), torch.from_numpy(cls_logits)
+
+
+BACKENDS = {
+    backend.NAME: backend
+    for backend in (EagerBackend, TorchScriptBackend, OnnxRuntimeBackend, OpenCvDnnBackend)
+}
+
+
+def create_backend(name, core, export_dir=None, image_size=(320, 320), model_name="ssd",
+                   persist=True):
+    """
+    Creates the inference backend selected by the "backend" setting.
+
+    Args:
+        name (str): "eager", "torchscript", "onnxruntime" or "opencv".
+        core (torch.nn.Module): SSDCore (or a reduced-precision variant) in eval mode.
+        export_dir (str or Path, optional): Directory of exported model files.
+        image_size (tuple): (height, width) of the model input.
+        model_name (str): Name of the model weights, used for export file names.
+        persist (bool): Keep exported models in the export directory.
+
+    Returns:
+        InferenceBackend: The backend.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    backend = BACKENDS.get(name or "eager")
+    if backend is None:
+        raise ValueError(f"Unknown inference backend: {name}")
+    return backend(core, export_dir or DEFAULT_EXPORT_DIR, image_size, model_name, persist)
+
+
+if __name__ == "__main__":
+    # Export the default model ahead of time: python -m model.backends [dir]
+    import sys
+    from model.detector import Detector
+
+    detector = Detector({"detections_per_image": 10, "nms_thresh": 0.3, "score_thresh": 0.5})
+    target = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_EXPORT_DIR
+    core = SSDCore(detector.model).eval()
+    probe = InferenceBackend(core, target, detector.image_size, detector.export_name("fp32"))
+    ensure_export(core, probe.export_path(".torchscript.pt"), detector.image_size,
+                  export_torchscript, force=True)
+    ensure_export(core, probe.export_path(".onnx"), detector.image_size, export_onnx, force=True)
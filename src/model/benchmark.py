@@ -0,0 +1,339 @@
+# benchmark.py
+"""
+Throughput measurements of the detection pipeline on offline frames.
+
+Run from the src directory, e.g.:
+
+    python -m model.benchmark --source synthetic --frames 64 --batch-sizes 1,2,4,8
+    python -m model.benchmark --source video --path recording.mp4
+    python -m model.benchmark --backends eager,torchscript,onnxruntime,opencv
+    python -m model.benchmark --precisions fp32,int8,bf16 --calibration-dir frames/
+"""
+import argparse
+import json
+from time import perf_counter
+
+import cv2
+import torch
+from torchvision.ops import box_iou
+
+from model.detector import Detector
+from model.frame_source import open_frame_source
+from model.model_runner import ModelRunner
+
+import logging
+from utils.logger import setup_logger
+setup_logger(__name__)
+
+
+def load_frames(settings, count):
+    """
+    Reads frames from an offline source as RGB uint8 arrays.
+
+    Args:
+        settings (dict): Camera settings describing the source, see `open_frame_source()`.
+        count (int): Number of frames to read (the source is looped if shorter).
+
+    Returns:
+        list: HxWx3 uint8 RGB frames.
+    """
+    source = open_frame_source({**settings, "source_pacing": "fast", "source_loop": True})
+    frames = []
+    try:
+        while len(frames) < count:
+            ok, frame = source.read()
+            if not ok:
+                break
+            frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    finally:
+        source.release()
+    if not frames:
+        raise RuntimeError("The source did not deliver any frames")
+    return frames
+
+
+def measure_throughput(predict, frames, batch_size, warmup=1):
+    """
+    Times `predict` over all frames, `batch_size` frames per call.
+
+    Args:
+        predict (callable): Takes a list of frames and a batch size.
+        frames (list): Frames to process.
+        batch_size (int): Frames per forward pass.
+        warmup (int): Untimed warm-up batches.
+
+    Returns:
+        dict: batch_size, frames, seconds, fps and ms_per_frame.
+    """
+    for _ in range(warmup):
+        predict(frames[:batch_size], batch_size)
+
+    started = perf_counter()
+    predict(frames, batch_size)
+    seconds = perf_counter() - started
+    return {
+        "batch_size": batch_size,
+        "frames": len(frames),
+        "seconds": round(seconds, 3),
+        "fps": round(len(frames) / seconds, 2),
+        "ms_per_frame": round(1000.0 * seconds / len(frames), 2),
+    }
+
+
+def compare_batch_sizes(runner, frames, batch_sizes=(1, 2, 4, 8)):
+    """
+    Compares `ModelRunner.predict_batch` against the single-frame path.
+
+    Batch size 1 is the path `predict_boxes()` takes (one tensor per forward
+    pass) and is the baseline of the reported speedups.
+
+    Args:
+        runner (ModelRunner): Runner with a detector.
+        frames (list): RGB uint8 frames.
+        batch_sizes (tuple): Batch sizes to measure.
+
+    Returns:
+        list: One result dict per batch size, see `measure_throughput()`,
+            with an added "speedup" relative to batch size 1.
+    """
+    sizes = sorted(set(batch_sizes) | {1})
+    results = [measure_throughput(runner.predict_batch, frames, size) for size in sizes]
+    baseline = results[0]["fps"]
+    for result in results:
+        result["speedup"] = round(result["fps"] / baseline, 2)
+    return results
+
+
+def compare_backends(detector, frames, backends, batch_size=1):
+    """
+    Compares inference backends on the same detector weights.
+
+    Every backend is checked against the eager backend: the largest box and
+    score deviation and whether all labels agree are reported with the timing.
+
+    Args:
+        detector (Detector): Detector whose backend is switched in turn.
+        frames (list): RGB uint8 frames.
+        backends (list): Backend names, see `model.backends.BACKENDS`.
+        batch_size (int): Frames per forward pass.
+
+    Returns:
+        list: One result dict per backend, see `measure_throughput()`, with
+            "backend", "max_box_diff", "max_score_diff" and "labels_match".
+    """
+    variants = [({"backend": name}, name, detector.precision)
+                for name in ["eager"] + [name for name in backends if name != "eager"]]
+    return _compare_variants(detector, frames, variants, batch_size, _deviation)
+
+
+def compare_precisions(detector, frames, precisions, backend="eager", batch_size=1,
+                       calibration_frames=None):
+    """
+    Compares numeric precisions (see `model.precision`) against fp32.
+
+    Without ground truth the accuracy delta is measured as agreement with the
+    fp32 detections: the share of fp32 detections found again with the same
+    label and IoU >= 0.5 (recall), the share of detections that match an fp32
+    one (precision), and the mean score difference of the matched pairs.
+
+    Args:
+        detector (Detector): Detector whose backend is switched in turn.
+        frames (list): RGB uint8 frames.
+        precisions (list): Precision names, e.g. ["fp32", "int8", "bf16"].
+        backend (str): Backend to run the precisions on.
+        batch_size (int): Frames per forward pass.
+        calibration_frames (list, optional): RGB uint8 frames to calibrate INT8
+            on instead of the detector's "calibration_dir".
+
+    Returns:
+        list: One result dict per precision, see `measure_throughput()`, with
+            "precision", "speedup", "recall_vs_fp32", "precision_vs_fp32" and
+            "mean_score_diff".
+    """
+    variants = [({"precision": name}, backend, name)
+                for name in ["fp32"] + [name for name in precisions if name != "fp32"]]
+    results = _compare_variants(detector, frames, variants, batch_size, _agreement,
+                                calibration_frames)
+    if results:
+        baseline = results[0]["fps"]
+        for result in results:
+            result["speedup"] = round(result["fps"] / baseline, 2)
+    return results
+
+
+def _compare_variants(detector, frames, variants, batch_size, compare, calibration_frames=None):
+    """
+    Times detector backends and compares their outputs with the first one.
+
+    Args:
+        detector (Detector): Detector whose backend is switched in turn.
+        frames (list): RGB uint8 frames.
+        variants (list): (result label dict, backend name, precision) tuples.
+        batch_size (int): Frames per forward pass.
+        compare (callable): Compares reference and variant predictions, returns a dict.
+        calibration_frames (list, optional): RGB uint8 frames to calibrate INT8 on.
+
+    Returns:
+        list: One result dict per variant that could be built.
+    """
+    original = detector.backend
+
+    def predict(batch, size):
+        return [result for start in range(0, len(batch), size)
+                for result in detector.predict(batch[start:start + size], with_scores=True)]
+
+    results = []
+    reference = None
+    try:
+        for label, backend, precision in variants:
+            try:
+                detector.backend = detector.build_backend(backend, precision, calibration_frames)
+            except Exception as e:
+                logging.error(f"{' '.join(map(str, label.values()))} is not available: {e}")
+                continue
+
+            outputs = predict(frames, batch_size)
+            if reference is None:
+                reference = outputs
+            result = {**label, **measure_throughput(predict, frames, batch_size)}
+            result.update(compare(reference, outputs))
+            results.append(result)
+    finally:
+        detector.backend = original
+    return results
+
+
+def _deviation(reference, outputs):
+    """Largest difference between two lists of (boxes, labels, scores) predictions."""
+    box_diff = score_diff = 0.0
+    labels_match = True
+    for (ref_boxes, ref_labels, ref_scores), (boxes, labels, scores) in zip(reference, outputs):
+        if ref_labels != labels:
+            labels_match = False
+            continue
+        if len(labels):
+            box_diff = max(box_diff, (ref_boxes - boxes).abs().max().item())
+            score_diff = max(score_diff, (ref_scores - scores).abs().max().item())
+    return {"max_box_diff": round(box_diff, 4), "max_score_diff": round(score_diff, 5),
+            "labels_match": labels_match}
+
+
+def _agreement(reference, outputs, iou_threshold=0.5):
+    """Greedy same-label IoU matching of predictions against reference predictions."""
+    matched = reference_count = output_count = 0
+    score_diffs = []
+    for (ref_boxes, ref_labels, ref_scores), (boxes, labels, scores) in zip(reference, outputs):
+        reference_count += len(ref_labels)
+        output_count += len(labels)
+        if not len(ref_labels) or not len(labels):
+            continue
+
+        iou = box_iou(ref_boxes, boxes)
+        same_label = torch.tensor([[r == o for o in labels] for r in ref_labels])
+        iou[~same_label] = 0.0
+        for i in range(len(ref_labels)):
+            j = int(iou[i].argmax())
+            if iou[i, j] >= iou_threshold:
+                matched += 1
+                score_diffs.append(abs(float(ref_scores[i]) - float(scores[j])))
+                iou[:, j] = 0.0
+
+    return {
+        "recall_vs_fp32": round(matched / reference_count, 3) if reference_count else 1.0,
+        "precision_vs_fp32": round(matched / output_count, 3) if output_count else 1.0,
+        "mean_score_diff": round(sum(score_diffs) / len(score_diffs), 4) if score_diffs else 0.0,
+    }
+
+
+def format_results(results):
+    """Formats result dicts as a plain text table."""
+    if not results:
+        return "No results"
+    columns = list(results[0])
+    lines = ["  ".join(f"{column:>12}" for column in columns)]
+    for result in results:
+        lines.append("  ".join(f"{str(result[column]):>12}" for column in columns))
+    return "\n".join(lines)
+
+
+def benchmark_settings(args):
+    """Builds runner settings for the benchmark from the command line arguments."""
+    return {
+        "camera_id": "benchmark",
+        "source_type": args.source,
+        "source_path": args.path,
+        "source_resolution": [int(v) for v in args.resolution.lower().split("x")],
+        "source_seed": 0,
+        "fps": 25,
+        "detections_per_image": args.detections,
+        "nms_thresh": 0.3,
+        "score_thresh": args.threshold,
+        "batch_size": 1,
+        "backend": "eager",
+        "backend_dir": args.backend_dir or None,
+        "precision": "fp32",
+        "calibration_dir": args.calibration_dir or None,
+        "calibration_frames": 32,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Detector throughput benchmark")
+    parser.add_argument("--source", default="synthetic", choices=("synthetic", "video", "images"))
+    parser.add_argument("--path", default="", help="Video file or image directory")
+    parser.add_argument("--resolution", default="640x480", help="Synthetic frame size")
+    parser.add_argument("--frames", type=int, default=64)
+    parser.add_argument("--batch-sizes", default="1,2,4,8")
+    parser.add_argument("--threads", type=int, default=0, help="torch intra-op threads (0 keeps the default)")
+    parser.add_argument("--detections", type=int, default=10)
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--backends", default="",
+                        help="Compare inference backends instead of batch sizes, e.g. eager,torchscript")
+    parser.add_argument("--backend-dir", default="", help="Directory of exported models")
+    parser.add_argument("--precisions", default="",
+                        help="Compare numeric precisions against fp32, e.g. fp32,int8,bf16")
+    parser.add_argument("--precision-backend", default="eager", help="Backend used with --precisions")
+    parser.add_argument("--calibration-dir", default="",
+                        help="Images or video for INT8 calibration (defaults to the benchmark source)")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    settings = benchmark_settings(args)
+    frames = load_frames(settings, args.frames)
+    detector = Detector(settings)
+    batch_sizes = [int(v) for v in args.batch_sizes.split(",") if v]
+    if args.precisions:
+        calibration_frames = None
+        if not detector.settings.get("calibration_dir"):
+            if args.path:
+                detector.settings["calibration_dir"] = args.path
+            else:
+                # The synthetic frames are the benchmark source
+                calibration_frames = frames[:settings["calibration_frames"]]
+        results = compare_precisions(detector, frames, args.precisions.split(","),
+                                     args.precision_backend, batch_sizes[0], calibration_frames)
+    elif args.backends:
+        results = compare_backends(detector, frames, args.backends.split(","), batch_sizes[0])
+    else:
+        runner = ModelRunner({**settings, "source_pacing": "realtime", "fps": 1}, detector)
+        try:
+            results = compare_batch_sizes(runner, frames, batch_sizes)
+        finally:
+            runner.release()
+
+    if args.json:
+        print(json.dumps(results, indent=4))
+    else:
+        h, w = frames[0].shape[:2]
+        print(f"{len(frames)} frames of {w}x{h}, {torch.get_num_threads()} torch threads")
+        print(format_results(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+# cascade.py
+from threading import Event, Lock, Thread
+from time import monotonic
+
+import cv2
+import numpy as np
+import torch
+from torchvision.ops import batched_nms
+from torchvision.models.detection import (
+    FasterRCNN_MobileNet_V3_Large_FPN_Weights,
+    FasterRCNN_ResNet50_FPN_V2_Weights,
+    RetinaNet_ResNet50_FPN_V2_Weights,
+    fasterrcnn_mobilenet_v3_large_fpn,
+    fasterrcnn_resnet50_fpn_v2,
+    retinanet_resnet50_fpn_v2
+)
+
+from model.pipeline import LatestQueue
+
+import logging
+from utils.logger import setup_logger
+setup_logger(__name__)
+
+
+# Heavy detectors trained on the same COCO categories as the always-on SSDLite
+HEAVY_MODELS = {
+    "fasterrcnn_mobilenet": (fasterrcnn_mobilenet_v3_large_fpn,
+                             FasterRCNN_MobileNet_V3_Large_FPN_Weights.COCO_V1),
+    "fasterrcnn_resnet50": (fasterrcnn_resnet50_fpn_v2,
+                            FasterRCNN_ResNet50_FPN_V2_Weights.COCO_V1),
+    "retinanet_resnet50": (retinanet_resnet50_fpn_v2,
+                           RetinaNet_ResNet50_FPN_V2_Weights.COCO_V1),
+}
+
+
+class HeavyDetector:
+    """
+    Accurate but slow torchvision detector for occasional passes.
+
+    Runs the complete torchvision model (with its own, larger input size) and
+    returns predictions in the format of `Detector.predict(..., with_scores=True)`.
+    """
+
+    def __init__(self, name, settings):
+        """
+        Loads the model.
+
+        Args:
+            name (str): Key of `HEAVY_MODELS`.
+            settings (dict): Settings with the runtime thresholds, see `set_thresholds()`.
+
+        Raises:
+            ValueError: If the model name is unknown.
+        """
+        if name not in HEAVY_MODELS:
+            raise ValueError(f"Unknown heavy model: {name}")
+        builder, weights = HEAVY_MODELS[name]
+        self.name = name
+        self.categories = weights.meta["categories"]
+        self.model = builder(weights=weights).eval()
+        self.score_thresh = 0.5
+        self.detections_per_image = 10
+        self.set_thresholds(settings)
+        logging.info(f"Heavy detector {name} loaded")
+
+    def set_thresholds(self, settings):
+        """
+        Applies the score threshold and the number of detections per image.
+
+        Args:
+            settings (dict): Settings with score_thresh and detections_per_image.
+        """
+        self.score_thresh = float(settings.get("score_thresh", self.score_thresh))
+        self.detections_per_image = int(settings.get("detections_per_image", self.detections_per_image))
+
+    def predict(self, frames):
+        """
+        Runs the model on RGB frames.
+
+        Args:
+            frames (list): HxWx3 uint8 RGB frames.
+
+        Returns:
+            list: (boxes tensor, list of label strings, scores tensor) per frame.
+        """
+        images = [torch.from_numpy(frame).permute(2, 0, 1).float().div_(255.0) for frame in frames]
+        with torch.no_grad():
+            predictions = self.model(images)
+
+        results = []
+        for prediction in predictions:
+            keep = prediction["scores"] >= self.score_thresh
+            keep = keep.nonzero().flatten()[:self.detections_per_image]
+            results.append((prediction["boxes"][keep],
+                            [self.categories[i] for i in prediction["labels"][keep]],
+                            prediction["scores"][keep]))
+        return results
+
+
+def merge_detections(primary, secondary, iou_threshold=0.5):
+    """
+    Merges the detections of two models on the same scene.
+
+    Overlapping boxes of the same label are resolved by class-wise NMS, so an
+    object found by both models is kept once, with the higher score.
+
+    Args:
+        primary (tuple): (boxes, labels, scores) of the always-on detector.
+        secondary (tuple): (boxes, labels, scores) of the heavy detector.
+        iou_threshold (float): IoU above which two boxes are the same object.
+
+    Returns:
+        tuple: Merged (boxes tensor, list of label strings, scores tensor).
+    """
+    boxes = torch.cat([primary[0].float(), secondary[0].float()])
+    labels = list(primary[1]) + list(secondary[1])
+    scores = torch.cat([primary[2].float(), secondary[2].float()])
+    if not labels:
+        return boxes.reshape(0, 4), [], scores
+
+    label_ids = {label: i for i, label in enumerate(dict.fromkeys(labels))}
+    idxs = torch.tensor([label_ids[label] for label in labels])
+    keep = batched_nms(boxes, scores, idxs, iou_threshold)
+    return boxes[keep], [labels[i] for i in keep], scores[keep]
+
+
+class HeavyPassRequests:
+    """
+    Process-wide requests for a heavy detection pass, e.g. from the API server
+    when it is asked about an object that was not seen recently.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._labels = set()
+        self._pending = False
+
+    def request(self, label=None):
+        """
+        Asks for a heavy pass on the next frame of every camera.
+
+        Args:
+            label (str, optional): Object the pass is for (for logging).
+        """
+        with self._lock:
+            self._pending = True
+            if label:
+                self._labels.add(label)
+        logging.info(f"Heavy detection pass requested{f' for {label}' if label else ''}")
+
+    def take(self):
+        """
+        Consumes the pending request.
+
+        Returns:
+            set or None: Requested labels (possibly empty), None without a request.
+        """
+        with self._lock:
+            if not self._pending:
+                return None
+            labels, self._labels, self._pending = self._labels, set(), False
+            return labels
+
+
+HEAVY_PASS_REQUESTS = HeavyPassRequests()
+
+
+def request_heavy_pass(label=None):
+    """Asks the running cascade for a heavy detection pass, see `HeavyPassRequests.request()`."""
+    HEAVY_PASS_REQUESTS.request(label)
+
+
+class Cascade:
+    """
+    Two-tier detection: the cheap shared detector runs on every frame and a
+    heavy detector runs occasionally in a background thread.
+
+    A heavy pass on a camera's frame is started when
+      - the scene changed since the camera's last heavy pass (mean absolute
+        difference of small grayscale thumbnails above `SCENE_CHANGE`),
+      - the camera's last heavy pass is older than `refresh_interval` seconds, or
+      - a pass was requested through `request_heavy_pass()` (every camera
+        gets one, whichever batch consumed the request),
+    but only while the heavy detector stays within its duty cycle: after a
+    pass that took t seconds, the next one starts no earlier than
+    t * (1 / duty_cycle - 1) seconds later. The heavy results of a camera are
+    picked up with `take_results()` and merged with the cheap detections of
+    its next frame.
+
+    A failed pass (or model load) is retried after `ERROR_BACKOFF` seconds,
+    doubled with every further failure up to `ERROR_BACKOFF_MAX`; the error is
+    cleared by the next successful pass.
+
+    Attributes:
+        SCENE_CHANGE (float): Mean absolute thumbnail difference (0-255) of a changed scene.
+        THUMBNAIL_SIZE (int): Side of the grayscale thumbnails in pixels.
+        ERROR_BACKOFF (float): Seconds before the first retry after a failure.
+        ERROR_BACKOFF_MAX (float): Maximal seconds between retries.
+    """
+    SCENE_CHANGE = 12.0
+    THUMBNAIL_SIZE = 32
+    ERROR_BACKOFF = 5.0
+    ERROR_BACKOFF_MAX = 300.0
+
+    def __init__(self, settings, requests=HEAVY_PASS_REQUESTS):
+        """
+        Starts the worker thread; the heavy model is loaded by the worker on first use.
+
+        Args:
+            settings (dict): Settings with heavy_model, heavy_duty_cycle,
+                heavy_interval and the runtime thresholds.
+            requests (HeavyPassRequests): Source of on-demand requests.
+        """
+        self.settings = dict(settings)
+        self.model_name = settings.get("heavy_model") or "fasterrcnn_mobilenet"
+        self.duty_cycle = min(max(float(settings.get("heavy_duty_cycle") or 0.1), 0.01), 1.0)
+        self.refresh_interval = float(settings.get("heavy_interval") or 300.0)
+        self.requests = requests
+        self.detector = None
+        self.error_msg = None
+        self.failures = 0
+        self.passes = 0
+        self.last_ms = 0.0
+
+        self._lock = Lock()
+        self._thumbnails = {}
+        self._last_pass = {}
+        self._results = {}
+        self._cameras = set()
+        self._pending_cameras = set()
+        self._next_allowed = 0.0
+        self._busy = False
+        self._jobs = LatestQueue(1)
+        self._stop_event = Event()
+        self._thread = Thread(target=self._run, name="cascade-heavy", daemon=True)
+        self._thread.start()
+
+    def set_thresholds(self, settings):
+        """Applies the runtime thresholds to the heavy detector."""
+        with self._lock:
+            self.settings.update(settings)
+            if self.detector is not None:
+                self.detector.set_thresholds(settings)
+
+    def _thumbnail(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+        size = (self.THUMBNAIL_SIZE, self.THUMBNAIL_SIZE)
+        return cv2.resize(gray, size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def _reason(self, camera_id, frame, now):
+        """Returns why the camera's frame needs a heavy pass, or None."""
+        if camera_id in self._pending_cameras:
+            return "request"
+        if now - self._last_pass.get(camera_id, -float("inf")) >= self.refresh_interval:
+            return "refresh"
+        previous = self._thumbnails.get(camera_id)
+        if previous is None or np.abs(self._thumbnail(frame) - previous).mean() > self.SCENE_CHANGE:
+            return "scene change"
+        return None
+
+    def submit(self, camera_ids, frames):
+        """
+        Offers the latest frames of the cameras; starts a heavy pass on those
+        that need one if the duty cycle allows it.
+
+        Args:
+            camera_ids (list): Camera ids.
+            frames (list): HxWx3 uint8 RGB frames in the coordinates of the
+                cheap detections; a frame is copied if a pass starts on it, so
+                it may be a view the caller reuses afterwards.
+        """
+        labels = self.requests.take()
+        now = monotonic()
+        with self._lock:
+            self._cameras.update(camera_ids)
+            if labels is not None:
+                # The request is consumed here, so every camera seen so far gets
+                # the pass, also those without a frame in this batch (cameras
+                # seen for the first time are due for a refresh anyway)
+                self._pending_cameras.update(self._cameras)
+            if self._busy or now < self._next_allowed:
+                return
+
+            job = []
+            for camera_id, frame in zip(camera_ids, frames):
+                reason = self._reason(camera_id, frame, now)
+                if reason is not None:
+                    logging.debug(f"Heavy pass on camera {camera_id}: {reason}")
+                    job.append((camera_id, frame.copy()))
+            if job:
+                self._busy = True
+                self._jobs.put(job)
+
+    def take_results(self, camera_id):
+        """
+        Takes the finished heavy detections of a camera.
+
+        Args:
+            camera_id (str): Camera id.
+
+        Returns:
+            tuple or None: (boxes, labels, scores), None if there are no new results.
+        """
+        with self._lock:
+            return self._results.pop(camera_id, None)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            job = self._jobs.get(timeout=0.1)
+            if job is None:
+                continue
+
+            started = monotonic()
+            try:
+                if self.detector is None:
+                    self.detector = HeavyDetector(self.model_name, self.settings)
+                # Load time is not part of the duty cycle
+                started = monotonic()
+                predictions = self.detector.predict([frame for _, frame in job])
+            except Exception as e:
+                with self._lock:
+                    self.error_msg = f"Heavy detector error: {str(e)}"
+                    self.failures += 1
+                    backoff = min(self.ERROR_BACKOFF * 2 ** (self.failures - 1),
+                                  self.ERROR_BACKOFF_MAX)
+                    self._next_allowed = monotonic() + backoff
+                    self._busy = False
+                logging.error(f"{self.error_msg}, retrying in {backoff:g} seconds")
+                continue
+
+            finished = monotonic()
+            cost = finished - started
+            with self._lock:
+                for (camera_id, frame), prediction in zip(job, predictions):
+                    self._results[camera_id] = prediction
+                    self._thumbnails[camera_id] = self._thumbnail(frame)
+                    self._last_pass[camera_id] = finished
+                    self._pending_cameras.discard(camera_id)
+                self._next_allowed = finished + cost * (1.0 / self.duty_cycle - 1.0)
+                self._busy = False
+                self.error_msg = None
+                self.failures = 0
+                self.passes += 1
+                self.last_ms = 1000.0 * cost
+            logging.debug(f"Heavy pass on {len(job)} frame(s) took {self.last_ms:.0f} ms")
+
+    def stop(self):
+        """Stops the worker thread."""
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+
+    def get_stats(self):
+        """
+        Returns the heavy tier counters.
+
+        Returns:
+            dict: Model name, number of passes, duration of the last pass in ms,
+                the number of failures since the last successful pass and the
+                last error, if any.
+        """
+        with self._lock:
+            return {"model": self.model_name, "passes": self.passes,
+                    "last_ms": round(self.last_ms, 1), "failures": self.failures,
+                    "error": self.error_msg}
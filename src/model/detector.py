@@ -0,0 +1,387 @@
+# detector.py
+from threading import Lock
+
+import cv2
+import numpy as np
+import torch
+from torchvision.ops import batched_nms, clip_boxes_to_image, remove_small_boxes
+from torchvision.models.detection.image_list import ImageList
+
+from model.architectures import get_architecture
+from model.backends import SSDCore, create_backend
+from model.precision import apply_precision, calibration_batches, load_calibration_batches
+from model.preprocess import Preprocessor
+
+import logging
+from utils.logger import setup_logger
+setup_logger(__name__)
+
+
+class Detector:
+    """
+    Object detection model shared by all camera runners.
+
+    A single instance holds the network weights and runs batched forward
+    passes, so several cameras do not duplicate the model in memory.
+
+    The "model_arch" setting selects the torchvision detector, see
+    `model.architectures`. Two-stage (Faster R-CNN) architectures run the
+    complete torchvision model eagerly in fp32; the rest of this description
+    applies to the SSD architecture.
+
+    The backbone and heads run on the inference backend selected by the
+    "backend" setting (see `model.backends`); preprocessing, anchors and
+    postprocessing always run in torch, so every backend yields the same
+    boxes, labels and scores.
+
+    The "precision" setting runs the core in fp32, statically quantized INT8
+    (calibrated on the frames in "calibration_dir") or bfloat16; reduced
+    precisions are supported by the eager and torchscript backends.
+
+    Score threshold, NMS threshold and detections per image are applied to
+    the raw head outputs on every call, so `set_thresholds()` changes them
+    instantly without rebuilding the model.
+
+    Attributes:
+        DETECTOR_SETTINGS (list): Settings that require a new detector when changed.
+        RUNTIME_SETTINGS (list): Settings applied by `set_thresholds()`.
+    """
+
+    DETECTOR_SETTINGS = ["model_arch", "backend", "backend_dir", "precision", "calibration_dir",
+                         "calibration_frames"]
+    RUNTIME_SETTINGS = ["score_thresh", "nms_thresh", "detections_per_image"]
+
+    def __init__(self, settings, model=None):
+        """
+        Builds the detection model.
+
+        Args:
+            settings (dict): Model settings (detections_per_image, nms_thresh,
+                score_thresh and optionally model_arch, backend, backend_dir,
+                precision, calibration_dir, calibration_frames).
+            model (torch.nn.Module, optional): Already loaded fp32 network with
+                the detector's weights, e.g. shared by `model.model_cache`;
+                loaded from the weights if omitted.
+
+        Raises:
+            ValueError: If the architecture is unknown.
+        """
+        self.architecture = get_architecture(settings.get("model_arch"))
+        self.weights = self.architecture.weights
+        self.categories = self.weights.meta["categories"]
+        self.model_name = self.architecture.model_name
+        self.settings = {key: settings.get(key) for key in self.DETECTOR_SETTINGS}
+        self._lock = Lock()
+        self._anchors = {}
+        self.score_thresh = None
+        self.nms_thresh = None
+        self.detections_per_image = None
+        self.set_thresholds(settings)
+
+        self.model = model if model is not None else self.architecture.builder(weights=self.weights)
+        self.model.eval()
+        min_size = self.model.transform.min_size[-1]
+        self.image_size = tuple(self.model.transform.fixed_size or (min_size, min_size))
+        self.preprocessor = Preprocessor(self.image_size, self.model.transform.image_mean,
+                                         self.model.transform.image_std)
+        self.precision = settings.get("precision") or "fp32"
+        self.backend = self.build_backend(settings.get("backend"), self.precision)
+        logging.debug(f"Detector model created ({self.backend.NAME} backend, {self.precision})")
+
+    def build_backend(self, name, precision="fp32", calibration_frames=None):
+        """
+        Builds an inference backend for the detector's weights.
+
+        Args:
+            name (str): Backend name, see `model.backends.BACKENDS`.
+            precision (str): "fp32", "int8" or "bf16".
+            calibration_frames (list, optional): HxWx3 uint8 RGB frames to
+                calibrate INT8 on instead of the "calibration_dir" ones.
+
+        Returns:
+            InferenceBackend: The backend.
+
+        Raises:
+            ValueError: If the backend does not support the precision or the architecture.
+        """
+        if self.architecture.family != "ssd":
+            if not self.architecture.supports(name, precision):
+                raise ValueError(f"{self.architecture.name} only runs on the eager backend in fp32")
+            return create_backend("eager", self.model, self.settings.get("backend_dir"),
+                                  self.image_size, self.model_name)
+
+        if precision != "fp32" and name not in (None, "eager", "torchscript"):
+            raise ValueError(f"Precision {precision} requires the eager or torchscript backend")
+
+        calibration = self._calibration_batches
+        if calibration_frames:
+            def calibration():
+                return calibration_batches(calibration_frames, self.model.transform)
+        core = apply_precision(SSDCore(self.model).eval(), precision, calibration)
+        return create_backend(name, core, self.settings.get("backend_dir"), self.image_size,
+                              self.export_name(precision), persist=precision != "int8")
+
+    def export_name(self, precision="fp32"):
+        """
+        Name of the exported model files of the detector's core.
+
+        Args:
+            precision (str): "fp32", "int8" or "bf16".
+
+        Returns:
+            str: Weights name and precision, e.g. for `InferenceBackend.export_path()`.
+        """
+        return f"{self.model_name}_{precision}"
+
+    def _calibration_batches(self):
+        """Loads the INT8 calibration frames configured in the settings."""
+        return load_calibration_batches(
+            self.settings.get("calibration_dir"), self.model.transform,
+            self.settings.get("calibration_frames") or 32)
+
+    def set_thresholds(self, settings):
+        """
+        Applies the runtime post-processing settings; takes effect with the next prediction.
+
+        Args:
+            settings (dict): Settings with score_thresh, nms_thresh and detections_per_image.
+
+        Returns:
+            bool: True if any of the values changed.
+        """
+        values = (float(settings["score_thresh"]), float(settings["nms_thresh"]),
+                  int(settings["detections_per_image"]))
+        with self._lock:
+            changed = values != (self.score_thresh, self.nms_thresh, self.detections_per_image)
+            self.score_thresh, self.nms_thresh, self.detections_per_image = values
+        return changed
+
+    def matches(self, settings):
+        """
+        Checks whether the detector was built with the given model settings
+        (thresholds do not matter, see `set_thresholds()`).
+
+        Args:
+            settings (dict): Settings to compare against.
+
+        Returns:
+            bool: True if the detector can be reused for these settings.
+        """
+        return all(settings.get(key) == value for key, value in self.settings.items())
+
+    def predict(self, images, with_scores=False):
+        """
+        Runs one batched forward pass.
+
+        Args:
+            images (list): HxWx3 uint8 RGB frames (resized before the float
+                conversion, see `model.preprocess`) or CHW float tensors in
+                [0, 1], one per frame; sizes may differ.
+            with_scores (bool): Also return the confidence scores.
+
+        Returns:
+            list: (boxes tensor, list of label strings) per input image, or
+                (boxes, labels, scores tensor) if with_scores is set.
+        """
+        if not images:
+            return []
+
+        with self._lock, torch.no_grad():
+            predictions = self._forward(images)
+
+        results = []
+        for prediction in predictions:
+            labels = [self.categories[i] for i in prediction["labels"]]
+            if with_scores:
+                results.append((prediction["boxes"].detach(), labels,
+                                prediction["scores"].detach()))
+            else:
+                results.append((prediction["boxes"].detach(), labels))
+        return results
+
+    def _forward(self, images):
+        """
+        Equivalent of the torchvision SSD forward pass in eval mode with the
+        backbone and heads delegated to the backend.
+
+        Args:
+            images (list): HxWx3 uint8 RGB frames or CHW float tensors in [0, 1].
+
+        Returns:
+            list: Dicts with boxes, labels and scores per image.
+        """
+        if self.architecture.family != "ssd":
+            return self._forward_two_stage(images)
+
+        if all(isinstance(img, np.ndarray) for img in images):
+            inputs, original_sizes = self.preprocessor(images)
+            image_list = ImageList(inputs, [self.image_size] * len(images))
+        else:
+            original_sizes = [(int(img.shape[-2]), int(img.shape[-1])) for img in images]
+            image_list, _ = self.model.transform(images)
+        bbox_regression, cls_logits = self.backend.run(image_list.tensors)
+
+        anchors = self._default_anchors(image_list)
+        detections = self._postprocess(bbox_regression, cls_logits, anchors,
+                                       image_list.image_sizes)
+        return self.model.transform.postprocess(
+            detections, image_list.image_sizes, original_sizes)
+
+    def _forward_two_stage(self, images):
+        """
+        Runs a two-stage torchvision model with the current thresholds.
+
+        Frames are scaled down to the model resolution while still uint8 (the
+        model's transform keeps them at that size), and the boxes are mapped
+        back to the frame coordinates.
+
+        The network can be shared with other detectors (see `model.model_cache`),
+        so the thresholds are applied by `_postprocess_two_stage()` instead of
+        being set on its `roi_heads`.
+
+        Args:
+            images (list): HxWx3 uint8 RGB frames or CHW float tensors in [0, 1].
+
+        Returns:
+            list: Dicts with boxes, labels and scores per image.
+        """
+        transform = self.model.transform
+        inputs, scales = [], []
+        for img in images:
+            if isinstance(img, np.ndarray):
+                h, w = img.shape[:2]
+                scale = min(transform.min_size[-1] / min(h, w), transform.max_size / max(h, w))
+                if scale < 1.0:
+                    img = cv2.resize(img, (round(w * scale), round(h * scale)),
+                                     interpolation=cv2.INTER_LINEAR)
+                scales.append(torch.tensor([w / img.shape[1], h / img.shape[0]] * 2))
+                img = torch.from_numpy(img).permute(2, 0, 1).float().div_(255.0)
+            else:
+                scales.append(None)
+            inputs.append(img)
+
+        # Same steps as GeneralizedRCNN.forward and RoIHeads.forward in eval mode
+        original_sizes = [(int(img.shape[-2]), int(img.shape[-1])) for img in inputs]
+        image_list, _ = transform(inputs)
+        features = self.model.backbone(image_list.tensors)
+        proposals, _ = self.model.rpn(image_list, features)
+        roi_heads = self.model.roi_heads
+        box_features = roi_heads.box_roi_pool(features, proposals, image_list.image_sizes)
+        class_logits, box_regression = roi_heads.box_predictor(roi_heads.box_head(box_features))
+        detections = self._postprocess_two_stage(class_logits, box_regression, proposals,
+                                                 image_list.image_sizes)
+        predictions = transform.postprocess(detections, image_list.image_sizes, original_sizes)
+
+        for prediction, scale in zip(predictions, scales):
+            if scale is not None:
+                prediction["boxes"] = prediction["boxes"] * scale
+        return predictions
+
+    def _postprocess_two_stage(self, class_logits, box_regression, proposals, image_sizes):
+        """
+        Turns the box predictor outputs into detections with the current thresholds.
+
+        Same result as `RoIHeads.postprocess_detections` with this detector's
+        score threshold, NMS threshold and detections per image.
+
+        Args:
+            class_logits (torch.Tensor): Class logits of all proposals (class 0 is background).
+            box_regression (torch.Tensor): Per-class box regression of all proposals.
+            proposals (list): Proposal boxes of every image.
+            image_sizes (list): (height, width) of every resized image.
+
+        Returns:
+            list: Dicts with boxes, scores and labels per image.
+        """
+        roi_heads = self.model.roi_heads
+        num_classes = class_logits.shape[-1]
+        counts = [len(image_proposals) for image_proposals in proposals]
+        boxes_list = roi_heads.box_coder.decode(box_regression, proposals).split(counts)
+        scores_list = torch.softmax(class_logits, -1).split(counts)
+
+        detections = []
+        for boxes, scores, image_size in zip(boxes_list, scores_list, image_sizes):
+            boxes = clip_boxes_to_image(boxes, image_size)
+            labels = torch.arange(num_classes, device=scores.device).view(1, -1).expand_as(scores)
+
+            # Drop the background class, every class prediction is a separate candidate
+            boxes = boxes[:, 1:].reshape(-1, 4)
+            scores = scores[:, 1:].reshape(-1)
+            labels = labels[:, 1:].reshape(-1)
+
+            keep = torch.where(scores > self.score_thresh)[0]
+            boxes, scores, labels = boxes[keep], scores[keep], labels[keep]
+            keep = remove_small_boxes(boxes, min_size=1e-2)
+            boxes, scores, labels = boxes[keep], scores[keep], labels[keep]
+
+            keep = batched_nms(boxes, scores, labels, self.nms_thresh)
+            keep = keep[:self.detections_per_image]
+            detections.append({
+                "boxes": boxes[keep],
+                "scores": scores[keep],
+                "labels": labels[keep],
+            })
+        return detections
+
+    def _postprocess(self, bbox_regression, cls_logits, anchors, image_sizes):
+        """
+        Turns raw head outputs into detections with the current thresholds.
+
+        Same result as `SSD.postprocess_detections`, but box decoding, softmax
+        and the per-class top-k candidate selection run on the whole batch at
+        once; only the NMS runs per image.
+
+        Args:
+            bbox_regression (torch.Tensor): NxAx4 box regression outputs.
+            cls_logits (torch.Tensor): NxAxC class logits (class 0 is background).
+            anchors (torch.Tensor): Ax4 default boxes.
+            image_sizes (list): (height, width) of every resized image.
+
+        Returns:
+            list: Dicts with boxes, scores and labels per image.
+        """
+        n, num_anchors, num_classes = cls_logits.shape
+        boxes = self.model.box_coder.decode_single(
+            bbox_regression.reshape(-1, 4), anchors.repeat(n, 1)).reshape(n, num_anchors, 4)
+        scores = torch.softmax(cls_logits, dim=-1)[:, :, 1:]
+
+        # Best candidates of every class, ordered class by class like torchvision
+        k = min(self.model.topk_candidates, num_anchors)
+        top_scores, top_indices = scores.topk(k, dim=1)
+        top_scores = top_scores.transpose(1, 2)
+        top_indices = top_indices.transpose(1, 2)
+        labels = torch.arange(1, num_classes, device=scores.device).view(-1, 1).expand(-1, k)
+        keep_mask = top_scores > self.score_thresh
+
+        detections = []
+        for i in range(n):
+            keep = keep_mask[i]
+            image_scores = top_scores[i][keep]
+            image_labels = labels[keep]
+            image_boxes = clip_boxes_to_image(boxes[i][top_indices[i][keep]], image_sizes[i])
+
+            keep = batched_nms(image_boxes, image_scores, image_labels, self.nms_thresh)
+            keep = keep[:self.detections_per_image]
+            detections.append({
+                "boxes": image_boxes[keep],
+                "scores": image_scores[keep],
+                "labels": image_labels[keep],
+            })
+        return detections
+
+    def _default_anchors(self, image_list):
+        """
+        Returns the default boxes for the model input size.
+
+        They only depend on the input size and the feature map sizes, so they
+        are computed once with the eager backbone and cached.
+        """
+        size = tuple(image_list.tensors.shape[-2:])
+        anchors = self._anchors.get(size)
+        if anchors is None:
+            probe = image_list.tensors[:1]
+            features = list(self.model.backbone(probe).values())
+            probe_list = type(image_list)(probe, image_list.image_sizes[:1])
+            anchors = self.model.anchor_generator(probe_list, features)[0]
+            self._anchors[size] = anchors
+        return anchors
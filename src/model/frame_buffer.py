@@ -0,0 +1,181 @@
+# frame_buffer.py
+from threading import Lock
+from time import monotonic
+
+import numpy as np
+
+
+class FrameLease:
+    """
+    A read-only view of one ring buffer slot.
+
+    While the lease is held the slot is pinned and the capture thread will not
+    write into it. The lease is returned to the buffer by `release()`, by
+    leaving a `with` block, or when the lease object is garbage collected.
+
+    Attributes:
+        frame (numpy.ndarray): Read-only view of the frame stored in the slot.
+        seq (int): Sequence number of the frame.
+        meta: Metadata committed together with the frame.
+        timestamp (float): `time.monotonic()` at which the frame was captured.
+    """
+
+    def __init__(self, buffer, index, seq, frame, meta, timestamp):
+        self._buffer = buffer
+        self._index = index
+        self.seq = seq
+        self.frame = frame
+        self.meta = meta
+        self.timestamp = timestamp
+
+    def release(self):
+        """Unpins the slot. Calling it more than once is a no-op."""
+        if self._buffer is not None:
+            self._buffer._unpin(self._index)
+            self._buffer = None
+            self.frame = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+    def __del__(self):
+        self.release()
+
+
+class FrameRingBuffer:
+    """
+    Preallocated ring of frame slots for the capture -> inference handoff.
+
+    The producer asks for a free slot with `acquire()`, writes the frame into
+    it in place and publishes it with `commit()`. Consumers borrow the most
+    recent frame with `borrow_latest()` without copying it. Slots are only
+    reallocated when the frame shape changes (e.g. after a reconnect with a
+    different resolution).
+
+    Attributes:
+        overwritten (int): Frames replaced by a newer one before anybody borrowed them.
+        busy (int): Calls to `acquire()` that found every slot in use.
+    """
+
+    def __init__(self, slots=3):
+        """
+        Initializes the ring buffer.
+
+        Args:
+            slots (int): Number of slots; at least 2 so that a new frame can be
+                written while the latest one is being read.
+        """
+        self.slots = max(2, int(slots))
+        self._buffers = [None] * self.slots
+        self._seqs = [0] * self.slots
+        self._meta = [None] * self.slots
+        self._times = [0.0] * self.slots
+        self._pins = [0] * self.slots
+        self._borrowed = [False] * self.slots
+        self._lock = Lock()
+        self._seq = 0
+        self._latest = -1
+        self._next = 0
+        self.overwritten = 0
+        self.busy = 0
+
+    def acquire(self, shape, dtype=np.uint8):
+        """
+        Returns a writable slot for the next frame.
+
+        The latest published slot and pinned slots are never handed out.
+
+        Args:
+            shape (tuple): Shape of the frame that will be written.
+            dtype: NumPy dtype of the frame.
+
+        Returns:
+            tuple: (slot index, writable numpy.ndarray) or (None, None) if every
+                slot is in use by consumers.
+        """
+        with self._lock:
+            for step in range(self.slots):
+                index = (self._next + step) % self.slots
+                if index != self._latest and self._pins[index] == 0:
+                    break
+            else:
+                self.busy += 1
+                return None, None
+
+            self._next = (index + 1) % self.slots
+            buf = self._buffers[index]
+            if buf is None or buf.shape != tuple(shape) or buf.dtype != dtype:
+                buf = np.empty(shape, dtype=dtype)
+                self._buffers[index] = buf
+            # The slot holds no valid frame until it is committed again
+            self._seqs[index] = 0
+            self._meta[index] = None
+            self._borrowed[index] = False
+            return index, buf
+
+    def commit(self, index, meta=None, timestamp=None):
+        """
+        Publishes the frame written into a slot as the latest frame.
+
+        Args:
+            index (int): Slot index returned by `acquire()`.
+            meta: Optional metadata stored with the frame.
+            timestamp (float, optional): Capture time (`time.monotonic()`),
+                defaults to the time of the commit.
+
+        Returns:
+            int: Sequence number assigned to the frame.
+        """
+        with self._lock:
+            latest = self._latest
+            if latest >= 0 and self._seqs[latest] and not self._borrowed[latest]:
+                self.overwritten += 1
+            self._seq += 1
+            self._seqs[index] = self._seq
+            self._meta[index] = meta
+            self._times[index] = monotonic() if timestamp is None else timestamp
+            self._latest = index
+            return self._seq
+
+    def borrow_latest(self):
+        """
+        Borrows the most recently committed frame without copying it.
+
+        Returns:
+            FrameLease or None: Lease on the latest frame, None if nothing was
+                committed yet.
+        """
+        with self._lock:
+            index = self._latest
+            if index < 0 or self._seqs[index] == 0:
+                return None
+            self._pins[index] += 1
+            self._borrowed[index] = True
+            view = self._buffers[index].view()
+            view.flags.writeable = False
+            return FrameLease(self, index, self._seqs[index], view,
+                              self._meta[index], self._times[index])
+
+    @property
+    def latest_seq(self):
+        """Sequence number of the latest committed frame (0 if none)."""
+        with self._lock:
+            return self._seqs[self._latest] if self._latest >= 0 else 0
+
+    def get_stats(self):
+        """
+        Returns the buffer counters.
+
+        Returns:
+            dict: Overwritten frames, failed acquisitions and currently leased slots.
+        """
+        with self._lock:
+            return {"overwritten": self.overwritten, "busy": self.busy,
+                    "leased": sum(1 for pins in self._pins if pins)}
+
+    def _unpin(self, index):
+        with self._lock:
+            self._pins[index] -= 1
@@ -0,0 +1,312 @@
+# frame_source.py
+from pathlib import Path
+from time import monotonic, sleep
+
+import cv2
+import numpy as np
+
+import logging
+from utils.logger import setup_logger
+setup_logger(__name__)
+
+
+class FrameSource:
+    """
+    Base class of the frame sources a ModelRunner can capture from.
+
+    The interface mirrors the subset of `cv2.VideoCapture` the runner uses
+    (`isOpened`, `read`, `grab`, `retrieve`, `set`, `release`), so a live
+    camera and an offline source are interchangeable. Frames are BGR uint8.
+
+    Offline sources either deliver frames as fast as they are asked for
+    (pacing "fast") or at their nominal frame rate (pacing "realtime").
+
+    Attributes:
+        PACINGS (tuple): Supported pacing modes.
+    """
+    PACINGS = ("fast", "realtime")
+
+    def __init__(self, fps=25.0, pacing="fast"):
+        """
+        Initializes the pacing state.
+
+        Args:
+            fps (float): Nominal frame rate of the source.
+            pacing (str): "fast" or "realtime".
+        """
+        if pacing not in self.PACINGS:
+            raise ValueError(f"Unknown pacing: {pacing}")
+        self.fps = float(fps) if fps and float(fps) > 0 else 25.0
+        self.pacing = pacing
+        self.frame_index = 0
+        self._started_at = None
+
+    def _pace(self):
+        """Sleeps until the next frame is due in realtime pacing."""
+        if self.pacing != "realtime":
+            return
+        now = monotonic()
+        if self._started_at is None:
+            self._started_at = now
+        due = self._started_at + self.frame_index / self.fps
+        if due > now:
+            sleep(due - now)
+
+    def isOpened(self):
+        """Returns True while frames can be read."""
+        raise NotImplementedError
+
+    def grab(self):
+        """Advances to the next frame without decoding it; returns True on success."""
+        raise NotImplementedError
+
+    def retrieve(self, image=None):
+        """
+        Decodes the grabbed frame.
+
+        Args:
+            image (numpy.ndarray, optional): Buffer to decode into if its shape matches.
+
+        Returns:
+            tuple: (bool: success, numpy.ndarray or None)
+        """
+        raise NotImplementedError
+
+    def read(self, image=None):
+        """Grabs and decodes the next frame, see `retrieve()`."""
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def set(self, prop, value):
+        """Capture properties are not supported by offline sources."""
+        return False
+
+    def release(self):
+        """Releases the resources of the source."""
+
+    @staticmethod
+    def _into(image, frame):
+        """Copies the frame into the caller's buffer when possible."""
+        if image is not None and image.shape == frame.shape and image.dtype == frame.dtype:
+            np.copyto(image, frame)
+            return image
+        return frame
+
+
+class CaptureSource(FrameSource):
+    """
+    Frame source backed by `cv2.VideoCapture`: RTSP streams and video files.
+
+    Video files can be replayed in a loop and paced at their own frame rate.
+    """
+
+    def __init__(self, url, api_preference=cv2.CAP_ANY, params=None,
+                 pacing="fast", loop=False, fps=None):
+        """
+        Opens the capture.
+
+        Args:
+            url (str): Stream URL or path of a video file.
+            api_preference (int): OpenCV backend, e.g. cv2.CAP_FFMPEG.
+            params (list, optional): Flat [property, value, ...] open parameters.
+            pacing (str): "fast" or "realtime" (only meaningful for files).
+            loop (bool): Restart a file from the beginning when it ends.
+            fps (float, optional): Frame rate used when the file does not report one.
+        """
+        self.capture = cv2.VideoCapture(url, api_preference, params or [])
+        source_fps = self.capture.get(cv2.CAP_PROP_FPS) if self.capture.isOpened() else 0
+        super().__init__(source_fps or fps, pacing)
+        self.loop = loop
+
+    def isOpened(self):
+        return self.capture.isOpened()
+
+    def grab(self):
+        self._pace()
+        ok = self.capture.grab()
+        if not ok and self.loop and self.frame_index > 0:
+            # Replay the file from the beginning
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok = self.capture.grab()
+        if ok:
+            self.frame_index += 1
+        return ok
+
+    def retrieve(self, image=None):
+        return self.capture.retrieve(image)
+
+    def read(self, image=None):
+        if self.pacing == "fast" and not self.loop:
+            # Live streams: keep the backend's own read path
+            ok, frame = self.capture.read(image)
+            if ok:
+                self.frame_index += 1
+            return ok, frame
+        return super().read(image)
+
+    def set(self, prop, value):
+        return self.capture.set(prop, value)
+
+    def release(self):
+        self.capture.release()
+
+
+class ImageDirectorySource(FrameSource):
+    """Frame source replaying the images of a directory in file name order."""
+
+    EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+    def __init__(self, path, fps=25.0, pacing="fast", loop=True):
+        """
+        Lists the images of the directory.
+
+        Args:
+            path (str): Directory with the images.
+            fps (float): Frame rate used for realtime pacing.
+            pacing (str): "fast" or "realtime".
+            loop (bool): Restart from the first image after the last one.
+        """
+        super().__init__(fps, pacing)
+        directory = Path(path)
+        self.files = sorted(p for p in directory.iterdir()
+                            if p.suffix.lower() in self.EXTENSIONS) if directory.is_dir() else []
+        self.loop = loop
+        self._current = None
+
+    def isOpened(self):
+        return bool(self.files) and (self.loop or self.frame_index < len(self.files))
+
+    def grab(self):
+        if not self.isOpened():
+            return False
+        self._pace()
+        self._current = self.files[self.frame_index % len(self.files)]
+        self.frame_index += 1
+        return True
+
+    def retrieve(self, image=None):
+        if self._current is None:
+            return False, None
+        frame = cv2.imread(str(self._current), cv2.IMREAD_COLOR)
+        if frame is None:
+            logging.error(f"Failed to read image {self._current}")
+            return False, None
+        return True, self._into(image, frame)
+
+    def release(self):
+        self.files = []
+
+
+class SyntheticSource(FrameSource):
+    """
+    Deterministic synthetic frames for benchmarks and tests without a camera.
+
+    Every frame is a pure function of the seed and the frame index: a few
+    coloured rectangles moving over a gray gradient.
+    """
+
+    def __init__(self, width=640, height=480, fps=25.0, pacing="fast", seed=0, objects=3):
+        """
+        Prepares the background and the object trajectories.
+
+        Args:
+            width (int): Frame width.
+            height (int): Frame height.
+            fps (float): Frame rate used for realtime pacing.
+            pacing (str): "fast" or "realtime".
+            seed (int): Seed of the object trajectories.
+            objects (int): Number of moving rectangles.
+        """
+        super().__init__(fps, pacing)
+        self.width = width
+        self.height = height
+        gradient = np.linspace(40, 200, width, dtype=np.float32).astype(np.uint8)
+        self._background = np.repeat(np.tile(gradient, (height, 1))[:, :, None], 3, axis=2)
+
+        rng = np.random.default_rng(seed)
+        self._objects = [
+            {
+                "size": (int(rng.integers(width // 12, width // 5)),
+                         int(rng.integers(height // 12, height // 5))),
+                "origin": (rng.uniform(0, width), rng.uniform(0, height)),
+                "velocity": (rng.uniform(-4, 4), rng.uniform(-4, 4)),
+                "color": tuple(int(c) for c in rng.integers(0, 256, 3)),
+            }
+            for _ in range(objects)
+        ]
+        self._opened = True
+
+    def isOpened(self):
+        return self._opened
+
+    def grab(self):
+        if not self._opened:
+            return False
+        self._pace()
+        self.frame_index += 1
+        return True
+
+    def retrieve(self, image=None):
+        if not self._opened:
+            return False, None
+        shape = self._background.shape
+        frame = image if image is not None and image.shape == shape else np.empty(shape, np.uint8)
+        np.copyto(frame, self._background)
+
+        t = self.frame_index
+        for obj in self._objects:
+            w, h = obj["size"]
+            x = int(obj["origin"][0] + obj["velocity"][0] * t) % max(1, self.width - w)
+            y = int(obj["origin"][1] + obj["velocity"][1] * t) % max(1, self.height - h)
+            cv2.rectangle(frame, (x, y), (x + w, y + h), obj["color"], -1)
+        return True, frame
+
+    def release(self):
+        self._opened = False
+
+
+SOURCE_TYPES = ("rtsp", "video", "images", "synthetic")
+
+
+def open_frame_source(settings, params=None):
+    """
+    Opens the frame source described by the camera settings.
+
+    Settings used: source_type ("rtsp" by default, "video", "images", "synthetic"),
+    rtsp_url, source_path, source_pacing ("realtime" by default for offline
+    sources), source_loop, source_resolution ("WIDTHxHEIGHT") and fps.
+
+    Args:
+        settings (dict): Camera settings.
+        params (list, optional): Open/read timeout parameters for cv2.VideoCapture.
+
+    Returns:
+        FrameSource: The opened source (check `isOpened()`).
+    """
+    source_type = settings.get("source_type", "rtsp")
+    pacing = settings.get("source_pacing", "realtime")
+    loop = settings.get("source_loop", True)
+    fps = settings.get("fps")
+
+    if source_type == "rtsp":
+        return CaptureSource(settings["rtsp_url"], cv2.CAP_FFMPEG, params)
+    if source_type == "video":
+        return CaptureSource(settings["source_path"], cv2.CAP_ANY, params,
+                             pacing=pacing, loop=loop, fps=fps)
+    if source_type == "images":
+        return ImageDirectorySource(settings["source_path"], fps, pacing, loop)
+    if source_type == "synthetic":
+        width, height = settings.get("source_resolution", (640, 480))
+        return SyntheticSource(width, height, fps, pacing, seed=settings.get("source_seed", 0))
+    raise ValueError(f"Unknown source type: {source_type}")
+
+
+def describe_frame_source(settings):
+    """Returns a human readable name of the configured source for error messages."""
+    source_type = settings.get("source_type", "rtsp")
+    if source_type == "rtsp":
+        return settings.get("rtsp_url", "unknown URL")
+    if source_type == "synthetic":
+        return "synthetic source"
+    return f"{source_type} source {settings.get('source_path', '')}"
@@ -0,0 +1,220 @@
+# model_cache.py
+from collections import OrderedDict
+from threading import Lock
+from time import perf_counter
+
+import numpy as np
+
+from model.architectures import get_architecture
+from model.detector import Detector
+
+import logging
+from utils.logger import setup_logger
+setup_logger(__name__)
+
+
+def memory_usage_mb():
+    """
+    Returns the resident memory of the process.
+
+    Reads /proc/self/status where available and falls back to the peak
+    resident size reported by `resource` on other POSIX systems.
+
+    Returns:
+        float or None: Resident set size in MiB, None if it cannot be measured.
+    """
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024.0, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Bytes on macOS, KiB elsewhere
+        return round(peak / (1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0), 1)
+    except (ImportError, OSError):
+        return None
+
+
+class DetectorCache:
+    """
+    Process-wide cache of loaded and warmed-up detectors.
+
+    Detectors are keyed on architecture, precision, backend and the settings
+    the backend is built from (see `Detector.DETECTOR_SETTINGS`), so a runner
+    that is recreated after a reconnect or a settings change gets the model
+    that is already in memory instead of loading the weights again. The fp32
+    network of an architecture is loaded once and shared by all its variants.
+
+    The least recently used detectors are evicted beyond `max_entries`;
+    `evict()` and `clear()` release them explicitly.
+    """
+
+    def __init__(self, max_entries=2):
+        """
+        Initializes an empty cache.
+
+        Args:
+            max_entries (int): Maximal number of cached detectors, at least 1.
+        """
+        self.max_entries = max(1, int(max_entries))
+        self._detectors = OrderedDict()
+        self._models = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.last_build_ms = 0.0
+
+    @staticmethod
+    def key(settings):
+        """
+        Returns the cache key of the detector for the given settings.
+
+        Args:
+            settings (dict): Model settings.
+
+        Returns:
+            tuple: (architecture, precision, backend, remaining detector settings).
+        """
+        precision = settings.get("precision") or "fp32"
+        backend = settings.get("backend") or "eager"
+        rest = tuple(str(settings.get(name)) for name in Detector.DETECTOR_SETTINGS
+                     if name not in ("model_arch", "precision", "backend"))
+        model_name = get_architecture(settings.get("model_arch")).model_name
+        return model_name, precision, backend, rest
+
+    def get(self, settings):
+        """
+        Returns a detector for the settings, building and warming it up on a miss.
+
+        The detector's thresholds are updated to the settings in both cases.
+
+        Args:
+            settings (dict): Model settings, see `Detector`.
+
+        Returns:
+            Detector: The cached detector.
+        """
+        key = self.key(settings)
+        with self._lock:
+            detector = self._detectors.get(key)
+            if detector is not None:
+                self._detectors.move_to_end(key)
+                self.hits += 1
+                detector.set_thresholds(settings)
+                logging.debug(f"Reusing cached detector {key[:3]}")
+                return detector
+
+            self.misses += 1
+            started = perf_counter()
+            model = self._models.get(key[0])
+            detector = Detector(settings, model)
+            self._models[key[0]] = detector.model
+            self.warm_up(detector)
+            self.last_build_ms = 1000.0 * (perf_counter() - started)
+
+            self._detectors[key] = detector
+            while len(self._detectors) > self.max_entries:
+                self._evict(next(iter(self._detectors)))
+            logging.info(f"Detector {key[:3]} loaded in {self.last_build_ms:.0f} ms, "
+                         f"process memory {memory_usage_mb()} MiB")
+            return detector
+
+    @staticmethod
+    def warm_up(detector, runs=1):
+        """
+        Runs forward passes on a blank frame, so lazy initialization (anchors,
+        backend graph optimizations, allocator pools) does not slow down the
+        first real frame.
+
+        Args:
+            detector (Detector): Detector to warm up.
+            runs (int): Number of forward passes.
+        """
+        image = np.zeros((*detector.image_size, 3), np.uint8)
+        for _ in range(runs):
+            detector.predict([image])
+
+    def evict(self, settings=None):
+        """
+        Removes a detector from the cache.
+
+        Runners still holding it keep working; its memory is released once the
+        last of them is gone.
+
+        Args:
+            settings (dict, optional): Settings of the detector to evict; all
+                detectors are evicted if omitted.
+        """
+        with self._lock:
+            keys = [self.key(settings)] if settings is not None else list(self._detectors)
+            for key in keys:
+                self._evict(key)
+
+    def _evict(self, key):
+        if self._detectors.pop(key, None) is None:
+            return
+        self.evictions += 1
+        # Keep the shared fp32 network only while a detector of its architecture is cached
+        if not any(cached[0] == key[0] for cached in self._detectors):
+            self._models.pop(key[0], None)
+        logging.debug(f"Evicted detector {key[:3]}")
+
+    def clear(self):
+        """Evicts all detectors and the shared networks."""
+        self.evict()
+        with self._lock:
+            self._models.clear()
+
+    def __contains__(self, settings):
+        with self._lock:
+            return self.key(settings) in self._detectors
+
+    def __len__(self):
+        with self._lock:
+            return len(self._detectors)
+
+    def get_stats(self):
+        """
+        Returns the cache counters and the current process memory.
+
+        Returns:
+            dict: cached entries, hits, misses, evictions, duration of the last
+                build in ms and the resident memory in MiB.
+        """
+        with self._lock:
+            entries = [list(key[:3]) for key in self._detectors]
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "last_build_ms": round(self.last_build_ms, 1),
+            "memory_mb": memory_usage_mb(),
+        }
+
+
+DETECTOR_CACHE = DetectorCache()
+
+
+def get_detector(settings):
+    """
+    Returns the process-wide cached detector for the settings.
+
+    A "model_arch" of "auto" is resolved here, on the thread that builds the
+    detector, see `model.arch_selector.resolve_architecture()`.
+
+    Args:
+        settings (dict): Model settings, see `Detector`.
+
+    Returns:
+        Detector: The cached detector.
+    """
+    # Imported here: the selector benchmarks through the runner, which imports this module
+    from model.arch_selector import resolve_architecture
+    return DETECTOR_CACHE.get(resolve_architecture(settings))
@@ -3,26 +3,111 @@ import hashlib
 import json
 import logging
 import threading
+from dataclasses import dataclass, field
 from pathlib import Path
 from datetime import datetime
+from time import perf_counter, time
 
 from PySide6.QtGui import QImage
 
-from model.model_runner import ModelRunner
+from model.architectures import ARCHITECTURES, DEFAULT_ARCHITECTURE
+from model.backends import BACKENDS
+from model.cascade import HEAVY_MODELS, Cascade, merge_detections
+from model.detector import Detector
+from model.model_cache import DETECTOR_CACHE, get_detector
+from model.frame_source import SOURCE_TYPES, FrameSource, describe_frame_source
+from model.model_runner import FullFrame, ModelRunner
+from model.pipeline import Pipeline
+from model.scheduler import RateScheduler
+from model.settings_store import SettingsStore, freeze, thaw
+from model.snapshot_writer import SnapshotWriter
+from model.precision import PRECISIONS
 from database.tables.ObjectItem import ObjectItem
 
+from utils.box_renderer import get_renderer
 from utils.logger import setup_logger
+from utils.qimage import numpy_to_qimage
 
 setup_logger(__name__)
 
 
+@dataclass
+class FrameBatch:
+    """Frames of one collection round travelling through the processing steps."""
+    samples: list
+    errors: list
+    timestamp: str
+    predictions: list = None
+    changed: list = None
+    results: list = field(default_factory=list)
+
+
+@dataclass
+class AnnotatedFrame:
+    """
+    Latest frame of a camera with its detections kept as data; the full
+    frame is converted and the annotated image drawn only when requested.
+    """
+    frame: FullFrame
+    boxes: object
+    labels: list
+    _original: QImage = None
+    _annotated: QImage = None
+
+    @property
+    def image(self):
+        """Full-resolution RGB uint8 frame."""
+        return self.frame.rgb()
+
+    def original(self):
+        """
+        Returns the frame without boxes, wrapping it on the first call.
+
+        Returns:
+            QImage: Original frame.
+        """
+        if self._original is None:
+            self._original = numpy_to_qimage(self.image)
+        return self._original
+
+    def annotated(self):
+        """
+        Returns the frame with the boxes drawn, rendering it on the first call.
+
+        Returns:
+            QImage: Annotated frame (the original one if there are no boxes).
+        """
+        if self._annotated is None:
+            if not len(self.boxes):
+                self._annotated = self.original()
+            else:
+                image = get_renderer(color=(255, 0, 0), thickness=4, font_height=30).draw(
+                    self.image.copy(), self.boxes, self.labels)
+                self._annotated = numpy_to_qimage(image)
+        return self._annotated
+
+
 class ModelManager:
     """
-    Manages the lifecycle of the model runner, including settings validation,
-    initialization, frame processing, and database writing.
+    Manages the lifecycle of the model runners (one per camera) and the detector
+    they share, including settings validation, initialization, batched frame
+    processing, and database writing.
+
+    Several cameras are configured with a "cameras" list in camera_settings.json;
+    each entry overrides the common settings (at least "rtsp_url") and may set an
+    "id". Without the list the top-level settings describe a single camera "0".
+    A camera can also read from an offline source (video file, image directory
+    or synthetic frames) through "source_type", see `model.frame_source`.
 
     Attributes:
         REQUIRED_SETTINGS (list): List of mandatory settings keys.
+        FRAME_TIMEOUT (float): Seconds to wait for a frame from any camera.
+        CONNECT_TIMEOUT (float): Seconds to wait for a new runner to connect.
+        PIPELINE_QUEUE_SIZES (dict): Inbox size of each pipeline stage; persisting
+            gets a deeper queue so bursts of detections are not dropped.
+        RUNTIME_SETTINGS (list): Settings applied to the running detector and
+            the rate scheduler without recreating the runners.
+        CASCADE_SETTINGS (list): Settings of the heavy detector tier, see `model.cascade`.
     """
     REQUIRED_SETTINGS = [
         "rtsp_url",
@@ -32,25 +117,72 @@ class ModelManager:
         "detections_per_image",
         "save_folder"
     ]
-
-    def __init__(self):
+    FRAME_TIMEOUT = 5.0
+    CONNECT_TIMEOUT = 5.0
+    PIPELINE_QUEUE_SIZES = {"infer": 1, "render": 1, "persist": 8}
+    RUNTIME_SETTINGS = Detector.RUNTIME_SETTINGS + ["threshold", "object_count",
+                                                    "min_fps", "max_fps"]
+    CASCADE_SETTINGS = ["cascade", "heavy_model", "heavy_duty_cycle", "heavy_interval"]
+
+    def __init__(self, settings_dir=None, connect=True):
         """
         Initializes the ModelManager with default values and updates settings.
+
+        Args:
+            settings_dir (str or Path, optional): Directory with camera_settings.json
+                and model_settings.json; defaults to the repository "settings" folder.
+            connect (bool): Load the detector and connect the cameras right away;
+                otherwise the first `update_settings()` call does it (e.g. on the
+                model thread, so the GUI thread never waits for a model).
         """
-        self._current_runner = None
+        self.settings_dir = Path(settings_dir) if settings_dir else \
+            Path(__file__).parent.parent.parent / "settings"
+        self._runners = {}
+        self._detector = None
+        self._cascade = None
+        self._cascade_hash = None
+        self._frame_notify = threading.Event()
+        self._multi_camera = False
         self.error_msg = None
-        self.image1 = None
-        self.image2 = None
+        self.images = {}
+        self.model_view = False
         self._current_settings_hash = None
+        self._current_structure_hash = None
+        self._settings = None
+        self._settings_store = SettingsStore(
+            [self.settings_dir / "camera_settings.json", self.settings_dir / "model_settings.json"],
+            self._load_settings)
         self.reconnect = False
         self._lock = threading.Lock()
-        self.update_settings()
+        self._pipeline = None
+        self._pipeline_stop = threading.Event()
+        self._images_ready = threading.Event()
+        self.scheduler = RateScheduler()
+        self.snapshot_writer = SnapshotWriter()
+        if connect:
+            self.update_settings()
 
     def _get_settings_hash(self, settings):
         """Creates a hash of the current settings for comparison."""
         settings_str = json.dumps(settings, sort_keys=True)
         return hashlib.md5(settings_str.encode()).hexdigest()
 
+    def _get_structure_hash(self, settings):
+        """
+        Creates a hash of the settings that require new runners when changed,
+        i.e. all settings except the detector's runtime thresholds.
+        """
+        if settings is None:
+            return None
+        runtime = set(self.RUNTIME_SETTINGS)
+        structure = {key: value for key, value in settings.items() if key not in runtime}
+        if "cameras" in structure:
+            structure["cameras"] = [
+                {key: value for key, value in camera.items() if key not in runtime}
+                for camera in structure["cameras"]
+            ]
+        return self._get_settings_hash(structure)
+
     def _check_settings_changed(self):
         """
         Checks if settings have changed.
@@ -58,11 +190,12 @@ class ModelManager:
         Returns:
             tuple: (bool: changed, dict: new_settings, str: new_hash)
         """
-        new_settings = self._get_settings()
-        if new_settings is None:
+        self._settings_store.refresh()
+        snapshot = self._settings_store.snapshot
+        if snapshot is None:
+            self.error_msg = self._settings_store.error
             return False, None, None
-        new_hash = self._get_settings_hash(new_settings)
-        return new_hash != self._current_settings_hash, new_settings, new_hash
+        return snapshot.hash != self._current_settings_hash, thaw(snapshot.values), snapshot.hash
 
     def _validate_settings(self, settings):
         """
@@ -78,7 +211,14 @@ class ModelManager:
             self.error_msg = "Settings not found"
             return False
 
-        missing = [key for key in self.REQUIRED_SETTINGS if key not in settings]
+        required = list(self.REQUIRED_SETTINGS)
+        source_type = settings.get("source_type", "rtsp")
+        if source_type != "rtsp":
+            required.remove("rtsp_url")
+        if source_type in ("video", "images"):
+            required.append("source_path")
+
+        missing = [key for key in required if key not in settings]
         if missing:
             self.error_msg = f"Missing required settings: {', '.join(missing)}"
             return False
@@ -87,10 +227,15 @@ class ModelManager:
 
     def _create_runner_with_timeout(self, settings):
         """
-        Creates the ModelRunner with a timeout of 5 seconds.
+        Creates the ModelRunner for one camera and waits up to CONNECT_TIMEOUT
+        seconds for it to connect.
+
+        The runner connects in its own capture thread, so nothing is abandoned
+        on timeout: a runner that is still connecting is returned together with
+        the error and keeps retrying with backoff.
 
         Args:
-            settings (dict): The settings to initialize the runner.
+            settings (dict): The per-camera settings to initialize the runner.
 
         Returns:
             tuple: (ModelRunner instance or None, error message or None)
@@ -98,90 +243,215 @@ class ModelManager:
         if not self._validate_settings(settings):
             return None, self.error_msg
 
-        runner = None
-        error = None
-        thread_completed = threading.Event()  # Событие для отслеживания завершения потока
+        try:
+            runner = ModelRunner(settings, self._detector, self._frame_notify,
+                                 self._frames_held(settings))
+        except Exception as e:
+            return None, f"Model initialization error: {str(e)}"
 
-        def target():
-            nonlocal runner, error
-            try:
-                runner = ModelRunner(settings)
-                if runner.error_msg is not None:
-                    error = runner.error_msg
-                    runner.release()
-                    runner = None
-            except Exception as e:
-                error = f"Model initialization error: {str(e)}"
-            finally:
-                thread_completed.set()  # Уведомляем о завершении потока
-
-        thread = threading.Thread(target=target)
-        thread.daemon = True
-        thread.start()
-        thread.join(timeout=5)  # Ждем не более 5 секунд
-
-        if not thread_completed.is_set():  # Если поток не завершился за 5 секунд
-            # Принудительно завершаем поток (не рекомендуется, но в данном случае необходимо)
-            # Альтернатива - установить флаг, который поток будет проверять
-            self.reconnect = True
-            error = "Camera connection timed out (5 seconds)"
-            
-            # Если runner был частично создан, освобождаем ресурсы
-            if runner is not None:
-                runner.release()
-            
+        if runner.capture_thread is None:
+            # Model or thread initialization failed, there is nothing to wait for
+            error = runner.error_msg
+            runner.release()
             return None, error
 
-        if runner is None and error is None:
-            self.reconnect = True
-            error = "Failed to connect to the video stream"
+        if not runner.connected.wait(timeout=self.CONNECT_TIMEOUT):
+            error = runner.error_msg or \
+                f"Camera connection timed out ({self.CONNECT_TIMEOUT:g} seconds)"
+            return runner, error
+
+        return runner, None
+
+    def _frames_held(self, settings):
+        """
+        Counts the grabbed frames of one camera the processing keeps at the
+        same time, each pinning a slot of the runner's ring buffer: the frame
+        being processed and the one shown by the GUI, and in pipeline mode one
+        frame per stage up to rendering plus the frames in their inboxes.
+        Frames are converted before they enter the persist inbox, so it does
+        not count (see `_render_step()`).
+
+        Args:
+            settings (dict): The per-camera settings.
 
-        return runner, error
+        Returns:
+            int: Number of frames.
+        """
+        if not settings.get("pipeline"):
+            return 2
+        queued = sum(self.PIPELINE_QUEUE_SIZES[stage] for stage in ("infer", "render"))
+        # collect, infer and render stages, and the displayed frame
+        return 3 + queued + 1
+
+    def _release_runners(self):
+        """Releases the runners of all cameras."""
+        for runner in self._runners.values():
+            runner.release()
+        if self._runners:
+            logging.debug("Released previous runners")
+        self._runners = {}
+        self.images = {}
 
     def update_settings(self):
         """
-        Updates the settings and recreates the ModelRunner if needed.
+        Updates the settings and recreates the runners when needed; the shared
+        detector is taken from the process-wide cache (see `model.model_cache`).
+
+        A change of the thresholds only is applied to the running detector,
+        without reconnecting the cameras.
         """
         #logging.info("Update settings called")
         with self._lock:
             settings_changed, new_settings, new_hash = self._check_settings_changed()
 
-            if not self.reconnect and not settings_changed and \
-                    self._current_runner is not None:
+            if not self.reconnect and not settings_changed and self._runners:
                 logging.debug("Nothing to update")
                 return
 
-            if self._current_runner is not None:
-                self._current_runner.release()
-                self._current_runner = None
-                logging.debug("Released previous runner")
+            structure_hash = self._get_structure_hash(new_settings)
+            if not self.reconnect and self._runners and self._detector is not None \
+                    and structure_hash == self._current_structure_hash:
+                self._current_settings_hash = new_hash
+                self._settings = freeze(new_settings)
+                self._apply_runtime_settings(new_settings)
+                return
+
+            self._release_runners()
 
             if new_settings is None:
                 return
 
             self._current_settings_hash = new_hash
+            self._current_structure_hash = structure_hash
+            self._settings = freeze(new_settings)
+            self.scheduler.configure_from(new_settings)
+            cameras = new_settings["cameras"]
+            self._multi_camera = len(cameras) > 1
 
-            self._current_runner, error = self._create_runner_with_timeout(new_settings)
+            if not all(self._validate_settings(camera) for camera in cameras):
+                self.reconnect = True
+                return
 
-            if self._current_runner is None:
-                rtsp_url = new_settings.get("rtsp_url", "unknown URL")
-                self.error_msg = (f"Failed to connect to the camera at: {rtsp_url}\n"
+            if self._detector is None or not self._detector.matches(new_settings):
+                self._detector = None
+                try:
+                    self._detector = get_detector(new_settings)
+                except Exception as e:
+                    self.error_msg = f"Model initialization error: {str(e)}"
+                    self.reconnect = True
+                    return
+                logging.debug("Shared detector selected")
+            else:
+                self._apply_runtime_settings(new_settings)
+            self._update_cascade(new_settings)
+
+            errors = []
+            for camera in cameras:
+                runner, error = self._create_runner_with_timeout(camera)
+                if runner is not None:
+                    # Runners that are still connecting retry on their own
+                    self._runners[runner.camera_id] = runner
+                if error is not None:
+                    source = describe_frame_source(camera)
+                    errors.append(f"Failed to connect to the camera at: {source}\n"
                                   f"Reason: {error}")
-                self.reconnect = True
+
+            if errors:
+                self.error_msg = "\n".join(errors)
+                self.reconnect = not self._runners
                 return
 
-            logging.debug("Runner created successfully")
+            logging.debug(f"Runners created successfully, model cache: {DETECTOR_CACHE.get_stats()}")
+            self.reconnect = False
             self.error_msg = None
 
+    def _apply_runtime_settings(self, settings):
+        """
+        Passes the thresholds to the shared detector and the rate limits to the scheduler.
+
+        Args:
+            settings (dict): Combined settings.
+        """
+        self.scheduler.configure_from(settings)
+        if self._cascade is not None:
+            self._cascade.set_thresholds(settings)
+        if self._detector.set_thresholds(settings):
+            logging.info("Detector thresholds updated: " + ", ".join(
+                f"{key}={settings[key]}" for key in Detector.RUNTIME_SETTINGS))
+
+    def _update_cascade(self, settings):
+        """
+        Starts, restarts or stops the heavy detector tier according to the
+        "cascade" settings; an unchanged tier keeps its loaded model.
+
+        Args:
+            settings (dict): Combined settings.
+        """
+        cascade_hash = self._get_settings_hash(
+            {key: settings.get(key) for key in self.CASCADE_SETTINGS})
+        if self._cascade is not None and cascade_hash == self._cascade_hash:
+            self._cascade.set_thresholds(settings)
+            return
+
+        self._stop_cascade()
+        self._cascade_hash = cascade_hash
+        if settings["cascade"]:
+            self._cascade = Cascade(settings)
+            logging.info(f"Cascade detection enabled with {settings['heavy_model']}")
+
+    def _stop_cascade(self):
+        """Stops the heavy detector tier, if running."""
+        if self._cascade is not None:
+            self._cascade.stop()
+            self._cascade = None
+            self._cascade_hash = None
+
+    def settings_changed(self):
+        """
+        Checks whether the settings files differ from the applied settings.
+
+        Returns:
+            bool: True if `update_settings()` has something to apply.
+        """
+        return self.check_settings_hash() != self._current_settings_hash
+
+    def get_settings(self):
+        """
+        Returns the current settings without reading the files.
+
+        Returns:
+            MappingProxyType or None: Read-only settings, None if they cannot be loaded.
+        """
+        snapshot = self._settings_store.snapshot
+        return snapshot.values if snapshot is not None else None
+
+    def _load_settings(self):
+        """
+        Loader of the settings store: parses the settings files.
+
+        Returns:
+            dict: Combined settings.
+
+        Raises:
+            ValueError: With the error message if the settings cannot be loaded.
+        """
+        settings = self._get_settings()
+        if settings is None:
+            raise ValueError(self.error_msg or "Failed to load data from settings")
+        return settings
+
     def _get_settings(self):
         """
         Loads and combines camera and model settings from JSON files.
 
+        Called by the settings store when the files changed; the rest of the
+        manager uses the store's snapshots.
+
         Returns:
             dict or None: Combined settings or None if error occurs.
         """
         try:
-            settings_dir = Path(__file__).parent.parent.parent / "settings"
+            settings_dir = self.settings_dir
             camera_settings_path = settings_dir / "camera_settings.json"
             model_settings_path = settings_dir / "model_settings.json"
 
@@ -213,6 +483,8 @@ class ModelManager:
 
             try:
                 settings["fps"] = int(settings.get("fps"))
+                settings["max_fps"] = float(settings.get("max_fps") or settings["fps"])
+                settings["min_fps"] = min(float(settings.get("min_fps") or 1.0), settings["max_fps"])
                 settings["nms_thresh"] = 0.3
                 settings["score_thresh"] = float(settings.get("threshold"))
 
@@ -229,8 +501,46 @@ class ModelManager:
                     settings["save_folder"] = "detections"
 
                 settings["detections_per_image"] = int(settings.get("object_count"))
-            except (TypeError, ValueError):
-                self.error_msg = "Failed to load data from settings"
+                settings["convert_on_consume"] = self._parse_bool(
+                    settings.get("convert_on_consume", False))
+                settings["frame_buffer_slots"] = int(settings.get("frame_buffer_slots") or 3)
+                settings["reconnect_base_delay"] = float(settings.get("reconnect_base_delay") or 0.5)
+                settings["reconnect_max_delay"] = float(settings.get("reconnect_max_delay") or 30.0)
+                settings["motion_sensitivity"] = float(settings.get("motion_sensitivity") or 0.0)
+                settings["motion_refresh_interval"] = float(
+                    settings.get("motion_refresh_interval") or 30.0)
+                settings["batch_size"] = int(settings.get("batch_size") or 4)
+                settings["detect_interval"] = max(1, int(settings.get("detect_interval") or 1))
+                settings["cascade"] = self._parse_bool(settings.get("cascade", False))
+                settings["heavy_model"] = str(settings.get("heavy_model") or "fasterrcnn_mobilenet").lower()
+                if settings["heavy_model"] not in HEAVY_MODELS:
+                    raise ValueError(f"Unknown heavy model: {settings['heavy_model']}")
+                settings["heavy_duty_cycle"] = float(settings.get("heavy_duty_cycle") or 0.1)
+                settings["heavy_interval"] = float(settings.get("heavy_interval") or 300.0)
+                settings["pipeline"] = self._parse_bool(settings.get("pipeline", False))
+                settings["backend"] = str(settings.get("backend") or "eager").lower()
+                if settings["backend"] not in BACKENDS:
+                    raise ValueError(f"Unknown inference backend: {settings['backend']}")
+                settings["backend_dir"] = settings.get("backend_dir") or None
+                settings["precision"] = str(settings.get("precision") or "fp32").lower()
+                if settings["precision"] not in PRECISIONS:
+                    raise ValueError(f"Unknown precision: {settings['precision']}")
+                settings["calibration_dir"] = settings.get("calibration_dir") or None
+                settings["calibration_frames"] = int(settings.get("calibration_frames") or 32)
+                settings["latency_budget_ms"] = float(settings.get("latency_budget_ms") or 100.0)
+                settings["calibration_clip"] = settings.get("calibration_clip") or None
+                settings["model_arch"] = str(settings.get("model_arch") or DEFAULT_ARCHITECTURE).lower()
+                # "auto" is resolved when the detector is built, see `model.model_cache`
+                if settings["model_arch"] != "auto" and settings["model_arch"] not in ARCHITECTURES:
+                    raise ValueError(f"Unknown model architecture: {settings['model_arch']}")
+                settings["capture_process"] = self._parse_bool(
+                    settings.get("capture_process", False))
+                settings["capture_mode"] = str(settings.get("capture_mode") or "read").lower()
+                if settings["capture_mode"] not in ("read", "grab"):
+                    raise ValueError(f"Unknown capture mode: {settings['capture_mode']}")
+                settings["cameras"] = self._split_camera_settings(settings)
+            except (TypeError, ValueError) as e:
+                self.error_msg = f"Failed to load data from settings: {e}"
                 return None
 
             return settings
@@ -239,97 +549,550 @@ class ModelManager:
             self.error_msg = f"Settings loading error: {str(e)}"
             return None
 
+    def _split_camera_settings(self, settings):
+        """
+        Builds the settings of every configured camera.
+
+        Args:
+            settings (dict): Combined settings, optionally with a "cameras" list.
+
+        Returns:
+            list: Per-camera settings dicts, each with a "camera_id".
+
+        Raises:
+            ValueError: If a camera entry is malformed.
+        """
+        common = {key: value for key, value in settings.items() if key != "cameras"}
+        cameras = settings.get("cameras")
+        if not cameras:
+            return [self._parse_camera_settings({**common, "camera_id": "0"})]
+
+        result = []
+        for index, camera in enumerate(cameras):
+            if not isinstance(camera, dict):
+                raise ValueError(f"Invalid camera entry: {camera}")
+            camera_settings = {**common, **camera, "camera_id": str(camera.get("id", index))}
+            result.append(self._parse_camera_settings(camera_settings))
+
+        if len({camera["camera_id"] for camera in result}) != len(result):
+            raise ValueError("Camera ids must be unique")
+        return result
+
+    def _parse_camera_settings(self, camera):
+        """
+        Converts the camera-level settings of one camera to their typed values.
+
+        Args:
+            camera (dict): Settings of one camera, modified in place.
+
+        Returns:
+            dict: The same settings dict.
+
+        Raises:
+            ValueError: If a value is malformed.
+        """
+        camera["analysis_width"] = int(camera.get("analysis_width") or 0)
+        camera["crop"] = self._parse_crop(camera.get("crop"))
+
+        camera["source_type"] = str(camera.get("source_type") or "rtsp").lower()
+        if camera["source_type"] not in SOURCE_TYPES:
+            raise ValueError(f"Unknown source type: {camera['source_type']}")
+        camera["source_pacing"] = str(camera.get("source_pacing") or "realtime").lower()
+        if camera["source_pacing"] not in FrameSource.PACINGS:
+            raise ValueError(f"Unknown source pacing: {camera['source_pacing']}")
+        camera["source_loop"] = self._parse_bool(camera.get("source_loop", True))
+        camera["source_seed"] = int(camera.get("source_seed") or 0)
+
+        resolution = camera.get("source_resolution") or "640x480"
+        if isinstance(resolution, str):
+            resolution = resolution.lower().split("x")
+        camera["source_resolution"] = [int(v) for v in resolution]
+        if len(camera["source_resolution"]) != 2 or min(camera["source_resolution"]) <= 0:
+            raise ValueError(f"Invalid source resolution: {resolution}")
+        return camera
+
+    @staticmethod
+    def _parse_bool(value):
+        """
+        Parses a boolean setting stored either as a JSON bool or a string.
+
+        Args:
+            value (bool or str): The raw setting value.
+
+        Returns:
+            bool: The parsed value.
+        """
+        if isinstance(value, str):
+            return value.strip().lower() in ("1", "true", "yes", "on")
+        return bool(value)
+
+    @staticmethod
+    def _parse_crop(crop):
+        """
+        Parses the crop rectangle setting.
+
+        Args:
+            crop (str or list or None): Rectangle as 'x,y,width,height' or a list of 4 numbers.
+
+        Returns:
+            list or None: [x, y, width, height] in full-frame pixels, or None if cropping is off.
+
+        Raises:
+            ValueError: If the rectangle is malformed.
+        """
+        if not crop:
+            return None
+        if isinstance(crop, str):
+            crop = crop.split(",")
+        rect = [int(float(v)) for v in crop]
+        if len(rect) != 4 or rect[2] <= 0 or rect[3] <= 0:
+            raise ValueError(f"Invalid crop rectangle: {crop}")
+        return rect
+
     def check_settings_hash(self):
         """
-        Returns the hash of the current settings.
+        Returns the hash of the current settings; the files are only parsed
+        again if they changed (see `model.settings_store`).
 
         Returns:
             str: Settings hash.
         """
-        tmp_settings = self._get_settings()
-        return self._get_settings_hash(tmp_settings)
+        self._settings_store.refresh()
+        snapshot = self._settings_store.snapshot
+        return snapshot.hash if snapshot is not None else self._get_settings_hash(None)
+
+    def _collect_frames(self):
+        """
+        Grabs the latest frame of every camera that has a new one, waiting up to
+        FRAME_TIMEOUT seconds until at least one camera delivers a frame.
+
+        Returns:
+            list: (runner, sample) pairs, where sample is the result of
+                `ModelRunner.grab_frame()` (possibly ModelRunner.UNCHANGED).
+        """
+        # The runners can be replaced by update_settings() meanwhile (pipeline mode)
+        runners = list(self._runners.values())
+        for runner in runners:
+            runner.request_frame()
+
+        deadline = time() + self.FRAME_TIMEOUT
+        while True:
+            self._frame_notify.clear()
+            ready = [runner for runner in runners if runner.frame_ready.is_set()]
+            if ready:
+                break
+
+            remaining = deadline - time()
+            if remaining <= 0 or not self._frame_notify.wait(remaining):
+                for runner in runners:
+                    runner.error_msg = runner.error_msg or "No frames available yet (timeout)"
+                return []
+
+        samples = []
+        for runner in ready:
+            sample = runner.grab_frame(timeout=0)
+            if sample is not None:
+                samples.append((runner, sample))
+        return samples
+
+    def _runner_errors(self):
+        """
+        Collects the errors reported by the runners.
+
+        Returns:
+            list: Error messages, prefixed with the camera id for several cameras.
+        """
+        errors = []
+        for camera_id, runner in self._runners.items():
+            # Lost streams are reconnected by the runner itself,
+            # so the runners are not rebuilt here
+            if runner.error_msg is not None:
+                prefix = f"Camera {camera_id}: " if self._multi_camera else ""
+                errors.append(f"{prefix}Video stream processing error: {runner.error_msg}")
+        return errors
 
     def write_to_db(self, db_manager):
         """
-        Processes the current frame and writes detection results to the database.
+        Processes the latest frames of all cameras in one batched forward pass
+        and writes detection results to the database.
+
+        Runs the collect, infer, render and persist steps one after another;
+        `start_pipeline()` runs the same steps as overlapping pipeline stages.
+        The processing time is reported to the rate scheduler, see `scheduler.delay()`.
 
         Args:
             db_manager: The database manager instance.
         """
-        #logging.info("Attempting to process new incoming image")
+        batch = self._collect_step()
+        if batch is None:
+            self.scheduler.idle()
+            return
+        self.scheduler.start()
+        started = perf_counter()
+        for step in (self._infer_step, self._render_step):
+            batch = step(batch)
+            if batch is None:
+                return
+        self._persist_step(batch, db_manager)
+        self.scheduler.record(perf_counter() - started)
+
+    def _scheduled_collect_step(self):
+        """
+        Pipeline source: waits for the next analysis slot of the rate scheduler
+        and collects the frames.
+
+        The pipeline processes one batch per time of its slowest stage, which
+        is reported to the scheduler as the processing time.
+
+        Returns:
+            FrameBatch or None: See `_collect_step()`.
+        """
+        if self._pipeline_stop.wait(self.scheduler.delay()):
+            return None
+        batch = self._collect_step()
+        if batch is None:
+            self.scheduler.idle()
+            return None
+        self.scheduler.start()
+        pipeline = self._pipeline
+        if pipeline is not None:
+            costs = [stats["avg_ms"] for name, stats in pipeline.get_stats().items()
+                     if name != "collect" and stats["processed"]]
+            if costs:
+                self.scheduler.record(max(costs) / 1000.0)
+        return batch
+
+    def _collect_step(self):
+        """
+        Collects the latest frames of all cameras (already converted to model
+        inputs by the runners) and drops static scenes.
 
-        if self._current_runner is None:
-            logging.debug("Current runner is None")
+        Returns:
+            FrameBatch or None: Frames to process, None if there is nothing to do
+                (error_msg is updated then).
+        """
+        if not self._runners:
+            logging.debug("No runners available")
             if not self.error_msg:
                 self.error_msg = "Failed to connect to the video stream"
-            return
-
-        result = self._current_runner.predict_boxes()
+            return None
 
-        if self._current_runner.error_msg == "Failed to read frame":
-            logging.debug("Setting reconnect to True")
-            self.reconnect = True
+        samples = self._collect_frames()
+        errors = self._runner_errors()
 
-        if self._current_runner.error_msg is not None:
-            self.error_msg = f"Video stream processing error: {self._current_runner.error_msg}"
-            return
+        if errors and not samples:
+            self.error_msg = "\n".join(errors)
+            return None
 
-        if result is None:
+        if not samples:
             self.error_msg = "Failed to process frame from camera"
+            return None
+
+        # Static scenes: no inference and no DB writes, the last results stay valid
+        samples = [(runner, sample) for runner, sample in samples
+                   if sample is not ModelRunner.UNCHANGED]
+        if not samples:
+            self.error_msg = "\n".join(errors) if errors else None
+            return None
+
+        return FrameBatch(samples, errors, str(datetime.now()))
+
+    def _infer_step(self, batch):
+        """
+        Runs one batched forward pass over the collected frames whose trackers
+        need a detection and propagates the tracks of the others.
+
+        With cascade detection the frames are also offered to the heavy
+        detector; its finished results are merged with the cheap detections of
+        the camera's current frame before they reach the tracker, so heavy
+        detections get track ids and records like any other.
+
+        Args:
+            batch (FrameBatch): Result of `_collect_step()`.
+
+        Returns:
+            FrameBatch or None: The batch with (boxes, labels, track ids)
+                predictions, None on failure.
+        """
+        cascade = self._cascade
+        heavy = {}
+        if cascade is not None:
+            for i, (runner, _) in enumerate(batch.samples):
+                result = cascade.take_results(runner.camera_id)
+                if result is not None:
+                    heavy[i] = result
+
+        detect = [i for i, (runner, _) in enumerate(batch.samples)
+                  if i in heavy or runner.tracker.needs_detection()]
+        try:
+            detections = self._detector.predict(
+                [batch.samples[i][1][0] for i in detect], with_scores=True)
+        except Exception as e:
+            self.error_msg = f"Video stream processing error: Prediction error: {str(e)}"
+            return None
+
+        detections = dict(zip(detect, detections))
+        for i, result in heavy.items():
+            detections[i] = merge_detections(detections[i], result)
+        if cascade is not None:
+            cascade.submit([runner.camera_id for runner, _ in batch.samples],
+                           [sample[0] for _, sample in batch.samples])
+
+        batch.predictions = []
+        batch.changed = []
+        for i, (runner, sample) in enumerate(batch.samples):
+            batch.predictions.append(runner.track(sample, detections.get(i)))
+            batch.changed.append(runner.tracker.consume_changes())
+        return batch
+
+    def _render_step(self, batch):
+        """
+        Maps the predictions to full-frame coordinates and publishes the frames
+        shown by the GUI; the full frame is converted and the boxes are drawn
+        later, only if they are requested (see `get_images()`).
+
+        Args:
+            batch (FrameBatch): Result of `_infer_step()`.
+
+        Returns:
+            FrameBatch: The batch with (camera_id, FullFrame, boxes, labels, track ids)
+                results of the cameras whose tracks changed.
+        """
+        errors = list(batch.errors)
+        for (runner, sample), (boxes, labels, track_ids), changed in zip(
+                batch.samples, batch.predictions, batch.changed):
+            full_frame, boxes, labels = runner.to_full_frame(sample, boxes, labels)
+
+            if boxes is None or labels is None:
+                errors.append("No objects detected in the frame")
+                continue
+
+            self.images[runner.camera_id] = AnnotatedFrame(full_frame, boxes, labels)
+
+            if changed:
+                # Unchanged tracks are already recorded, they are only persisted again as a heartbeat.
+                # The snapshot frame is converted here, which releases its ring buffer slot
+                # before the batch waits in the deep persist inbox
+                if len(boxes):
+                    full_frame.rgb()
+                batch.results.append((runner.camera_id, full_frame if len(boxes) else None,
+                                      boxes, labels, track_ids))
+
+        # The analysis frames may be reused by the capture threads from now on
+        batch.samples = None
+        self.error_msg = "\n".join(errors) if errors else None
+        self._images_ready.set()
+        return batch
+
+    def _persist_step(self, batch, db_manager):
+        """
+        Saves the snapshots and the object records of a rendered batch.
+
+        Args:
+            batch (FrameBatch): Result of `_render_step()`.
+            db_manager: The database manager instance.
+        """
+        settings = self._settings
+        for camera_id, full_frame, boxes, labels, track_ids in batch.results:
+            self._save_detections(db_manager, settings, camera_id,
+                                  full_frame, boxes, labels, track_ids, batch.timestamp)
+
+    def start_pipeline(self, db_manager):
+        """
+        Runs the collect, infer, render and persist steps as pipeline stages,
+        each in its own thread, connected by latest-wins queues.
+
+        Args:
+            db_manager: The database manager instance.
+        """
+        if self._pipeline is not None and self._pipeline.running:
             return
+        self._pipeline_stop.clear()
+        self._pipeline = Pipeline(
+            [
+                ("collect", self._scheduled_collect_step),
+                ("infer", self._infer_step),
+                ("render", self._render_step),
+                ("persist", lambda batch: self._persist_step(batch, db_manager)),
+            ],
+            queue_sizes=self.PIPELINE_QUEUE_SIZES
+        )
+        self._pipeline.start()
+        logging.info("Pipeline started")
+
+    def stop_pipeline(self):
+        """Stops the pipeline stages, if running."""
+        # Wakes the source up if it is waiting for the next analysis slot
+        self._pipeline_stop.set()
+        if self._pipeline is not None:
+            self._pipeline.stop()
+            self._pipeline = None
+
+    def wait_for_images(self, timeout):
+        """
+        Waits until the render stage publishes new images.
 
-        img, boxes, labels = result
+        Args:
+            timeout (float): Seconds to wait.
+
+        Returns:
+            bool: True if new images are available.
+        """
+        ready = self._images_ready.wait(timeout)
+        self._images_ready.clear()
+        return ready
+
+    def get_pipeline_stats(self) -> dict:
+        """
+        Returns per-stage item counts, timings and queue depths of the pipeline.
+
+        Returns:
+            dict: Stage stats keyed by stage name, empty if the pipeline is not running.
+        """
+        return self._pipeline.get_stats() if self._pipeline is not None else {}
+
+    def _save_detections(self, db_manager, settings, camera_id, full_frame, boxes, labels,
+                         track_ids, timestamp):
+        """
+        Queues the snapshot of a frame and pushes one object record per detection.
 
-        if boxes is None or labels is None:
-            self.error_msg = "No objects detected in the frame"
+        The frame is encoded once and written to the "latest.jpg" of every
+        detected label by the snapshot writer in the background, see
+        `model.snapshot_writer`.
+
+        Args:
+            db_manager: The database manager instance.
+            settings (Mapping): Current settings (for the save folder).
+            camera_id (str): Id of the camera the frame came from.
+            full_frame (FullFrame): Original (not annotated) frame, converted
+                to RGB here only if there is something to save.
+            boxes (torch.Tensor): Boxes in full-frame coordinates.
+            labels (list): Label strings.
+            track_ids (list): Tracker ids of the objects, see `model.tracker`.
+            timestamp (str): Time of the frame, shared by all its records.
+        """
+        if not len(boxes):
             return
 
-        self.image1, self.image2 = self._current_runner.show_boxes(img, boxes, labels)
-        if self.image1 is None or self.image2 is None:
-            self.error_msg = "Error while drawing bounding boxes"
-        else:
-            self.error_msg = None
+        logging.debug("Boxes and labels found, proceeding to save")
+        base_save_folder = Path((settings or {}).get("save_folder", "detections"))
+        if self._multi_camera:
+            base_save_folder = base_save_folder / camera_id
 
-        if boxes is not None and labels is not None:
-            logging.debug("Boxes and labels found, proceeding to save")
-            settings = self._get_settings()
-            base_save_folder = Path(settings.get("save_folder", "detections"))
-            for box, label in zip(boxes, labels):
-                try:
-                    label_folder = base_save_folder / label.strip()
-                    label_folder.mkdir(parents=True, exist_ok=True)
-                    logging.debug(f"Creating folder {label_folder}")
+        photo_paths = [base_save_folder / label.strip() / "latest.jpg" for label in labels]
+        if full_frame is not None:
+            self.snapshot_writer.submit(full_frame.rgb(), photo_paths)
+            logging.debug(f"Queued snapshot for {len(set(photo_paths))} label folder(s)")
+
+        for box, label, track_id, photo_path in zip(boxes, labels, track_ids, photo_paths):
+            try:
+                object_item = ObjectItem(
+                    ObjrecID=0,
+                    Name=label,
+                    Time=timestamp,
+                    PositionCoord=f"{box[0]},{box[1]},{box[2]},{box[3]}",
+                    PhotoPath=str(photo_path),
+                    ContID=1,
+                    CamID=camera_id,
+                    TrackID=track_id
+                )
+
+                db_manager.push_objects(object_item)
+                logging.info("Pushed objects to db manager")
+
+            except Exception as e:
+                logging.error(f"Error while saving {label}: {e}")
+                continue
 
-                    photo_path = label_folder / "latest.jpg"
+    def get_frame_stats(self) -> dict:
+        """
+        Returns decoded/consumed/dropped frame counters of every camera.
 
-                    if self.image1:
-                        self.image1.save(str(photo_path))
-                        logging.debug(f"Saving image to {photo_path}")
+        Returns:
+            dict: Frame counters keyed by camera id, empty if there are no runners.
+        """
+        return {camera_id: runner.get_frame_stats()
+                for camera_id, runner in self._runners.items()}
 
-                    object_item = ObjectItem(
-                        ObjrecID=0,
-                        Name=label,
-                        Time=str(datetime.now()),
-                        PositionCoord=f"{box[0]},{box[1]},{box[2]},{box[3]}",
-                        PhotoPath=str(photo_path),
-                        ContID=1
-                    )
+    def get_model_cache_stats(self) -> dict:
+        """
+        Returns the counters of the process-wide detector cache.
 
-                    db_manager.push_objects(object_item)
-                    logging.info("Pushed objects to db manager")
+        Returns:
+            dict: See `DetectorCache.get_stats()`.
+        """
+        return DETECTOR_CACHE.get_stats()
 
-                except Exception as e:
-                    print(f"Error while saving {label}: {e}")
-                    continue
+    def get_rate_stats(self) -> dict:
+        """
+        Returns the target and achieved analysis rate, see `RateScheduler.get_stats()`.
+
+        Returns:
+            dict: Rate scheduler state.
+        """
+        return self.scheduler.get_stats()
+
+    def get_cascade_stats(self) -> dict:
+        """
+        Returns the counters of the heavy detector tier.
+
+        Returns:
+            dict or None: See `Cascade.get_stats()`, None if cascade detection is off.
+        """
+        cascade = self._cascade
+        return cascade.get_stats() if cascade is not None else None
+
+    def get_snapshot_stats(self) -> dict:
+        """
+        Returns the counters of the snapshot writer.
+
+        Returns:
+            dict: See `SnapshotWriter.get_stats()`.
+        """
+        return self.snapshot_writer.get_stats()
 
     def get_error(self) -> str:
         """Returns the current error message."""
         return self.error_msg
 
+    def set_model_view(self, enabled: bool):
+        """
+        Tells whether the GUI currently displays annotated frames.
+
+        Args:
+            enabled (bool): True while the model view is visible.
+        """
+        if enabled != self.model_view:
+            logging.debug(f"Model view {'shown' if enabled else 'hidden'}")
+        self.model_view = bool(enabled)
+
     def get_images(self) -> tuple[QImage, QImage]:
-        """Returns the current pair of images (original and processed)."""
-        return self.image1, self.image2
+        """
+        Returns the current pair of images of the first configured camera.
+
+        The annotated image is only drawn while the model view is shown (see
+        `set_model_view()`), otherwise None is returned in its place.
+
+        Returns:
+            tuple: (original QImage, annotated QImage or None), (None, None) without a frame.
+        """
+        primary_id = next(iter(self._runners), None)
+        frame = self.images.get(primary_id)
+        if frame is None:
+            return None, None
+        try:
+            original = frame.original()
+        except Exception as e:
+            self.error_msg = f"Frame conversion error: {str(e)}"
+            return None, None
+        try:
+            return original, frame.annotated() if self.model_view else None
+        except Exception as e:
+            self.error_msg = f"Box drawing error: {str(e)}"
+            return original, None
 
     def __del__(self):
-        if self._current_runner is not None:
-            self._current_runner.release()
+        self.stop_pipeline()
+        self._stop_cascade()
+        self._release_runners()
+        self.snapshot_writer.close()
@@ -1,198 +1,636 @@
 # model_runner.py
-import os
 import cv2
+import numpy as np
 import torch
 from threading import Thread, Lock, Event
-from PySide6.QtGui import QImage
-from time import sleep
+from time import monotonic
 
-from torchvision.models.detection import (
-    SSDLite320_MobileNet_V3_Large_Weights as ModelWeights,
-    ssdlite320_mobilenet_v3_large as model_create
-)
-from torchvision.utils import draw_bounding_boxes
+from model.model_cache import get_detector
+from model.frame_buffer import FrameRingBuffer
+from model.tracker import Tracker
+from model.frame_source import open_frame_source
+from model.motion import MotionGate
+from model.reconnect import ReconnectSupervisor
+from model.shm_capture import SharedMemoryFrameSource
 
 import logging
 from utils.logger import setup_logger
 setup_logger(__name__)
 
 
+class FullFrame:
+    """
+    Full-resolution frame behind an analysis frame, materialized on demand.
+
+    Holds the frame where the capture thread decoded it, together with the
+    lease of the ring buffer slot that keeps it there, until `rgb()` is called
+    for a snapshot or the GUI: a BGR frame is converted to RGB then, an RGB
+    frame is copied out of its slot. Frames that are only analysed never pay
+    for either. An unconverted frame releases its lease when it is garbage
+    collected.
+    """
+
+    def __init__(self, bgr=None, lease=None, rgb=None):
+        """
+        Wraps a decoded frame.
+
+        Args:
+            bgr (numpy.ndarray, optional): Full-resolution BGR frame.
+            lease (FrameLease, optional): Lease pinning the slot the frame lives in.
+            rgb (numpy.ndarray, optional): Full-resolution RGB frame; copied out
+                of its slot on the first `rgb()` call if it is leased.
+        """
+        self._bgr = bgr
+        self._lease = lease
+        self._rgb = rgb
+        self._lock = Lock()
+
+    def rgb(self):
+        """
+        Returns the RGB frame, converting it on the first call.
+
+        Returns:
+            numpy.ndarray: HxWx3 uint8 RGB frame.
+        """
+        with self._lock:
+            if self._rgb is None:
+                self._rgb = cv2.cvtColor(self._bgr, cv2.COLOR_BGR2RGB)
+                self._bgr = None
+            elif self._lease is not None:
+                self._rgb = self._rgb.copy()
+            if self._lease is not None:
+                self._lease.release()
+                self._lease = None
+            return self._rgb
+
+
 class ModelRunner:
     """
-    Handles the initialization of the object detection model, frame capture from
-    the camera, and running predictions. Manages its own background thread to keep
-    the latest frame ready for processing.
+    Handles frame capture from one camera and running predictions on it.
+    Manages its own background thread to keep the latest frame ready for
+    processing. The thread also (re)connects to the camera, paced by a
+    ReconnectSupervisor. The detection model can be shared between several runners.
+
+    With capture_mode "grab" the thread only calls `grab()` on the stream and
+    decodes a frame with `retrieve()` when a consumer asked for one, which keeps
+    the stream drained (low latency) without converting frames nobody uses.
+
+    With capture_process enabled the stream is opened and decoded in a separate
+    process (see `model.shm_capture`) and this thread only copies frames out
+    of shared memory.
+
+    Attributes:
+        UNCHANGED: Returned by `grab_frame()` when the motion gate rejects a frame.
     """
+    UNCHANGED = object()
 
-    def __init__(self, settings):
+    def __init__(self, settings, detector=None, frame_notify=None, frames_held=1):
         """
         Initializes the ModelRunner.
 
         Args:
             settings (dict): Configuration settings including camera and model parameters.
+            detector (Detector, optional): Shared detector; the process-wide cached one
+                for the settings is used if omitted.
+            frame_notify (Event, optional): Event set whenever a new frame is captured,
+                used to wait for frames from several cameras at once.
+            frames_held (int): Grabbed frames the consumer keeps at the same time
+                (each pins a ring buffer slot until its full frame is converted
+                or dropped, see `grab_frame()`).
         """
-        self.weights = ModelWeights.COCO_V1
         self.settings = settings
+        self.camera_id = str(settings.get("camera_id", "0"))
         self.capture = None
-        self.model = None
+        self.detector = detector
+        self.frame_notify = frame_notify
         self.error_msg = None
-        self.latest_frame = None
+        self.convert_on_consume = settings.get("convert_on_consume", False)
+        # Besides the held frames, one slot holds the latest frame and one is written
+        self.frame_buffer = FrameRingBuffer(max(settings.get("frame_buffer_slots", 3),
+                                                frames_held + 2))
+        self._decode_buffer = None
+        self._raw_buffers = [None] * self.frame_buffer.slots
         self.frame_lock = Lock()
         self.frame_ready = Event()
+        self.connected = Event()
         self._stop_event = Event()
+        self._supervisor = ReconnectSupervisor(
+            base_delay=settings.get("reconnect_base_delay", 0.5),
+            max_delay=settings.get("reconnect_max_delay", 30.0),
+            cancel_event=self._stop_event
+        )
+        self.grab_mode = settings.get("capture_mode", "read") == "grab"
+        self._frame_wanted = Event()
+        self.frames_grabbed = 0
+        self.staleness = 0.0
+        self.staleness_avg = 0.0
+        self.motion_gate = MotionGate(
+            sensitivity=settings.get("motion_sensitivity", 0.0),
+            refresh_interval=settings.get("motion_refresh_interval", 30.0)
+        )
+        self.frames_static = 0
+        self.tracker = Tracker(settings.get("detect_interval", 1))
+        self.frames_tracked = 0
+        self.frames_decoded = 0
+        self.frames_consumed = 0
+        self.frames_dropped = 0
+        self.capture_thread = None
 
         if self._init_model():
             try:
-                self.capture_thread = Thread(target=self._capture_frames, daemon=True)
-                self.capture_thread.start()
+                thread = Thread(target=self._capture_frames, daemon=True)
+                thread.start()
+                self.capture_thread = thread
             except Exception as e:
                 self.error_msg = f"Thread start failed: {str(e)}"
 
     def _init_model(self):
-        """Initializes the model and video capture."""
+        """
+        Initializes the model unless a shared one was given. The video capture
+        is opened asynchronously by the capture thread.
+        """
         try:
-            self.model = model_create(
-                weights=self.weights,
-                detections_per_img=self.settings["detections_per_image"],
-                nms_thresh=self.settings["nms_thresh"],
-                score_thresh=self.settings["score_thresh"]
-            )
-            self.model.eval()
-            return self._init_capture()
+            if self.detector is None:
+                self.detector = get_detector(self.settings)
+            return True
         except Exception as e:
             self.error_msg = f"Model init error: {str(e)}"
             return False
 
     def _init_capture(self):
-        """Initializes the video capture stream."""
+        """Initializes the video capture stream (or the configured offline frame source)."""
         if self.capture and self.capture.isOpened():
             self.capture.release()
 
         try:
-            self.capture = cv2.VideoCapture(self.settings["rtsp_url"], cv2.CAP_FFMPEG)
-            
+            if self.settings.get("capture_process"):
+                capture = SharedMemoryFrameSource(self.settings, self._capture_params())
+            else:
+                capture = open_frame_source(self.settings, self._capture_params())
+
+            if self._stop_event.is_set():
+                # Released while the (blocking) open was in progress
+                capture.release()
+                return False
+
+            self.capture = capture
             if self.capture.isOpened():
                 self.capture.set(cv2.CAP_PROP_FPS, self.settings["fps"])
                 self.capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-                logging.debug("cv2 Capture is opened successfully")
+                self.error_msg = None
+                self.connected.set()
+                logging.debug("Frame source is opened successfully")
                 return True
             else:
-                self.error_msg = "Failed to open video capture"
-                logging.debug("Failed to create cv2 capture")
+                # The capture process reports why, e.g. a segment it could not attach
+                self.error_msg = getattr(capture, "error", None) or "Failed to open video capture"
+                logging.debug("Failed to open frame source")
                 return False
         except Exception as e:
             self.error_msg = f"Capture init error: {str(e)}"
             return False
 
+    def _capture_params(self):
+        """
+        Builds open/read timeouts so a dead camera cannot block the capture
+        thread (and its cancellation) indefinitely.
+
+        Returns:
+            list: Flat [property, value, ...] list for cv2.VideoCapture.
+        """
+        timeout_ms = int(self.settings.get("capture_timeout", 5.0) * 1000)
+        params = []
+        for name in ("CAP_PROP_OPEN_TIMEOUT_MSEC", "CAP_PROP_READ_TIMEOUT_MSEC"):
+            if hasattr(cv2, name):
+                params += [getattr(cv2, name), timeout_ms]
+        return params
+
     def _capture_frames(self):
         """Background thread function to continuously capture frames."""
         while not self._stop_event.is_set():
             try:
                 if not self.capture or not self.capture.isOpened():
-                    if not self._reconnect_capture():
-                        sleep(0.1)
-                        continue
+                    self._reconnect_capture()
+                    continue
+
+                if self.grab_mode:
+                    ret, published = self._grab_and_retrieve()
+                else:
+                    ret = published = self._decode_into_buffer(self.capture.read)
 
-                ret, frame = self.capture.read()
                 if ret:
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                    self._supervisor.mark_healthy()
+                if published:
                     with self.frame_lock:
-                        self.latest_frame = frame_rgb
+                        self.frames_decoded += 1
+                        if self.frame_ready.is_set():
+                            self.frames_dropped += 1
                         self.frame_ready.set()
-                else:
-                    self.error_msg = "Failed to read frame"
-                    if not self._reconnect_capture():
-                        sleep(0.1)
+                    if self.frame_notify is not None:
+                        self.frame_notify.set()
+                if not ret:
+                    self.error_msg = getattr(self.capture, "error", None) or "Failed to read frame"
+                    self._reconnect_capture()
             except Exception as e:
                 logging.error(f"Capture error: {e}")
                 self._reconnect_capture()
 
+    def _grab_and_retrieve(self):
+        """
+        Grabs the next frame and decodes it only if a consumer is waiting.
+
+        Returns:
+            tuple: (bool: stream is alive, bool: a frame was published)
+        """
+        if not self.capture.grab():
+            return False, False
+        grabbed_at = monotonic()
+        self.frames_grabbed += 1
+
+        if not self._frame_wanted.is_set():
+            return True, False
+
+        self._frame_wanted.clear()
+        published = self._decode_into_buffer(self.capture.retrieve, grabbed_at)
+        return published, published
+
+    def _decode_into_buffer(self, read, timestamp=None):
+        """
+        Decodes a frame with `read` (capture.read or capture.retrieve) into the
+        ring buffer, as raw BGR or as the RGB analysis frame depending on the mode.
+
+        Args:
+            read (callable): Capture method taking an optional output image.
+            timestamp (float, optional): Capture time; defaults to when decoding finished.
+
+        Returns:
+            bool: True if a frame was decoded.
+        """
+        if self.convert_on_consume:
+            return self._read_raw_into_buffer(read, timestamp)
+        return self._read_prepared_into_buffer(read, timestamp)
+
+    def request_frame(self):
+        """Asks the capture thread for a fresh frame (only needed in grab mode)."""
+        if self.grab_mode:
+            self._frame_wanted.set()
+
+    def _read_raw_into_buffer(self, read, timestamp=None):
+        """
+        Decodes the next frame straight into a ring buffer slot.
+
+        Args:
+            read (callable): Capture method taking an optional output image.
+            timestamp (float, optional): Capture time of the frame.
+
+        Returns:
+            bool: True if a frame was decoded.
+        """
+        shape = self._decode_buffer.shape if self._decode_buffer is not None else None
+        index, slot = self.frame_buffer.acquire(shape) if shape else (None, None)
+
+        ret, frame = read(slot)
+        if not ret:
+            return False
+        timestamp = self._source_timestamp(timestamp)
+
+        self._decode_buffer = frame
+        if index is None or frame is not slot:
+            # First frame, resolution change or all slots borrowed
+            index, slot = self.frame_buffer.acquire(frame.shape)
+            if index is None:
+                return True
+            np.copyto(slot, frame)
+
+        self.frame_buffer.commit(index, timestamp=timestamp)
+        return True
+
+    def _read_prepared_into_buffer(self, read, timestamp=None):
+        """
+        Decodes the next frame and writes its RGB analysis version into a ring
+        buffer slot.
+
+        Args:
+            read (callable): Capture method taking an optional output image.
+            timestamp (float, optional): Capture time of the frame.
+
+        Returns:
+            bool: True if a frame was decoded.
+        """
+        ret, frame = read(self._decode_buffer)
+        if not ret:
+            return False
+        timestamp = self._source_timestamp(timestamp)
+
+        analysis, transform = self._analysis_frame(frame)
+        index, slot = self.frame_buffer.acquire(analysis.shape)
+        if index is None:
+            self._decode_buffer = frame
+            return True
+
+        cv2.cvtColor(analysis, cv2.COLOR_BGR2RGB, dst=slot)
+        raw = None
+        if self._needs_full_frame():
+            # The full frame is kept for the snapshot in the decode buffer of
+            # the slot, pinned by the same lease; the buffer the slot held
+            # before is free again and receives the next frame
+            raw = frame
+            self._decode_buffer, self._raw_buffers[index] = self._raw_buffers[index], frame
+        else:
+            self._decode_buffer = frame
+        self.frame_buffer.commit(index, (transform, raw), timestamp)
+        return True
+
+    def _source_timestamp(self, timestamp):
+        """Prefers the capture time reported by the source (e.g. the capture process)."""
+        return getattr(self.capture, "timestamp", None) or timestamp
+
+    def _needs_full_frame(self):
+        """Checks whether the analysis frame differs from the full frame."""
+        return bool(self.settings.get("crop") or self.settings.get("analysis_width"))
+
+    def _analysis_frame(self, frame):
+        """
+        Crops and downscales a decoded BGR frame to the analysis resolution.
+
+        Args:
+            frame (numpy.ndarray): Full-resolution BGR frame from the capture.
+
+        Returns:
+            tuple: (BGR analysis frame, (scale_x, scale_y, offset_x, offset_y))
+                where the transform maps analysis coordinates back to the full frame.
+        """
+        full_h, full_w = frame.shape[:2]
+        offset_x, offset_y = 0, 0
+
+        crop = self.settings.get("crop")
+        if crop:
+            x, y, w, h = crop
+            x0, y0 = min(max(x, 0), full_w - 1), min(max(y, 0), full_h - 1)
+            x1, y1 = min(x0 + w, full_w), min(y0 + h, full_h)
+            frame = frame[y0:y1, x0:x1]
+            offset_x, offset_y = x0, y0
+
+        h, w = frame.shape[:2]
+        scale_x = scale_y = 1.0
+        analysis_width = self.settings.get("analysis_width", 0)
+        if analysis_width and w > analysis_width:
+            new_w = analysis_width
+            new_h = max(1, round(h * analysis_width / w))
+            frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_AREA)
+            scale_x, scale_y = new_w / w, new_h / h
+
+        return frame, (scale_x, scale_y, offset_x, offset_y)
+
+    @staticmethod
+    def _is_identity(transform):
+        """Checks whether the analysis frame is the full frame."""
+        return transform is None or transform == (1.0, 1.0, 0, 0)
+
+    @staticmethod
+    def _to_full_frame(boxes, transform):
+        """
+        Maps boxes from analysis-frame coordinates back to full-frame coordinates.
+
+        Args:
+            boxes (torch.Tensor): Boxes in (x_min, y_min, x_max, y_max) format.
+            transform (tuple): (scale_x, scale_y, offset_x, offset_y) of the analysis frame.
+
+        Returns:
+            torch.Tensor: Boxes in full-frame pixel coordinates.
+        """
+        scale_x, scale_y, offset_x, offset_y = transform
+        scale = boxes.new_tensor([scale_x, scale_y, scale_x, scale_y])
+        offset = boxes.new_tensor([offset_x, offset_y, offset_x, offset_y])
+        return boxes / scale + offset
+
     def _reconnect_capture(self):
-        """Attempts to reconnect the video capture stream."""
+        """
+        Attempts to reconnect the video capture stream. The supervisor applies
+        backoff and the process-wide cap on concurrent connection attempts.
+
+        Returns:
+            bool: True if the stream is open again.
+        """
+        self.connected.clear()
         if self.capture:
             self.capture.release()
-        return self._init_capture()
+            self.capture = None
+        return self._supervisor.reconnect(self._init_capture)
 
     def predict_boxes(self):
         """
         Runs inference on the latest captured frame.
 
         Returns:
-            tuple or None: (img_tensor, boxes, labels) if successful, None otherwise.
+            tuple or None: (image, boxes, labels) if successful, None otherwise.
         """
         logging.info("Predicting boxes")
-        if not self.frame_ready.wait(timeout=5.0):
+        sample = self.grab_frame(use_motion_gate=False)
+        if sample is None:
+            return None
+
+        try:
+            boxes, labels = self.detector.predict([sample[0]])[0]
+            logging.debug("Computed predictions and labels")
+            frame, boxes, labels = self.to_full_frame(sample, boxes, labels)
+            return frame.rgb(), boxes, labels
+        except Exception as e:
+            self.error_msg = f"Prediction error: {str(e)}"
+            return None
+
+    def predict_batch(self, frames, batch_size=None):
+        """
+        Runs inference on a list of frames, several frames per forward pass.
+
+        Meant for replaying recorded footage or catching up on a backlog, where
+        one-frame calls leave most of the CPU throughput unused. Boxes are in
+        the coordinates of the given frames.
+
+        Args:
+            frames (list): HxWx3 uint8 RGB frames (or CHW float tensors in [0, 1]).
+            batch_size (int, optional): Frames per forward pass; defaults to the
+                "batch_size" setting.
+
+        Returns:
+            list: (boxes tensor, list of label strings, scores tensor) per frame.
+        """
+        batch_size = max(1, int(batch_size or self.settings.get("batch_size", 4)))
+        results = []
+        for start in range(0, len(frames), batch_size):
+            results.extend(self.detector.predict(frames[start:start + batch_size], with_scores=True))
+        return results
+
+    def track(self, sample, detection=None):
+        """
+        Advances the camera's tracker to a grabbed frame.
+
+        Args:
+            sample (tuple): Value returned by `grab_frame()`.
+            detection (tuple, optional): (boxes, labels, scores) predicted on the
+                frame; without it the tracks are propagated by their motion models.
+
+        Returns:
+            tuple: (boxes tensor, labels, track ids) of the active tracks in
+                analysis-frame coordinates.
+        """
+        if detection is not None:
+            boxes, labels, scores = detection
+            tracks = self.tracker.update(boxes.numpy(), labels, scores.numpy())
+        else:
+            tracks = self.tracker.propagate()
+            self.frames_tracked += 1
+
+        h, w = sample[0].shape[:2]
+        boxes = np.array([track.reported_box for track in tracks], np.float32).reshape(-1, 4)
+        boxes[:, 0::2] = np.clip(boxes[:, 0::2], 0, w)
+        boxes[:, 1::2] = np.clip(boxes[:, 1::2], 0, h)
+        return (torch.from_numpy(boxes), [track.label for track in tracks],
+                [track.track_id for track in tracks])
+
+    def grab_frame(self, timeout=5.0, use_motion_gate=True):
+        """
+        Consumes the latest captured frame as an RGB uint8 model input.
+
+        Args:
+            timeout (float): Seconds to wait for a new frame.
+            use_motion_gate (bool): Skip the conversion and return UNCHANGED if
+                the motion gate finds the scene static.
+
+        Returns:
+            tuple or None: (rgb, transform, full_frame) with the full-resolution
+                `FullFrame`, UNCHANGED for a static scene, or None if no frame
+                is available. The full frame holds the lease of the frame's ring
+                buffer slot: rgb may be a read-only view into that slot, valid
+                until the full frame is converted or dropped.
+        """
+        if not self.frame_ready.is_set():
+            self.request_frame()
+        if not self.frame_ready.wait(timeout=timeout):
             self.error_msg = "No frames available yet (timeout)"
             return None
 
         with self.frame_lock:
-            if self.latest_frame is None:
+            lease = self.frame_buffer.borrow_latest()
+            if lease is None:
                 logging.debug("Latest frame is None")
                 self.error_msg = "No frames available"
                 return None
 
-            frame = self.latest_frame.copy()
+            self.frames_consumed += 1
             self.frame_ready.clear()
+            self._update_staleness(monotonic() - lease.timestamp)
             logging.debug("Consumed latest frame")
 
+        # The slot is pinned while borrowed, so the capture thread writes into
+        # other slots and the frame is used in place; the full frame keeps the
+        # lease until a snapshot or the GUI converts it
+        keep_lease = False
         try:
-            img_tensor = torch.from_numpy(frame).permute(2, 0, 1).float() / 255.0
-            prediction = self.model([img_tensor])[0]
-            labels = [self.weights.meta["categories"][i] for i in prediction["labels"]]
-            logging.debug("Computed predictions and labels")
-            return img_tensor, prediction["boxes"].detach(), labels
+            if self.convert_on_consume:
+                raw = lease.frame
+                frame, transform = self._analysis_frame(raw)
+            else:
+                frame = lease.frame
+                transform, raw = lease.meta
+
+            if use_motion_gate and not self.motion_gate.has_changed(frame):
+                self.frames_static += 1
+                return self.UNCHANGED
+
+            # A crop at the origin has an identity transform, yet it is not the full frame
+            keep_lease = True
+            if not self.convert_on_consume:
+                rgb = frame
+                full_frame = FullFrame(rgb=rgb, lease=lease) if raw is None \
+                    else FullFrame(raw, lease)
+            else:
+                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                if frame is raw:
+                    # The converted analysis frame is the full frame
+                    keep_lease = False
+                    full_frame = FullFrame(rgb=rgb)
+                else:
+                    full_frame = FullFrame(raw, lease)
+
+            return rgb, transform, full_frame
         except Exception as e:
-            self.error_msg = f"Prediction error: {str(e)}"
+            keep_lease = False
+            self.error_msg = f"Frame conversion error: {str(e)}"
             return None
+        finally:
+            if not keep_lease:
+                lease.release()
 
-    def show_boxes(self, img_tensor, boxes, labels):
+    def to_full_frame(self, sample, boxes, labels):
         """
-        Draws bounding boxes and labels on the image.
+        Maps a prediction made on a grabbed frame back to full-frame space.
+
+        Boxes and the returned image are in full-frame coordinates, so
+        snapshots and DB records do not depend on the analysis size.
 
         Args:
-            img_tensor (torch.Tensor): The original image tensor.
-            boxes (torch.Tensor): Bounding box coordinates.
-            labels (list): List of label strings.
+            sample (tuple): Value returned by `grab_frame()`.
+            boxes (torch.Tensor): Boxes predicted on the analysis frame.
+            labels (list): Label strings.
 
         Returns:
-            tuple: (original QImage, annotated QImage)
+            tuple: (FullFrame, boxes, labels) in full-frame space.
         """
-        logging.info("Called show_boxes")
-        try:
-            img_np = (img_tensor.permute(1, 2, 0).detach().numpy() * 255).astype('uint8')
-
-            if len(boxes) == 0:
-                logging.debug("Received image with no boxes")
-                h, w, ch = img_np.shape
-                img_qimage = QImage(img_np.data, w, h, 3 * w, QImage.Format_RGB888)
-                return img_qimage.copy(), img_qimage.copy()
-
-            box_img = draw_bounding_boxes(
-                torch.from_numpy(img_np).permute(2, 0, 1),
-                boxes=boxes,
-                labels=labels,
-                colors="red",
-                width=4,
-                font_size=30,
-                font=os.path.join(os.path.dirname(__file__), "arial.ttf")
-            )
-            box_img = box_img.permute(1, 2, 0).numpy()
-            logging.debug("Computed output image")
-
-            h, w, ch = img_np.shape
-            img_qimage = QImage(img_np.data, w, h, ch * w, QImage.Format_RGB888)
-            box_qimage = QImage(box_img.data, w, h, ch * w, QImage.Format_RGB888)
-
-            return img_qimage, box_qimage
-        except Exception as e:
-            self.error_msg = f"Box drawing error: {str(e)}"
-            return None, None
+        rgb, transform, full_frame = sample
+        if self._is_identity(transform):
+            return full_frame, boxes, labels
+        return full_frame, self._to_full_frame(boxes, transform), labels
+
+    def _update_staleness(self, staleness):
+        """
+        Records how old a frame was when it was handed to inference.
+
+        Args:
+            staleness (float): Seconds between capture and consumption.
+        """
+        self.staleness = staleness
+        if self.frames_consumed == 1:
+            self.staleness_avg = staleness
+        else:
+            self.staleness_avg += 0.1 * (staleness - self.staleness_avg)
+
+    def get_frame_stats(self):
+        """
+        Returns frame accounting of the capture thread.
+
+        Returns:
+            dict: Number of grabbed (grab mode), decoded, consumed, dropped
+                (overwritten before being consumed), static and tracked (not run
+                through the detector) frames, the ring buffer counters (see
+                `FrameRingBuffer.get_stats()`), connection attempts, and the
+                capture-to-inference staleness of the last consumed frame and
+                its moving average in milliseconds.
+        """
+        buffer_stats = self.frame_buffer.get_stats()
+        with self.frame_lock:
+            return {
+                "grabbed": self.frames_grabbed,
+                "decoded": self.frames_decoded,
+                "consumed": self.frames_consumed,
+                "dropped": self.frames_dropped,
+                "static": self.frames_static,
+                "tracked": self.frames_tracked,
+                "buffer_overwritten": buffer_stats["overwritten"],
+                "buffer_busy": buffer_stats["busy"],
+                "buffer_leased": buffer_stats["leased"],
+                "connect_attempts": self._supervisor.attempts,
+                "staleness_ms": round(self.staleness * 1000, 1),
+                "staleness_avg_ms": round(self.staleness_avg * 1000, 1),
+            }
 
     def release(self):
         """Stops the capture thread and releases resources."""
         self._stop_event.set()
 
-        if hasattr(self, 'capture_thread') and self.capture_thread.is_alive():
+        if self.capture_thread is not None and self.capture_thread.is_alive():
+            # A pending open is bounded by the capture timeout, after which
+            # the thread sees the stop event and exits on its own
             self.capture_thread.join(timeout=1.0)
             logging.debug("Waiting for the capture thread to join")
 
@@ -201,4 +639,4 @@ class ModelRunner:
             self.capture = None
             logging.debug("Released capture")
 
-        self.model = None
+        self.detector = None
@@ -0,0 +1,82 @@
+# motion.py
+from time import monotonic
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Cheap scene-change detector placed in front of the object detector.
+
+    Frames are shrunk to a tiny blurred grayscale image and compared with the
+    last frame that was let through. Static scenes are rejected until the
+    changed area exceeds the sensitivity threshold or the forced refresh
+    interval elapses.
+
+    Attributes:
+        WIDTH (int): Width of the comparison image in pixels.
+        PIXEL_DELTA (int): Minimal per-pixel intensity change counted as motion.
+    """
+    WIDTH = 64
+    PIXEL_DELTA = 25
+
+    def __init__(self, sensitivity=0.0, refresh_interval=30.0):
+        """
+        Initializes the gate.
+
+        Args:
+            sensitivity (float): 0 disables the gate, 1 reacts to a single changed
+                pixel; 0.5 requires about 5% of the image to change.
+            refresh_interval (float): Seconds after which a frame is let through
+                even if nothing changed.
+        """
+        self.sensitivity = sensitivity
+        self.refresh_interval = refresh_interval
+        self.changed_fraction = 0.0
+        self._reference = None
+        self._last_pass = None
+
+    @property
+    def enabled(self):
+        """Whether the gate filters frames at all."""
+        return self.sensitivity > 0
+
+    def _thumbnail(self, frame):
+        """Shrinks a colour frame to a small blurred grayscale image."""
+        h, w = frame.shape[:2]
+        size = (self.WIDTH, max(1, round(h * self.WIDTH / w)))
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        # Channel order does not matter for change detection
+        gray = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+        return cv2.GaussianBlur(gray, (3, 3), 0)
+
+    def has_changed(self, frame):
+        """
+        Checks whether the frame differs enough from the last accepted one.
+
+        Args:
+            frame (numpy.ndarray): HxWx3 uint8 frame.
+
+        Returns:
+            bool: True if the detector should run on this frame.
+        """
+        if not self.enabled:
+            return True
+
+        now = monotonic()
+        thumbnail = self._thumbnail(frame)
+
+        changed = True
+        if self._reference is not None and self._reference.shape == thumbnail.shape:
+            diff = cv2.absdiff(thumbnail, self._reference)
+            changed_fraction = np.count_nonzero(diff > self.PIXEL_DELTA) / diff.size
+            changed = changed_fraction > 0.1 * (1.0 - self.sensitivity)
+            self.changed_fraction = changed_fraction
+
+        if not changed and now - self._last_pass < self.refresh_interval:
+            return False
+
+        self._reference = thumbnail
+        self._last_pass = now
+        return True
@@ -0,0 +1,215 @@
+# pipeline.py
+from collections import deque
+from threading import Condition, Event, Thread
+from time import perf_counter
+
+import logging
+from utils.logger import setup_logger
+setup_logger(__name__)
+
+
+class LatestQueue:
+    """
+    Bounded queue between two pipeline stages with a latest-wins drop policy.
+
+    When the queue is full, `put()` drops the oldest item instead of blocking
+    the producer, so a slow stage never stalls the stages before it and always
+    works on the freshest data.
+    """
+
+    def __init__(self, maxsize=1):
+        """
+        Initializes the queue.
+
+        Args:
+            maxsize (int): Maximal number of waiting items, at least 1.
+        """
+        self.maxsize = max(1, int(maxsize))
+        self._items = deque()
+        self._condition = Condition()
+        self.put_count = 0
+        self.dropped = 0
+
+    def put(self, item):
+        """Appends an item, dropping the oldest one if the queue is full."""
+        with self._condition:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self.put_count += 1
+            self._condition.notify()
+
+    def get(self, timeout=None):
+        """
+        Takes the oldest waiting item.
+
+        Args:
+            timeout (float, optional): Seconds to wait for an item.
+
+        Returns:
+            The item, or None if the queue stayed empty.
+        """
+        with self._condition:
+            if not self._items:
+                self._condition.wait(timeout)
+            return self._items.popleft() if self._items else None
+
+    def clear(self):
+        """Drops all waiting items."""
+        with self._condition:
+            self._items.clear()
+
+    def __len__(self):
+        with self._condition:
+            return len(self._items)
+
+
+class Stage:
+    """
+    One pipeline stage: a worker thread applying a function to the items of
+    its inbox and passing the results to its outbox.
+
+    A stage without an inbox is a source and calls its function repeatedly.
+    Returning None from the function drops the item.
+
+    Attributes:
+        POLL_INTERVAL (float): Seconds between checks of the stop flag while idle.
+        IDLE_INTERVAL (float): Pause of a source that produced nothing.
+    """
+
+    POLL_INTERVAL = 0.1
+    IDLE_INTERVAL = 0.02
+
+    def __init__(self, name, func, inbox=None, outbox=None):
+        """
+        Initializes the stage.
+
+        Args:
+            name (str): Stage name used in the stats and the thread name.
+            func (callable): Called with an inbox item (no argument for a source).
+            inbox (LatestQueue, optional): Queue the items are taken from.
+            outbox (LatestQueue, optional): Queue the results are put into.
+        """
+        self.name = name
+        self.func = func
+        self.inbox = inbox
+        self.outbox = outbox
+        self.processed = 0
+        self.errors = 0
+        self.last_ms = 0.0
+        self.avg_ms = 0.0
+        self._thread = None
+        self._stop_event = Event()
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = Thread(target=self._run, name=f"pipeline-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        self._stop_event.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            if self.inbox is not None:
+                item = self.inbox.get(timeout=self.POLL_INTERVAL)
+                if item is None:
+                    continue
+                args = (item,)
+            else:
+                args = ()
+
+            started = perf_counter()
+            try:
+                result = self.func(*args)
+            except Exception as e:
+                self.errors += 1
+                logging.error(f"Pipeline stage {self.name} failed: {e}")
+                result = None
+            self._record(perf_counter() - started)
+
+            if result is not None and self.outbox is not None:
+                self.outbox.put(result)
+            elif result is None and self.inbox is None:
+                # Do not spin while the source has nothing to offer
+                self._stop_event.wait(self.IDLE_INTERVAL)
+
+    def _record(self, seconds):
+        """Updates the timing statistics with the duration of one item."""
+        self.processed += 1
+        self.last_ms = 1000.0 * seconds
+        if self.processed == 1:
+            self.avg_ms = self.last_ms
+        else:
+            self.avg_ms += 0.1 * (self.last_ms - self.avg_ms)
+
+    def get_stats(self):
+        """
+        Returns the counters of the stage.
+
+        Returns:
+            dict: processed and failed items, last and average (EMA) time per
+                item in ms, and the depth and drop count of the inbox.
+        """
+        return {
+            "processed": self.processed,
+            "errors": self.errors,
+            "last_ms": round(self.last_ms, 1),
+            "avg_ms": round(self.avg_ms, 1),
+            "queue_depth": len(self.inbox) if self.inbox is not None else 0,
+            "dropped": self.inbox.dropped if self.inbox is not None else 0,
+        }
+
+
+class Pipeline:
+    """
+    Chain of stages connected by latest-wins queues.
+
+    Every stage runs in its own thread, so e.g. rendering and disk I/O of one
+    frame overlap with the inference of the next one.
+    """
+
+    def __init__(self, steps, queue_sizes=None):
+        """
+        Builds the stages.
+
+        Args:
+            steps (list): (name, func) pairs in processing order; the first
+                function is the source and takes no argument.
+            queue_sizes (dict, optional): Inbox size per stage name (default 1).
+        """
+        queue_sizes = queue_sizes or {}
+        self.stages = []
+        inbox = None
+        for index, (name, func) in enumerate(steps):
+            outbox = LatestQueue(queue_sizes.get(steps[index + 1][0], 1)) \
+                if index + 1 < len(steps) else None
+            self.stages.append(Stage(name, func, inbox, outbox))
+            inbox = outbox
+        self.running = False
+
+    def start(self):
+        """Starts all stages, the last one first."""
+        for stage in reversed(self.stages):
+            stage.start()
+        self.running = True
+
+    def stop(self):
+        """Stops all stages, the source first, and drops waiting items."""
+        for stage in self.stages:
+            stage.stop()
+            if stage.inbox is not None:
+                stage.inbox.clear()
+        self.running = False
+
+    def get_stats(self):
+        """
+        Returns the statistics of all stages.
+
+        Returns:
+            dict: Stage stats keyed by stage name, see `Stage.get_stats()`.
+        """
+        return {stage.name: stage.get_stats() for stage in self.stages}
@@ -0,0 +1,148 @@
+# precision.py
+import copy
+from pathlib import Path
+
+import cv2
+import torch
+from torch import nn
+
+from model.frame_source import open_frame_source
+
+import logging
+from utils.logger import setup_logger
+setup_logger(__name__)
+
+
+PRECISIONS = ("fp32", "int8", "bf16")
+
+
+class ReducedPrecisionCore(nn.Module):
+    """
+    Runs an SSD core with bfloat16 weights and activations.
+
+    The core is copied, so the fp32 model it was built from stays usable.
+    Inputs are cast to bfloat16 and the head outputs back to float32, so the
+    shared postprocessing is unchanged.
+    """
+
+    def __init__(self, core, dtype=torch.bfloat16):
+        super().__init__()
+        self.dtype = dtype
+        self.core = copy.deepcopy(core).to(dtype).eval()
+
+    def forward(self, images):
+        bbox_regression, cls_logits = self.core(images.to(self.dtype))
+        return bbox_regression.float(), cls_logits.float()
+
+
+def quantize_core(core, calibration_batches):
+    """
+    Statically quantizes the backbone of an SSD core to INT8 (FX graph mode).
+
+    Activation ranges are observed on the calibration batches. The heads stay
+    in fp32: they are small and their reshapes do not trace symbolically.
+
+    Args:
+        core (SSDCore): fp32 core; it is copied, not modified.
+        calibration_batches (list): Normalized Nx3xHxW tensors as produced by
+            `model.transform`.
+
+    Returns:
+        SSDCore: Copy of the core with a quantized backbone.
+    """
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+    if not calibration_batches:
+        raise ValueError("INT8 quantization needs calibration frames")
+
+    engine = "x86" if "x86" in torch.backends.quantized.supported_engines else \
+        torch.backends.quantized.engine
+    torch.backends.quantized.engine = engine
+
+    quantized = copy.deepcopy(core).eval()
+    prepared = prepare_fx(quantized.backbone, get_default_qconfig_mapping(engine),
+                          (calibration_batches[0],))
+    with torch.no_grad():
+        for batch in calibration_batches:
+            prepared(batch)
+    quantized.backbone = convert_fx(prepared)
+    logging.info(f"Quantized the backbone to INT8 on {len(calibration_batches)} batches ({engine})")
+    return quantized
+
+
+def load_calibration_batches(path, transform, max_frames=32, batch_size=4):
+    """
+    Reads calibration frames and preprocesses them like the detector does.
+
+    Args:
+        path (str): Directory of images or a video file with representative frames.
+        transform (GeneralizedRCNNTransform): The model's input transform.
+        max_frames (int): Maximal number of frames to use.
+        batch_size (int): Frames per calibration batch.
+
+    Returns:
+        list: Normalized Nx3xHxW tensors.
+    """
+    if not path or not Path(path).exists():
+        raise ValueError(f"Calibration frames not found: {path}")
+
+    source = open_frame_source({
+        "source_type": "images" if Path(path).is_dir() else "video",
+        "source_path": str(path),
+        "source_pacing": "fast",
+        "source_loop": False,
+    })
+    frames = []
+    try:
+        while len(frames) < max_frames:
+            ok, frame = source.read()
+            if not ok:
+                break
+            frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    finally:
+        source.release()
+    return calibration_batches(frames, transform, batch_size)
+
+
+def calibration_batches(frames, transform, batch_size=4):
+    """
+    Preprocesses calibration frames like the detector does.
+
+    Args:
+        frames (list): HxWx3 uint8 RGB frames.
+        transform (GeneralizedRCNNTransform): The model's input transform.
+        batch_size (int): Frames per calibration batch.
+
+    Returns:
+        list: Normalized Nx3xHxW tensors.
+    """
+    images = [torch.from_numpy(frame).permute(2, 0, 1).float().div_(255.0) for frame in frames]
+    with torch.no_grad():
+        return [transform(images[start:start + batch_size])[0].tensors
+                for start in range(0, len(images), batch_size)]
+
+
+def apply_precision(core, precision, calibration=None):
+    """
+    Converts an fp32 SSD core to the requested numeric precision.
+
+    Args:
+        core (SSDCore): fp32 core.
+        precision (str): "fp32", "int8" (static quantization) or "bf16".
+        calibration (callable, optional): Returns the calibration batches, see
+            `load_calibration_batches()`; only called for "int8".
+
+    Returns:
+        torch.nn.Module: Module with the same inputs and outputs as the core.
+
+    Raises:
+        ValueError: If the precision is unknown.
+    """
+    if precision in (None, "fp32"):
+        return core
+    if precision == "bf16":
+        return ReducedPrecisionCore(core)
+    if precision == "int8":
+        return quantize_core(core, calibration() if calibration else [])
+    raise ValueError(f"Unknown precision: {precision}")
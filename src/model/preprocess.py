@@ -0,0 +1,85 @@
+# preprocess.py
+import cv2
+import numpy as np
+import torch
+
+import logging
+from utils.logger import setup_logger
+setup_logger(__name__)
+
+
+class Preprocessor:
+    """
+    Turns uint8 RGB frames into the normalized input batch of the model.
+
+    Frames are resized to the model resolution while still uint8 and only the
+    small images are converted to float and normalized, instead of converting
+    the full-resolution frame and letting the model scale it down. The resized
+    frames and the input batch live in buffers that are allocated once per
+    batch size and reused for every call.
+
+    The returned batch is overwritten by the next call with the same batch
+    size, so calls must be serialized with the use of the batch (the detector
+    does both under its lock).
+    """
+
+    def __init__(self, image_size, image_mean, image_std, interpolation=cv2.INTER_LINEAR):
+        """
+        Initializes the preprocessor.
+
+        Args:
+            image_size (tuple): (height, width) of the model input.
+            image_mean (list): Per-channel mean of the normalization in [0, 1] units.
+            image_std (list): Per-channel standard deviation in [0, 1] units.
+            interpolation (int): cv2 interpolation flag; bilinear matches the
+                resize of the torchvision transform.
+        """
+        self.image_size = tuple(int(v) for v in image_size)
+        self.interpolation = interpolation
+        mean = np.asarray(image_mean, np.float32)
+        std = np.asarray(image_std, np.float32)
+        # (x / 255 - mean) / std as one multiply-add on the uint8 values
+        self._scale = torch.from_numpy(1.0 / (255.0 * std)).view(1, 3, 1, 1)
+        self._shift = torch.from_numpy(-mean / std).view(1, 3, 1, 1)
+        self._resized = {}
+        self._inputs = {}
+
+    def _buffers(self, batch_size):
+        """Returns the uint8 and float buffers for a batch size, allocating them on first use."""
+        resized = self._resized.get(batch_size)
+        if resized is None:
+            h, w = self.image_size
+            resized = np.empty((batch_size, h, w, 3), np.uint8)
+            self._resized[batch_size] = resized
+            self._inputs[batch_size] = torch.empty((batch_size, 3, h, w), dtype=torch.float32)
+            logging.debug(f"Allocated preprocessing buffers for batch size {batch_size}")
+        return resized, self._inputs[batch_size]
+
+    def __call__(self, frames):
+        """
+        Resizes and normalizes a batch of frames.
+
+        Args:
+            frames (list): HxWx3 uint8 RGB frames; sizes may differ.
+
+        Returns:
+            tuple: (Nx3xHxW float tensor, list of original (height, width) sizes).
+        """
+        resized, inputs = self._buffers(len(frames))
+        h, w = self.image_size
+        original_sizes = []
+        for i, frame in enumerate(frames):
+            original_sizes.append((int(frame.shape[0]), int(frame.shape[1])))
+            if frame.shape[:2] == (h, w):
+                np.copyto(resized[i], frame)
+            else:
+                cv2.resize(frame, (w, h), dst=resized[i], interpolation=self.interpolation)
+
+        inputs.copy_(torch.from_numpy(resized).permute(0, 3, 1, 2))
+        inputs.mul_(self._scale).add_(self._shift)
+        return inputs, original_sizes
+
+    def clear(self):
+        """Releases the buffers."""
+        self._resized.clear()
+        self._inputs.clear()
@@ -0,0 +1,105 @@
+# reconnect.py
+import random
+from threading import BoundedSemaphore, Event
+from time import monotonic
+
+import logging
+from utils.logger import setup_logger
+setup_logger(__name__)
+
+
+class ReconnectSupervisor:
+    """
+    Paces reconnection attempts of one video stream.
+
+    Attempts are delayed with exponential backoff and random jitter, the delay
+    is only reset once a connection has stayed up for `stable_after` seconds,
+    waiting is cancelled as soon as the owner's stop event is set, and the
+    number of connection attempts running at the same time is capped for the
+    whole process, so a flapping camera cannot monopolize CPU or sockets.
+
+    Attributes:
+        MAX_CONCURRENT_CONNECTS (int): Process-wide cap on simultaneous connection attempts.
+    """
+    MAX_CONCURRENT_CONNECTS = 2
+    _connect_slots = BoundedSemaphore(MAX_CONCURRENT_CONNECTS)
+
+    def __init__(self, base_delay=0.5, max_delay=30.0, jitter=0.2,
+                 stable_after=10.0, cancel_event=None):
+        """
+        Initializes the supervisor.
+
+        Args:
+            base_delay (float): Delay before the first retry, in seconds.
+            max_delay (float): Upper bound of the backoff delay, in seconds.
+            jitter (float): Relative random spread of each delay (0.2 means +-20%).
+            stable_after (float): Seconds a connection must deliver frames before
+                the backoff is reset.
+            cancel_event (Event, optional): Event that cancels waiting and attempts.
+        """
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.stable_after = stable_after
+        self.cancel_event = cancel_event or Event()
+        self.failures = 0
+        self.attempts = 0
+        self._connected_at = None
+
+    def next_delay(self):
+        """
+        Computes the delay before the next attempt.
+
+        Returns:
+            float: Seconds to wait; 0 if the stream has not failed recently.
+        """
+        if self.failures == 0:
+            return 0.0
+        delay = min(self.max_delay, self.base_delay * 2 ** (self.failures - 1))
+        return delay * random.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+
+    def reconnect(self, connect):
+        """
+        Waits for the backoff delay and makes one connection attempt.
+
+        Args:
+            connect (callable): Opens the stream, returns True on success.
+
+        Returns:
+            bool: True if connected, False if the attempt failed or was cancelled.
+        """
+        delay = self.next_delay()
+        if delay:
+            logging.debug(f"Reconnecting in {delay:.1f} s (failure {self.failures})")
+            if self.cancel_event.wait(delay):
+                return False
+
+        if not self._acquire_slot():
+            return False
+
+        try:
+            if self.cancel_event.is_set():
+                return False
+            self.attempts += 1
+            connected = connect()
+        finally:
+            self._connect_slots.release()
+
+        if connected:
+            self._connected_at = monotonic()
+        # Counted until the connection proves stable, see mark_healthy()
+        self.failures += 1
+        return connected
+
+    def mark_healthy(self):
+        """Resets the backoff once the current connection has been stable long enough."""
+        if self.failures and self._connected_at is not None and \
+                monotonic() - self._connected_at >= self.stable_after:
+            self.failures = 0
+
+    def _acquire_slot(self):
+        """Waits for a free connection slot; returns False if cancelled meanwhile."""
+        while not self._connect_slots.acquire(timeout=0.5):
+            if self.cancel_event.is_set():
+                return False
+        return True
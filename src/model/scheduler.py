@@ -0,0 +1,213 @@
+# scheduler.py
+import os
+from threading import Lock
+from time import monotonic, process_time
+
+import logging
+from utils.logger import setup_logger
+setup_logger(__name__)
+
+
+class CpuMonitor:
+    """
+    Measures the CPU load of other processes between two calls.
+
+    The system-wide load comes from the counters of /proc/stat; the share of
+    this process (`process_time()`, i.e. inference, capture, GUI and server
+    threads) is subtracted, so the scheduler does not slow down because of
+    the load it creates itself. Where /proc/stat is not available the load of
+    other processes cannot be measured and is reported as 0.
+
+    Attributes:
+        load (float): CPU load of other processes in [0, 1] (1 means all cores busy).
+        process_load (float): CPU load of this process in [0, 1].
+    """
+
+    def __init__(self):
+        self.cpu_count = os.cpu_count() or 1
+        self._system = self._read_proc_stat()
+        self._process = (monotonic(), process_time())
+        self.load = 0.0
+        self.process_load = 0.0
+
+    @staticmethod
+    def _read_proc_stat():
+        """Returns (busy, total) jiffies of all CPUs, or None if /proc/stat is not available."""
+        try:
+            with open("/proc/stat", "r") as f:
+                values = [int(v) for v in f.readline().split()[1:]]
+        except (OSError, ValueError):
+            return None
+        # idle and iowait
+        idle = values[3] + (values[4] if len(values) > 4 else 0)
+        total = sum(values)
+        return total - idle, total
+
+    def sample(self):
+        """
+        Updates the load since the previous sample.
+
+        Returns:
+            float: CPU load of other processes in [0, 1].
+        """
+        now, cpu = monotonic(), process_time()
+        wall = now - self._process[0]
+        if wall > 0:
+            self.process_load = min(1.0, (cpu - self._process[1]) / (wall * self.cpu_count))
+            self._process = (now, cpu)
+
+        if self._system is not None:
+            current = self._read_proc_stat()
+            if current is not None:
+                busy = current[0] - self._system[0]
+                total = current[1] - self._system[1]
+                if total > 0:
+                    system_load = min(1.0, max(0.0, busy / total))
+                    self.load = max(0.0, system_load - self.process_load)
+                    self._system = current
+        return self.load
+
+
+class RateScheduler:
+    """
+    Adapts the analysis rate to the measured processing cost and CPU headroom.
+
+    The rate the machine can sustain is derived from the moving average of the
+    processing time of one analysis. The scheduler aims at `DUTY_CYCLE` of that
+    capacity, and lowers the duty cycle further while other processes leave
+    less than `HEADROOM_RESERVE` of the CPU free, so they keep some room. The
+    load of this process is not counted (see `CpuMonitor`), otherwise the rate
+    would drop because of its own inference work. The result is clamped to the configured
+    [min_fps, max_fps] range and smoothed.
+
+    Attributes:
+        DUTY_CYCLE (float): Share of the measured capacity used on an idle machine.
+        HEADROOM_RESERVE (float): CPU share to keep free.
+        SMOOTHING (float): Weight of a new measurement in the moving averages.
+        CPU_SAMPLE_INTERVAL (float): Minimal seconds between CPU load samples.
+    """
+
+    DUTY_CYCLE = 0.8
+    HEADROOM_RESERVE = 0.2
+    SMOOTHING = 0.2
+    CPU_SAMPLE_INTERVAL = 1.0
+
+    def __init__(self, min_fps=1.0, max_fps=20.0):
+        """
+        Initializes the scheduler at the maximal rate.
+
+        Args:
+            min_fps (float): Lowest analysis rate.
+            max_fps (float): Highest analysis rate.
+        """
+        self._lock = Lock()
+        self.min_fps = None
+        self.max_fps = None
+        self.rate = None
+        self.configure(min_fps, max_fps)
+        self.latency = None
+        self.achieved_fps = 0.0
+        self.cpu = CpuMonitor()
+        self._last_cpu_sample = monotonic()
+        self._last_start = None
+        self._last_round = None
+
+    def configure(self, min_fps, max_fps):
+        """
+        Sets the rate limits; takes effect with the next iteration.
+
+        Args:
+            min_fps (float): Lowest analysis rate.
+            max_fps (float): Highest analysis rate (raised to min_fps if lower).
+        """
+        min_fps = max(0.01, float(min_fps))
+        max_fps = max(min_fps, float(max_fps))
+        with self._lock:
+            if self.rate is not None and (min_fps, max_fps) != (self.min_fps, self.max_fps):
+                logging.info(f"Analysis rate limits set to {min_fps:g}-{max_fps:g} fps")
+            self.min_fps, self.max_fps = min_fps, max_fps
+            self.rate = max_fps if self.rate is None else min(max(self.rate, min_fps), max_fps)
+
+    def configure_from(self, settings):
+        """
+        Applies the "min_fps" and "max_fps" settings.
+
+        Args:
+            settings (dict): Combined settings, see `ModelManager._get_settings()`.
+        """
+        if settings:
+            self.configure(settings.get("min_fps", self.min_fps),
+                           settings.get("max_fps", self.max_fps))
+
+    def start(self):
+        """Marks the start of an analysis and updates the achieved rate."""
+        now = monotonic()
+        with self._lock:
+            if self._last_start is not None and now > self._last_start:
+                fps = 1.0 / (now - self._last_start)
+                self.achieved_fps = fps if not self.achieved_fps else \
+                    self.achieved_fps + self.SMOOTHING * (fps - self.achieved_fps)
+            self._last_start = now
+            self._last_round = now
+
+    def idle(self):
+        """
+        Marks an iteration that produced no analysis (no cameras, a static
+        scene, a timeout); the next iteration is still paced from now.
+        """
+        with self._lock:
+            self._last_round = monotonic()
+
+    def record(self, seconds):
+        """
+        Records the processing time of one analysis and adapts the rate.
+
+        Args:
+            seconds (float): Processing time of the analysis.
+        """
+        now = monotonic()
+        with self._lock:
+            seconds = max(seconds, 1e-4)
+            self.latency = seconds if self.latency is None else \
+                self.latency + self.SMOOTHING * (seconds - self.latency)
+            if now - self._last_cpu_sample >= self.CPU_SAMPLE_INTERVAL:
+                self.cpu.sample()
+                self._last_cpu_sample = now
+
+            headroom = 1.0 - self.cpu.load
+            duty = self.DUTY_CYCLE * min(1.0, headroom / self.HEADROOM_RESERVE)
+            target = min(max(duty / self.latency, self.min_fps), self.max_fps)
+            self.rate += self.SMOOTHING * (target - self.rate)
+
+    def delay(self):
+        """
+        Returns the time to wait before the next analysis, measured from the
+        last `start()` or `idle()`.
+
+        Returns:
+            float: Seconds until the next analysis is due (0 if it is late).
+        """
+        with self._lock:
+            if self._last_round is None:
+                return 0.0
+            return max(0.0, self._last_round + 1.0 / self.rate - monotonic())
+
+    def get_stats(self):
+        """
+        Returns the scheduler state.
+
+        Returns:
+            dict: Target and achieved rate in fps, the rate limits, the average
+                processing time in ms and the CPU load of other processes and
+                of this one.
+        """
+        with self._lock:
+            return {
+                "target_fps": round(self.rate, 2),
+                "achieved_fps": round(self.achieved_fps, 2),
+                "min_fps": self.min_fps,
+                "max_fps": self.max_fps,
+                "latency_ms": round(1000.0 * self.latency, 1) if self.latency is not None else None,
+                "cpu_load": round(self.cpu.load, 2),
+                "process_cpu_load": round(self.cpu.process_load, 2),
+            }
@@ -0,0 +1,130 @@
+# settings_store.py
+import copy
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic
+from types import MappingProxyType
+
+import logging
+from utils.logger import setup_logger
+setup_logger(__name__)
+
+
+def freeze(value):
+    """Returns a read-only copy of nested dicts and lists (mapping proxies and tuples)."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """Returns a mutable deep copy of a frozen value (dicts and lists)."""
+    if isinstance(value, MappingProxyType):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return copy.deepcopy(value)
+
+
+@dataclass(frozen=True)
+class SettingsSnapshot:
+    """
+    Immutable parsed settings.
+
+    Attributes:
+        values (MappingProxyType): Read-only settings; nested dicts are mapping
+            proxies and lists are tuples, see `thaw()` for a mutable copy.
+        hash (str): Hash of the settings, equal for equal contents.
+        version (int): Number of the reload that produced the snapshot.
+    """
+    values: MappingProxyType
+    hash: str
+    version: int
+
+
+class SettingsStore:
+    """
+    In-memory settings parsed from files and reloaded only when they change.
+
+    `refresh()` compares the modification time and size of the files with the
+    last load and parses them again only if they differ; it checks the files
+    at most every `POLL_INTERVAL` seconds, so it can be called from a loop.
+    `snapshot` itself never touches the disk.
+
+    Attributes:
+        POLL_INTERVAL (float): Minimal seconds between two checks of the files.
+    """
+    POLL_INTERVAL = 1.0
+
+    def __init__(self, paths, load):
+        """
+        Initializes the store and loads the settings.
+
+        Args:
+            paths (list): Files the settings are read from.
+            load (callable): Parses the files and returns a settings dict; raises
+                an exception with the error message if they cannot be used.
+        """
+        self.paths = [str(path) for path in paths]
+        self._load = load
+        self._lock = Lock()
+        self._signature = None
+        self._last_check = None
+        self.snapshot = None
+        self.error = None
+        self.version = 0
+        self.refresh(force=True)
+
+    def _file_signature(self):
+        """Modification time and size of every file (None for a missing file)."""
+        signature = []
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def refresh(self, force=False):
+        """
+        Reloads the settings if the files changed since the last load.
+
+        Args:
+            force (bool): Reload even if the files look unchanged or were
+                checked less than `POLL_INTERVAL` seconds ago.
+
+        Returns:
+            bool: True if the settings were reloaded.
+        """
+        with self._lock:
+            now = monotonic()
+            if not force and self._last_check is not None and \
+                    now - self._last_check < self.POLL_INTERVAL:
+                return False
+            self._last_check = now
+
+            signature = self._file_signature()
+            if not force and signature == self._signature:
+                return False
+            self._signature = signature
+
+            try:
+                values = self._load()
+            except Exception as e:
+                self.snapshot = None
+                self.error = str(e)
+                logging.debug(f"Settings could not be loaded: {self.error}")
+                return True
+
+            self.version += 1
+            settings_hash = hashlib.md5(json.dumps(values, sort_keys=True).encode()).hexdigest()
+            self.snapshot = SettingsSnapshot(freeze(values), settings_hash, self.version)
+            self.error = None
+            logging.debug(f"Settings loaded (version {self.version})")
+            return True
@@ -0,0 +1,368 @@
+# shm_capture.py
+import multiprocessing as mp
+from multiprocessing import resource_tracker, shared_memory
+from time import monotonic
+
+import numpy as np
+
+from model.frame_source import FrameSource, open_frame_source
+
+import logging
+from utils.logger import setup_logger
+setup_logger(__name__)
+
+
+class SharedFrameChannel:
+    """
+    Latest-frame channel between processes on top of `multiprocessing.shared_memory`.
+
+    The segment starts with a small int64 header (latest sequence number,
+    latest slot, frame shape), followed by a per-slot sequence counter and
+    capture timestamp, followed by the frame slots. The writer never touches
+    the latest slot; each slot is guarded by a seqlock (its counter is odd
+    while it is being written), so the reader can detect a torn copy and retry
+    without any lock shared between the processes.
+
+    Attributes:
+        HEADER_FIELDS (int): Number of int64 header fields.
+        ALIGN (int): Alignment of the frame slots in bytes.
+    """
+    HEADER_FIELDS = 8
+    ALIGN = 64
+    _SEQ, _SLOT, _HEIGHT, _WIDTH, _CHANNELS = range(5)
+
+    def __init__(self, shm, shape, slots, owner):
+        self.shm = shm
+        self.name = shm.name
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.owner = owner
+
+        offset = 0
+        self._header = np.ndarray((self.HEADER_FIELDS,), np.int64, shm.buf, offset)
+        offset += self._header.nbytes
+        self._slot_seqs = np.ndarray((slots,), np.int64, shm.buf, offset)
+        offset += self._slot_seqs.nbytes
+        self._times = np.ndarray((slots,), np.float64, shm.buf, offset)
+        offset += self._times.nbytes
+        offset = -(-offset // self.ALIGN) * self.ALIGN
+        frame_bytes = int(np.prod(self.shape))
+        stride = -(-frame_bytes // self.ALIGN) * self.ALIGN
+        self._frames = [
+            np.ndarray(self.shape, np.uint8, shm.buf, offset + i * stride)
+            for i in range(slots)
+        ]
+        self._next = 0
+
+    @classmethod
+    def _size(cls, shape, slots):
+        meta = cls.HEADER_FIELDS * 8 + slots * 16
+        frame_bytes = int(np.prod(shape))
+        return -(-meta // cls.ALIGN) * cls.ALIGN + slots * -(-frame_bytes // cls.ALIGN) * cls.ALIGN
+
+    @classmethod
+    def create(cls, shape, slots=3):
+        """
+        Creates a new segment for frames of the given shape.
+
+        Args:
+            shape (tuple): (height, width, channels) of the uint8 frames.
+            slots (int): Number of frame slots, at least 2.
+
+        Returns:
+            SharedFrameChannel: The writer side of the channel.
+        """
+        slots = max(2, int(slots))
+        shm = shared_memory.SharedMemory(create=True, size=cls._size(shape, slots))
+        channel = cls(shm, shape, slots, owner=True)
+        channel._header[:] = 0
+        channel._header[cls._HEIGHT:cls._CHANNELS + 1] = shape
+        channel._header[cls._SLOT] = -1
+        channel._slot_seqs[:] = 0
+        return channel
+
+    @classmethod
+    def attach(cls, name, shape, slots):
+        """
+        Maps an existing segment created by `create()` and takes it over.
+
+        The reader owns the segment from now on: its resource tracker holds
+        the registration and `close()` unlinks the segment, see `hand_over()`.
+
+        Args:
+            name (str): Name of the shared memory segment.
+            shape (tuple): Frame shape announced by the writer.
+            slots (int): Number of slots announced by the writer.
+
+        Returns:
+            SharedFrameChannel: The reader side of the channel, owning the segment.
+
+        Raises:
+            OSError: If the segment does not exist (any more).
+        """
+        return cls(shared_memory.SharedMemory(name=name), shape, slots, owner=True)
+
+    def hand_over(self):
+        """
+        Passes the ownership of the segment to the reader that will `attach()` it.
+
+        The writer stops unlinking the segment and drops its resource tracker
+        registration. Spawned processes share the tracker of their parent and
+        it keeps one entry per name, so a registration left by both sides would
+        be removed twice (the tracker fails on the second removal), while the
+        registration of the writer alone would make the tracker unlink a
+        segment that is still mapped by the reader.
+        """
+        if self.owner:
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+            self.owner = False
+
+    @property
+    def latest_seq(self):
+        """Sequence number of the latest published frame (0 if none)."""
+        return int(self._header[self._SEQ])
+
+    def publish(self, frame, timestamp=None):
+        """
+        Copies a frame into a free slot and makes it the latest frame.
+
+        Args:
+            frame (numpy.ndarray): uint8 frame of the channel's shape.
+            timestamp (float, optional): Capture time (`time.monotonic()`).
+
+        Returns:
+            int: Sequence number of the frame.
+        """
+        latest = int(self._header[self._SLOT])
+        index = self._next if self._next != latest else (self._next + 1) % self.slots
+        self._next = (index + 1) % self.slots
+        seq = self.latest_seq + 1
+
+        self._slot_seqs[index] = 2 * seq - 1
+        np.copyto(self._frames[index], frame)
+        self._times[index] = monotonic() if timestamp is None else timestamp
+        self._slot_seqs[index] = 2 * seq
+        self._header[self._SLOT] = index
+        self._header[self._SEQ] = seq
+        return seq
+
+    def read_latest(self, image=None, retries=5):
+        """
+        Copies the latest frame out of the segment.
+
+        Args:
+            image (numpy.ndarray, optional): Destination buffer of the frame's shape.
+            retries (int): Attempts before giving up when the writer keeps
+                overwriting the slot being read.
+
+        Returns:
+            tuple: (seq, frame, timestamp) or (0, None, None) if no consistent
+                frame could be read.
+        """
+        if image is None or image.shape != self.shape or image.dtype != np.uint8:
+            image = np.empty(self.shape, np.uint8)
+
+        for _ in range(retries):
+            seq = int(self._header[self._SEQ])
+            index = int(self._header[self._SLOT])
+            if seq == 0 or index < 0:
+                return 0, None, None
+            begin = int(self._slot_seqs[index])
+            if begin != 2 * seq:
+                # The writer moved on while we read the header
+                continue
+            np.copyto(image, self._frames[index])
+            timestamp = float(self._times[index])
+            if int(self._slot_seqs[index]) == begin:
+                return seq, image, timestamp
+        return 0, None, None
+
+    def close(self):
+        """Unmaps the segment; the owner also unlinks it."""
+        # Views into the buffer must be gone before it can be closed
+        self._header = self._slot_seqs = self._times = None
+        self._frames = []
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _capture_main(settings, params, control, stop_event, frame_event):
+    """
+    Entry point of the capture process: decodes frames from the configured
+    source and publishes them into a SharedFrameChannel.
+
+    A new segment is created (and announced on the control pipe) whenever the
+    frame shape changes; the parent takes over every announced segment and
+    unlinks it. Errors are reported on the pipe before exiting.
+
+    Args:
+        settings (dict): Camera settings, see `open_frame_source()`.
+        params (list): Open/read timeout parameters for cv2.VideoCapture.
+        control (Connection): Write end of the control pipe.
+        stop_event (Event): Set by the parent to stop the process.
+        frame_event (Event): Set after every published frame.
+    """
+    source = None
+    channel = None
+    try:
+        source = open_frame_source(settings, params)
+        if not source.isOpened():
+            control.send(("error", "Failed to open video capture"))
+            return
+
+        frame = None
+        while not stop_event.is_set():
+            ok, frame = source.read(frame)
+            if not ok:
+                control.send(("error", "Failed to read frame"))
+                return
+            captured_at = monotonic()
+
+            if channel is None or channel.shape != frame.shape:
+                old = channel
+                channel = SharedFrameChannel.create(frame.shape, settings.get("frame_buffer_slots", 3))
+                # The parent unlinks the segment once it attached it
+                channel.hand_over()
+                control.send(("segment", channel.name, channel.shape, channel.slots))
+                if old is not None:
+                    old.close()
+
+            channel.publish(frame, captured_at)
+            frame_event.set()
+    except Exception as e:
+        try:
+            control.send(("error", f"Capture process error: {str(e)}"))
+        except (OSError, ValueError):
+            pass
+    finally:
+        if source is not None:
+            source.release()
+        if channel is not None:
+            channel.close()
+        control.close()
+
+
+class SharedMemoryFrameSource(FrameSource):
+    """
+    Frame source whose capture and decode run in a separate process.
+
+    The child process opens the configured source (see `open_frame_source()`)
+    and publishes decoded BGR frames through shared memory, so decoding does
+    not compete for the GIL with inference, the API server and the GUI. Only
+    the segment name travels over the control pipe; frames are copied straight
+    from the mapping into the caller's buffer, never pickled.
+
+    `grab()` waits for a frame newer than the last one and `retrieve()` copies
+    the latest frame, so the source behaves like a drained live stream.
+    """
+
+    def __init__(self, settings, params=None):
+        """
+        Starts the capture process and waits for its first frame.
+
+        Args:
+            settings (dict): Camera settings; "capture_timeout" bounds the waits.
+            params (list, optional): Open/read timeout parameters for cv2.VideoCapture.
+        """
+        super().__init__(settings.get("fps"), "fast")
+        self.timeout = float(settings.get("capture_timeout", 5.0))
+        self.channel = None
+        self.error = None
+        self.timestamp = None
+        self._seq = 0
+
+        context = mp.get_context("spawn")
+        self._stop_event = context.Event()
+        self._frame_event = context.Event()
+        self._control, child_control = context.Pipe(duplex=False)
+        self._process = context.Process(
+            target=_capture_main,
+            args=(settings, params, child_control, self._stop_event, self._frame_event),
+            name=f"capture-{settings.get('camera_id', '0')}",
+            daemon=True
+        )
+        self._process.start()
+        child_control.close()
+
+        # Opening the stream happens in the child; wait for its first segment
+        deadline = monotonic() + self.timeout * 2
+        while self.channel is None and self.error is None and monotonic() < deadline:
+            self._poll_control(timeout=0.1)
+            if not self._process.is_alive() and not self._control.poll():
+                self.error = self.error or "Capture process exited"
+        if self.error:
+            logging.error(self.error)
+
+    def _poll_control(self, timeout=0.0):
+        """Applies pending messages from the capture process."""
+        try:
+            while self._control.poll(timeout):
+                kind, *payload = self._control.recv()
+                if kind == "segment":
+                    name, shape, slots = payload
+                    old = self.channel
+                    try:
+                        self.channel = SharedFrameChannel.attach(name, shape, slots)
+                    except OSError as e:
+                        # The announced segment is gone, so no frame can be read from it
+                        self.channel = None
+                        self.error = f"Failed to attach capture segment {name}: {str(e)}"
+                    self._seq = 0
+                    if old is not None:
+                        old.close()
+                elif kind == "error":
+                    self.error = payload[0]
+                timeout = 0.0
+        except (EOFError, OSError):
+            if self.error is None and not self._process.is_alive():
+                self.error = "Capture process exited"
+
+    def isOpened(self):
+        return self.channel is not None and self.error is None
+
+    def grab(self):
+        deadline = monotonic() + self.timeout
+        while True:
+            # Cleared before checking, so a frame published meanwhile is not missed
+            self._frame_event.clear()
+            self._poll_control()
+            if not self.isOpened():
+                return False
+            latest = self.channel.latest_seq
+            if latest > self._seq:
+                self._seq = latest
+                self.frame_index += 1
+                return True
+            remaining = deadline - monotonic()
+            if remaining <= 0 or not self._process.is_alive():
+                self._poll_control()
+                return False
+            self._frame_event.wait(min(remaining, 0.5))
+
+    def retrieve(self, image=None):
+        if not self.isOpened():
+            return False, None
+        seq, frame, timestamp = self.channel.read_latest(image)
+        if not seq:
+            return False, None
+        self._seq = seq
+        self.timestamp = timestamp
+        return True, frame
+
+    def release(self):
+        self._stop_event.set()
+        self._process.join(timeout=self.timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join(timeout=1.0)
+        # Take over (and so unlink) segments announced after the last poll
+        self._poll_control()
+        if self.channel is not None:
+            self.channel.close()
+            self.channel = None
+        self._control.close()
+        self.error = self.error or "Released"
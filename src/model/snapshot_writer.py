@@ -0,0 +1,169 @@
+# snapshot_writer.py
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from threading import Condition, get_ident
+from time import sleep
+
+import cv2
+
+import logging
+from utils.logger import setup_logger
+setup_logger(__name__)
+
+
+class SnapshotWriter:
+    """
+    Writes detection snapshots in background threads.
+
+    A frame is JPEG-encoded once, however many of its objects get a snapshot,
+    and the bytes are written to every path through a temporary file that is
+    renamed over the target, so readers (e.g. the API server) never see a
+    partially written image. Created directories are remembered, so a label
+    folder is only created once.
+
+    At most `max_pending` frames wait for a worker; further frames are dropped
+    (their paths keep the previous snapshot). Writes of an older frame never
+    replace the snapshot of a newer one.
+
+    Attributes:
+        JPEG_QUALITY (int): JPEG quality of the snapshots.
+        REPLACE_RETRIES (int): Attempts to rename over a target that is open
+            elsewhere (Windows refuses that while a reader holds the file).
+    """
+    JPEG_QUALITY = 90
+    REPLACE_RETRIES = 5
+
+    def __init__(self, workers=2, max_pending=8):
+        """
+        Starts the worker pool.
+
+        Args:
+            workers (int): Number of writer threads.
+            max_pending (int): Frames that may wait for a worker.
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(workers)),
+                                            thread_name_prefix="snapshot-writer")
+        self.max_pending = max(1, int(max_pending))
+        self._lock = Condition()
+        self._pending = 0
+        self._dirs = set()
+        self._written = {}
+        self._sequence = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.files_written = 0
+        self.errors = 0
+
+    def submit(self, image, paths):
+        """
+        Queues a frame to be saved to one or more paths.
+
+        Args:
+            image (numpy.ndarray): HxWx3 uint8 RGB frame; it must not be modified afterwards.
+            paths (list): Target files.
+
+        Returns:
+            bool: True if the frame was queued, False if it was dropped.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.frames_dropped += 1
+                logging.debug("Snapshot writer busy, frame dropped")
+                return False
+            self._pending += 1
+            self._sequence += 1
+            sequence = self._sequence
+        try:
+            self._executor.submit(self._write, image, [Path(path) for path in paths], sequence)
+        except RuntimeError:
+            # The pool is shut down
+            self._done()
+            return False
+        return True
+
+    def _done(self):
+        with self._lock:
+            self._pending -= 1
+            self._lock.notify_all()
+
+    def _ensure_dir(self, directory):
+        if directory not in self._dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._dirs.add(directory)
+
+    def _write(self, image, paths, sequence):
+        try:
+            ok, encoded = cv2.imencode(".jpg", cv2.cvtColor(image, cv2.COLOR_RGB2BGR),
+                                       [cv2.IMWRITE_JPEG_QUALITY, self.JPEG_QUALITY])
+            if not ok:
+                raise ValueError("JPEG encoding failed")
+            data = encoded.tobytes()
+            for path in dict.fromkeys(paths):
+                self._write_file(path, data, sequence)
+            with self._lock:
+                self.frames_written += 1
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            logging.error(f"Snapshot write error: {e}")
+        finally:
+            self._done()
+
+    def _write_file(self, path, data, sequence):
+        """Writes one file atomically unless a newer frame was already written there."""
+        tmp = path.with_name(f".{path.name}.{get_ident()}.tmp")
+        try:
+            self._ensure_dir(path.parent)
+            with open(tmp, "wb") as f:
+                f.write(data)
+        except FileNotFoundError:
+            # The directory was removed since it was created
+            self._dirs.discard(path.parent)
+            self._ensure_dir(path.parent)
+            with open(tmp, "wb") as f:
+                f.write(data)
+
+        with self._lock:
+            if sequence < self._written.get(path, 0):
+                os.remove(tmp)
+                return
+            for attempt in range(self.REPLACE_RETRIES):
+                try:
+                    os.replace(tmp, path)
+                    break
+                except PermissionError:
+                    if attempt == self.REPLACE_RETRIES - 1:
+                        os.remove(tmp)
+                        raise
+                    sleep(0.01)
+            self._written[path] = sequence
+            self.files_written += 1
+
+    def flush(self, timeout=None):
+        """
+        Waits until all queued frames are written.
+
+        Args:
+            timeout (float, optional): Maximal seconds to wait.
+
+        Returns:
+            bool: True if nothing is pending anymore.
+        """
+        with self._lock:
+            return self._lock.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self):
+        """Writes the queued frames and stops the workers."""
+        self._executor.shutdown(wait=True)
+
+    def get_stats(self):
+        """
+        Returns the writer counters.
+
+        Returns:
+            dict: Frames written and dropped, files written and write errors.
+        """
+        with self._lock:
+            return {"frames_written": self.frames_written, "frames_dropped": self.frames_dropped,
+                    "files_written": self.files_written, "errors": self.errors}
@@ -0,0 +1,332 @@
+# tracker.py
+from threading import Lock
+from time import monotonic
+
+import numpy as np
+
+import logging
+from utils.logger import setup_logger
+setup_logger(__name__)
+
+
+def box_iou(boxes1, boxes2):
+    """
+    Pairwise IoU of two sets of (x_min, y_min, x_max, y_max) boxes.
+
+    Args:
+        boxes1 (numpy.ndarray): Nx4 boxes.
+        boxes2 (numpy.ndarray): Mx4 boxes.
+
+    Returns:
+        numpy.ndarray: NxM IoU matrix.
+    """
+    if not len(boxes1) or not len(boxes2):
+        return np.zeros((len(boxes1), len(boxes2)), np.float32)
+    area1 = (boxes1[:, 2] - boxes1[:, 0]) * (boxes1[:, 3] - boxes1[:, 1])
+    area2 = (boxes2[:, 2] - boxes2[:, 0]) * (boxes2[:, 3] - boxes2[:, 1])
+    top_left = np.maximum(boxes1[:, None, :2], boxes2[None, :, :2])
+    bottom_right = np.minimum(boxes1[:, None, 2:], boxes2[None, :, 2:])
+    wh = np.clip(bottom_right - top_left, 0, None)
+    inter = wh[..., 0] * wh[..., 1]
+    return inter / np.maximum(area1[:, None] + area2[None, :] - inter, 1e-6)
+
+
+class TrackIds:
+    """
+    Process-wide source of track ids.
+
+    Every tracker draws its ids from the same counter, so a runner recreated
+    after a reconnect or a settings change continues the numbering instead of
+    reusing the ids of earlier tracks. `seed()` continues after the ids stored
+    by a previous session.
+    """
+
+    def __init__(self, start=1):
+        """
+        Initializes the counter.
+
+        Args:
+            start (int): First id.
+        """
+        self._next = int(start)
+        self._lock = Lock()
+
+    def next(self):
+        """
+        Returns a new id.
+
+        Returns:
+            int: The id.
+        """
+        with self._lock:
+            track_id = self._next
+            self._next += 1
+            return track_id
+
+    def seed(self, last_id):
+        """
+        Continues the numbering after an id that is already in use.
+
+        Args:
+            last_id (int or None): Largest id in use, e.g. the largest persisted one.
+        """
+        if last_id is None:
+            return
+        with self._lock:
+            self._next = max(self._next, int(last_id) + 1)
+        logging.debug(f"Track ids continue at {self._next}")
+
+
+TRACK_IDS = TrackIds()
+
+
+class KalmanBoxTrack:
+    """
+    One tracked object with a constant-velocity Kalman filter.
+
+    The state is the box center, width and height and their velocities per
+    frame; process and measurement noise scale with the box size, so small and
+    large objects are tracked alike.
+
+    Attributes:
+        POSITION_NOISE (float): Standard deviation of the position noise relative to the box size.
+        VELOCITY_NOISE (float): Standard deviation of the velocity noise relative to the box size.
+    """
+    POSITION_NOISE = 1.0 / 20
+    VELOCITY_NOISE = 1.0 / 160
+
+    _F = np.eye(8)
+    _F[:4, 4:] = np.eye(4)
+    _H = np.eye(4, 8)
+
+    def __init__(self, track_id, box, label, score):
+        """
+        Starts a track at a detection.
+
+        Args:
+            track_id (int): Id of the track, see `TrackIds`.
+            box (numpy.ndarray): Detected (x_min, y_min, x_max, y_max) box.
+            label (str): Class label.
+            score (float): Detection confidence.
+        """
+        self.track_id = track_id
+        self.label = label
+        self.score = score
+        self.hits = 1
+        self.misses = 0
+        self.frames_since_update = 0
+        self.detection = np.asarray(box, np.float32)
+
+        measurement = self._to_measurement(box)
+        self.x = np.concatenate([measurement, np.zeros(4)])
+        size = self._size(measurement)
+        std = np.concatenate([np.full(4, 2 * self.POSITION_NOISE * size),
+                              np.full(4, 10 * self.VELOCITY_NOISE * size)])
+        self.P = np.diag(std ** 2)
+
+    @staticmethod
+    def _to_measurement(box):
+        x_min, y_min, x_max, y_max = box
+        return np.array([(x_min + x_max) / 2, (y_min + y_max) / 2,
+                         x_max - x_min, y_max - y_min], np.float64)
+
+    @staticmethod
+    def _size(state):
+        return max(float(state[2]), float(state[3]), 1.0)
+
+    @property
+    def box(self):
+        """Current (x_min, y_min, x_max, y_max) estimate."""
+        cx, cy, w, h = self.x[:4]
+        w, h = max(w, 1.0), max(h, 1.0)
+        return np.array([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], np.float32)
+
+    @property
+    def reported_box(self):
+        """The box of the matched detection on a detected frame, the estimate in between."""
+        return self.detection if self.detection is not None else self.box
+
+    @property
+    def uncertainty(self):
+        """Standard deviation of the center estimate relative to the box size."""
+        return float(np.sqrt(self.P[0, 0] + self.P[1, 1])) / self._size(self.x)
+
+    def predict(self):
+        """Advances the track by one frame."""
+        size = self._size(self.x)
+        q = np.concatenate([np.full(4, self.POSITION_NOISE * size),
+                            np.full(4, self.VELOCITY_NOISE * size)]) ** 2
+        self.x = self._F @ self.x
+        self.P = self._F @ self.P @ self._F.T + np.diag(q)
+        self.frames_since_update += 1
+        self.detection = None
+
+    def update(self, box, label, score):
+        """
+        Corrects the track with a matched detection.
+
+        Args:
+            box (numpy.ndarray): Detected box.
+            label (str): Class label.
+            score (float): Detection confidence.
+        """
+        r = np.diag(np.full(4, self.POSITION_NOISE * self._size(self.x)) ** 2)
+        s = self._H @ self.P @ self._H.T + r
+        gain = self.P @ self._H.T @ np.linalg.inv(s)
+        self.x = self.x + gain @ (self._to_measurement(box) - self._H @ self.x)
+        self.P = (np.eye(8) - gain @ self._H) @ self.P
+        self.detection = np.asarray(box, np.float32)
+        self.label = label
+        self.score = score
+        self.hits += 1
+        self.misses = 0
+        self.frames_since_update = 0
+
+
+class Tracker:
+    """
+    IoU/Kalman multi-object tracker for one camera.
+
+    The detector runs every `detect_interval` frames, or earlier when a track
+    becomes uncertain (its predicted position drifted by more than
+    `UNCERTAINTY_LIMIT` of its size). In between, `propagate()` moves the
+    tracks with their Kalman filters, which costs next to nothing compared to
+    a forward pass.
+
+    Detections are matched greedily to the predicted tracks of the same label
+    by IoU. A track that is not detected `MAX_MISSES` times in a row is dropped.
+    On a detected frame a track reports the box of its detection; the Kalman
+    estimate only stands in on the frames in between (`reported_box`). Track
+    ids come from the process-wide `TRACK_IDS`.
+
+    Attributes:
+        IOU_THRESHOLD (float): Minimal IoU between a track and its detection.
+        UNCERTAINTY_LIMIT (float): Uncertainty that forces a detector run.
+        MAX_MISSES (int): Detector runs a track may be missed before it is dropped.
+        PERSIST_IOU (float): IoU below which a moved track counts as changed,
+            see `consume_changes()`.
+        HEARTBEAT_INTERVAL (float): Seconds after which unchanged tracks are
+            reported again, so the records of a static scene stay recent.
+    """
+    IOU_THRESHOLD = 0.3
+    UNCERTAINTY_LIMIT = 0.25
+    MAX_MISSES = 2
+    PERSIST_IOU = 0.8
+    HEARTBEAT_INTERVAL = 30.0
+
+    def __init__(self, detect_interval=1, track_ids=TRACK_IDS):
+        """
+        Initializes a tracker without tracks.
+
+        Args:
+            detect_interval (int): Run the detector at least every this many frames.
+            track_ids (TrackIds): Source of the track ids.
+        """
+        self.detect_interval = max(1, int(detect_interval))
+        self.tracks = []
+        # The first frame always goes through the detector
+        self.frames_since_detection = self.detect_interval
+        self.track_ids = track_ids
+        self._persisted = None
+        self._persisted_at = None
+
+    def needs_detection(self):
+        """
+        Checks whether the next frame must go through the detector.
+
+        Returns:
+            bool: True if the detection interval elapsed or a track is uncertain.
+        """
+        if self.frames_since_detection + 1 >= self.detect_interval:
+            return True
+        return any(track.uncertainty > self.UNCERTAINTY_LIMIT for track in self.active_tracks())
+
+    def active_tracks(self):
+        """Tracks that were found by the last detector run."""
+        return [track for track in self.tracks if track.misses == 0]
+
+    def update(self, boxes, labels, scores):
+        """
+        Advances the tracks to a detected frame and matches them with the detections.
+
+        Args:
+            boxes (numpy.ndarray): Nx4 detected boxes.
+            labels (list): Label strings.
+            scores (numpy.ndarray): Detection confidences.
+
+        Returns:
+            list: Active tracks after the update.
+        """
+        boxes = np.asarray(boxes, np.float32).reshape(-1, 4)
+        for track in self.tracks:
+            track.predict()
+        self.frames_since_detection = 0
+
+        iou = box_iou(np.array([track.box for track in self.tracks]).reshape(-1, 4), boxes)
+        for i, track in enumerate(self.tracks):
+            for j, label in enumerate(labels):
+                if track.label != label:
+                    iou[i, j] = 0.0
+
+        matched_tracks, matched_detections = set(), set()
+        # Greedy matching, best overlaps first
+        for flat in np.argsort(-iou, axis=None):
+            i, j = np.unravel_index(flat, iou.shape)
+            if iou[i, j] < self.IOU_THRESHOLD:
+                break
+            if i in matched_tracks or j in matched_detections:
+                continue
+            self.tracks[i].update(boxes[j], labels[j], float(scores[j]))
+            matched_tracks.add(i)
+            matched_detections.add(j)
+
+        for i, track in enumerate(self.tracks):
+            if i not in matched_tracks:
+                track.misses += 1
+        self.tracks = [track for track in self.tracks if track.misses < self.MAX_MISSES]
+
+        for j, (box, label) in enumerate(zip(boxes, labels)):
+            if j not in matched_detections:
+                self.tracks.append(KalmanBoxTrack(self.track_ids.next(), box, label,
+                                                  float(scores[j])))
+        return self.active_tracks()
+
+    def propagate(self):
+        """
+        Advances the tracks to a frame that was not run through the detector.
+
+        Returns:
+            list: Active tracks with their predicted boxes.
+        """
+        for track in self.tracks:
+            track.predict()
+        self.frames_since_detection += 1
+        return self.active_tracks()
+
+    def consume_changes(self):
+        """
+        Checks whether the active tracks changed since the last call that
+        returned True: a track appeared or disappeared, changed its label or
+        moved (IoU with its last reported box below `PERSIST_IOU`). Present
+        tracks are also reported as a heartbeat once `HEARTBEAT_INTERVAL`
+        seconds passed since then, even if nothing changed.
+
+        Returns:
+            bool: True if the tracks changed or a heartbeat is due (the current
+                state is remembered).
+        """
+        now = monotonic()
+        current = {track.track_id: (track.label, track.reported_box)
+                   for track in self.active_tracks()}
+        previous = self._persisted
+        changed = previous is None or current.keys() != previous.keys() or any(
+            label != previous[track_id][0] or
+            box_iou(box[None], previous[track_id][1][None])[0, 0] < self.PERSIST_IOU
+            for track_id, (label, box) in current.items()
+        )
+        if not changed and current and now - self._persisted_at >= self.HEARTBEAT_INTERVAL:
+            changed = True
+        if changed:
+            self._persisted = current
+            self._persisted_at = now
+        return changed
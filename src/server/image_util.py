@@ -1,9 +1,6 @@
 import base64
-from io import BytesIO
 import cv2
-import torch
-from torchvision.utils import draw_bounding_boxes
-from torchvision.transforms.functional import to_pil_image
+from utils.box_renderer import get_renderer
 from .models import ObjectPhoto
 
 def show_boxes(
@@ -35,7 +32,6 @@ def show_boxes(
     image = cv2.imread(photo_paths[0])
     if image is None:
         raise FileNotFoundError(f"Изображение не найдено: {photo_paths[0]}")
-    image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
     h, w, _ = image.shape
 
     for box in coord_list:
@@ -44,23 +40,16 @@ def show_boxes(
         assert 0 <= y_min < y_max <= h, f"Некорректные Y-координаты: {box}"
 
 
-    image_tensor = torch.from_numpy(image).permute(2, 0, 1).contiguous()
-    boxes_tensor = torch.tensor(coord_list, dtype=torch.float32)
+    # cv2.imread gives BGR, so red is (0, 0, 255) here
+    get_renderer(color=(0, 0, 255), thickness=4, font_height=20).draw(image, coord_list, names)
 
-    boxed_img = draw_bounding_boxes(
-        image_tensor,
-        boxes=boxes_tensor,
-        labels=names,
-        colors="red",
-        width=4,
-        font_size=20
-    )
+    ok, encoded = cv2.imencode(".jpg", image)
+    if not ok:
+        raise ValueError("Не удалось закодировать изображение в JPEG.")
+    encoded = encoded.tobytes()
+    with open(output_path, "wb") as f:
+        f.write(encoded)
 
-    boxed_img_pil = to_pil_image(boxed_img)
-    boxed_img_pil.save(output_path)
-
-    buffered = BytesIO()
-    boxed_img_pil.save(buffered, format="JPEG")
-    img_str = base64.b64encode(buffered.getvalue())
+    img_str = base64.b64encode(encoded)
 
     return ObjectPhoto(height=h, width=w, image=img_str)
@@ -1,5 +1,6 @@
 import json
 import os
+from datetime import datetime
 from typing import Any, Dict, Optional
 import logging
 
@@ -15,6 +16,7 @@ from pydantic_core import from_json
 
 from database.DatabaseManager import DatabaseManager
 from server.image_util import show_boxes
+from model.cascade import request_heavy_pass
 
 # Initialize the FastAPI app
 app = FastAPI()
@@ -22,6 +24,10 @@ app = FastAPI()
 # Global variable to hold the database connection
 db_conn = None
 
+# Objects not recorded for this many seconds trigger a heavy detection pass;
+# present objects are recorded at least every Tracker.HEARTBEAT_INTERVAL seconds
+RECENT_OBJECT_SECONDS = 60
+
 # Set up logging for the application
 setup_logger(__name__)
 
@@ -77,6 +83,22 @@ def check_rcv_type(x: Dict[str, Any], rcv: Receiver) -> bool:
     return x["receiver"] == rcv
 
 
+def is_recent(time: str) -> bool:
+    """
+    Check if an object record is younger than RECENT_OBJECT_SECONDS.
+
+    Args:
+        time (str): The Time of the record.
+
+    Returns:
+        bool: True if the record is recent, False if it is old or the time cannot be parsed.
+    """
+    try:
+        return (datetime.now() - datetime.fromisoformat(time)).total_seconds() < RECENT_OBJECT_SECONDS
+    except (TypeError, ValueError):
+        return False
+
+
 @app.get("/object/{name}")
 async def get_object(name: str) -> Optional[ObjectPhoto]:
     """
@@ -91,6 +113,10 @@ async def get_object(name: str) -> Optional[ObjectPhoto]:
     logging.info(f"Requested object: {name}")
     result = db_conn.get_latest_object_by_name(name)
 
+    if result is None or not is_recent(result["Object"]["Time"]):
+        # Let the cascade look for the object with its heavy detector
+        request_heavy_pass(name)
+
     if result is None:
         logging.debug("No object found in the database.")
         return None
@@ -105,15 +131,21 @@ async def get_object(name: str) -> Optional[ObjectPhoto]:
 
 
 @app.get("/objects/")
-async def get_objects() -> Optional[ObjectPhoto]:
+async def get_objects(camera: Optional[str] = None) -> Optional[ObjectPhoto]:
     """
-    Retrieve all objects from the database and return the images with bounding boxes.
+    Retrieve the latest objects of one camera and return its image with bounding boxes.
+
+    Several cameras are recorded with the same time, but their boxes belong on
+    different images, so only the objects of one camera are returned.
+
+    Args:
+        camera (str, optional): The camera id; the camera of the latest record if omitted.
 
     Returns:
-        ObjectPhoto or None: The images with bounding boxes for all objects if found, otherwise None.
+        ObjectPhoto or None: The image with bounding boxes for all objects if found, otherwise None.
     """
-    logging.info("Requested all objects")
-    result = db_conn.get_all_objects()
+    logging.info(f"Requested all objects (camera: {camera})")
+    result = db_conn.get_all_objects(camera)
 
     if result is None:
         logging.debug("No objects found in the database.")
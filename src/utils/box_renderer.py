@@ -0,0 +1,119 @@
+# box_renderer.py
+from functools import lru_cache
+from threading import Lock
+
+import cv2
+import numpy as np
+
+import logging
+from utils.logger import setup_logger
+setup_logger(__name__)
+
+
+class BoxRenderer:
+    """
+    Draws bounding boxes and labels on uint8 frames with OpenCV.
+
+    Works on HxWx3 NumPy frames in place, without tensors or PIL. The label
+    captions (filled background with the text) are rendered once per label and
+    pasted into the frame afterwards, so drawing a frame costs a few rectangle
+    calls and array copies.
+
+    The color is given in the channel order of the frames (RGB frames in the
+    GUI path, BGR frames read by OpenCV in the HTTP path).
+    """
+
+    FONT = cv2.FONT_HERSHEY_SIMPLEX
+    TEXT_COLOR = (255, 255, 255)
+
+    def __init__(self, color=(255, 0, 0), thickness=4, font_height=30):
+        """
+        Initializes the renderer.
+
+        Args:
+            color (tuple): Box and caption color in the channel order of the frames.
+            thickness (int): Box line width in pixels.
+            font_height (int): Caption text height in pixels.
+        """
+        self.color = tuple(int(c) for c in color)
+        self.thickness = max(1, int(thickness))
+        self.font_height = max(6, int(font_height))
+        self.font_scale = cv2.getFontScaleFromHeight(self.FONT, self.font_height)
+        self.text_thickness = max(1, self.font_height // 15)
+        self._captions = {}
+        self._lock = Lock()
+
+    def caption(self, label):
+        """
+        Returns the cached caption image of a label, rendering it on first use.
+
+        Args:
+            label (str): Label text.
+
+        Returns:
+            numpy.ndarray: hxwx3 uint8 caption.
+        """
+        patch = self._captions.get(label)
+        if patch is None:
+            (w, h), baseline = cv2.getTextSize(label, self.FONT, self.font_scale, self.text_thickness)
+            pad = max(2, self.font_height // 6)
+            patch = np.empty((h + baseline + 2 * pad, w + 2 * pad, 3), np.uint8)
+            patch[:] = self.color
+            cv2.putText(patch, label, (pad, pad + h), self.FONT, self.font_scale,
+                        self.TEXT_COLOR, self.text_thickness, cv2.LINE_AA)
+            with self._lock:
+                patch = self._captions.setdefault(label, patch)
+        return patch
+
+    def draw(self, image, boxes, labels):
+        """
+        Draws boxes with their labels on the image in place.
+
+        Captions sit above the box, or inside it at the top when there is no
+        room above; they are cropped at the image border.
+
+        Args:
+            image (numpy.ndarray): HxWx3 uint8 contiguous frame, modified in place.
+            boxes: Nx4 (x_min, y_min, x_max, y_max) boxes (array, tensor or list).
+            labels (list): Label strings.
+
+        Returns:
+            numpy.ndarray: The image.
+        """
+        h, w = image.shape[:2]
+        boxes = np.asarray(boxes, np.float32).reshape(-1, 4).round().astype(np.int32)
+        for (x_min, y_min, x_max, y_max), label in zip(boxes, labels):
+            cv2.rectangle(image, (int(x_min), int(y_min)), (int(x_max), int(y_max)),
+                          self.color, self.thickness)
+
+            patch = self.caption(str(label))
+            ph, pw = patch.shape[:2]
+            top = y_min - ph if y_min - ph >= 0 else max(y_min, 0)
+            left = min(max(x_min, 0), w - 1)
+            bottom, right = min(top + ph, h), min(left + pw, w)
+            if bottom > top and right > left:
+                image[top:bottom, left:right] = patch[:bottom - top, :right - left]
+        return image
+
+    def clear(self):
+        """Drops the cached captions."""
+        with self._lock:
+            self._captions.clear()
+
+
+@lru_cache(maxsize=None)
+def get_renderer(color=(255, 0, 0), thickness=4, font_height=30):
+    """
+    Returns the process-wide renderer for a style, so captions are rendered
+    once for the GUI and the HTTP server alike.
+
+    Args:
+        color (tuple): Box and caption color in the channel order of the frames.
+        thickness (int): Box line width in pixels.
+        font_height (int): Caption text height in pixels.
+
+    Returns:
+        BoxRenderer: The shared renderer.
+    """
+    logging.debug(f"Created box renderer {color}, {thickness} px, font {font_height} px")
+    return BoxRenderer(color, thickness, font_height)
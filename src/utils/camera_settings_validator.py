@@ -1,3 +1,4 @@
+import os
 import re
 from typing import Tuple, Dict
 
@@ -10,6 +11,9 @@ class CameraSettingsValidator:
         - validate_port: Checks the validity of a port number.
         - validate_rtsp_url: Validates the RTSP URL format.
         - validate_login: Validates login credentials (allows empty values).
+        - validate_source_type: Checks the frame source type.
+        - validate_source_path: Validates the path of an offline source.
+        - validate_source_pacing: Checks the pacing of an offline source.
         - update_rtsp_from_fields: Generates RTSP URL from individual field values.
         - update_fields_from_rtsp: Parses RTSP URL into individual field values.
     """
@@ -102,6 +106,54 @@ class CameraSettingsValidator:
         """
         return True, ""
 
+    def validate_source_type(self, source_type: str) -> Tuple[bool, str]:
+        """
+        Validates the frame source type.
+
+        Args:
+            source_type: One of "rtsp", "video", "images" or "synthetic".
+
+        Returns:
+            Tuple[bool, str]: (is_valid, error_message)
+        """
+        if str(source_type).lower() not in ("rtsp", "video", "images", "synthetic"):
+            return False, "Source type must be rtsp, video, images or synthetic."
+
+        return True, ""
+
+    def validate_source_path(self, path: str) -> Tuple[bool, str]:
+        """
+        Validates the path of a video file or an image directory.
+
+        Args:
+            path: The path string to validate.
+
+        Returns:
+            Tuple[bool, str]: (is_valid, error_message)
+        """
+        if not path:
+            return False, "Source path cannot be empty."
+
+        if not os.path.exists(path):
+            return False, f"Source path does not exist: {path}"
+
+        return True, ""
+
+    def validate_source_pacing(self, pacing: str) -> Tuple[bool, str]:
+        """
+        Validates the pacing of an offline source.
+
+        Args:
+            pacing: "fast" or "realtime".
+
+        Returns:
+            Tuple[bool, str]: (is_valid, error_message)
+        """
+        if str(pacing).lower() not in ("fast", "realtime"):
+            return False, "Source pacing must be fast or realtime."
+
+        return True, ""
+
     def update_rtsp_from_fields(self, fields: Dict[str, str]) -> Dict[str, str]:
         """
         Generates RTSP URL from individual field values while preserving the existing path.
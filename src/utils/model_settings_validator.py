@@ -1,3 +1,4 @@
+import os
 import re
 from typing import Tuple
 
@@ -72,4 +73,415 @@ class ModelSettingsValidator:
                 return False, "Threshold must be between 0 and 1."
             return True, ""
         except ValueError:
-            return False, "Threshold must be a number."
\ No newline at end of file
+            return False, "Threshold must be a number."
+
+    def validate_analysis_width(self, width: str) -> Tuple[bool, str]:
+        """
+        Validates the capture-side analysis width (empty or 0 disables downscaling).
+
+        Args:
+            width (str): Maximum width of the analysed frame in pixels.
+
+        Returns:
+            Tuple[bool, str]: A tuple where the first element is True if valid,
+                              False otherwise, and the second element is the error message.
+        """
+        if not width:
+            return True, ""
+
+        try:
+            width_num = int(width)
+            if width_num != 0 and not 64 <= width_num <= 7680:
+                return False, "Analysis width must be 0 or between 64 and 7680."
+            return True, ""
+        except ValueError:
+            return False, "Analysis width must be an integer."
+
+    def validate_crop(self, crop: str) -> Tuple[bool, str]:
+        """
+        Validates the crop rectangle (empty disables cropping).
+
+        Args:
+            crop (str): Rectangle in the format 'x,y,width,height'.
+
+        Returns:
+            Tuple[bool, str]: A tuple where the first element is True if valid,
+                              False otherwise, and the second element is the error message.
+        """
+        if not crop:
+            return True, ""
+
+        if not re.match(r'^\s*\d+\s*,\s*\d+\s*,\s*\d+\s*,\s*\d+\s*$', crop):
+            return False, "Crop must be in the format 'x,y,width,height'. Example: 0,0,1280,720"
+
+        _, _, width, height = (int(v) for v in crop.split(","))
+        if width == 0 or height == 0:
+            return False, "Crop width and height must be positive."
+
+        return True, ""
+
+    def validate_convert_on_consume(self, value: str) -> Tuple[bool, str]:
+        """
+        Validates the convert-on-consume flag.
+
+        Args:
+            value (str): 'true' or 'false'.
+
+        Returns:
+            Tuple[bool, str]: A tuple where the first element is True if valid,
+                              False otherwise, and the second element is the error message.
+        """
+        if str(value).strip().lower() not in ("", "true", "false", "1", "0"):
+            return False, "Convert on consume must be 'true' or 'false'."
+        return True, ""
+
+    def validate_motion_sensitivity(self, sensitivity: str) -> Tuple[bool, str]:
+        """
+        Validates the motion gate sensitivity (empty or 0 disables the gate).
+
+        Args:
+            sensitivity (str): Sensitivity value as a string.
+
+        Returns:
+            Tuple[bool, str]: A tuple where the first element is True if valid,
+                              False otherwise, and the second element is the error message.
+        """
+        if not sensitivity:
+            return True, ""
+
+        try:
+            sensitivity_num = float(sensitivity)
+            if not 0 <= sensitivity_num <= 1:
+                return False, "Motion sensitivity must be between 0 and 1."
+            return True, ""
+        except ValueError:
+            return False, "Motion sensitivity must be a number."
+
+    def validate_motion_refresh_interval(self, interval: str) -> Tuple[bool, str]:
+        """
+        Validates the forced refresh interval of the motion gate.
+
+        Args:
+            interval (str): Interval in seconds as a string.
+
+        Returns:
+            Tuple[bool, str]: A tuple where the first element is True if valid,
+                              False otherwise, and the second element is the error message.
+        """
+        if not interval:
+            return True, ""
+
+        try:
+            interval_num = float(interval)
+            if interval_num <= 0:
+                return False, "Motion refresh interval must be a positive number."
+            return True, ""
+        except ValueError:
+            return False, "Motion refresh interval must be a number."
+
+    def validate_capture_mode(self, mode: str) -> Tuple[bool, str]:
+        """
+        Validates the capture mode ('read' decodes every frame, 'grab' decodes on demand).
+
+        Args:
+            mode (str): Capture mode as a string.
+
+        Returns:
+            Tuple[bool, str]: A tuple where the first element is True if valid,
+                              False otherwise, and the second element is the error message.
+        """
+        if mode and mode.strip().lower() not in ("read", "grab"):
+            return False, "Capture mode must be 'read' or 'grab'."
+        return True, ""
+
+    def validate_batch_size(self, batch_size: str) -> Tuple[bool, str]:
+        """
+        Validates the number of frames per forward pass of batched inference.
+
+        Args:
+            batch_size (str): Batch size as a string.
+
+        Returns:
+            Tuple[bool, str]: A tuple where the first element is True if valid,
+                              False otherwise, and the second element is the error message.
+        """
+        if not batch_size:
+            return True, ""
+
+        try:
+            batch_size_num = int(batch_size)
+            if not 1 <= batch_size_num <= 64:
+                return False, "Batch size must be between 1 and 64."
+            return True, ""
+        except ValueError:
+            return False, "Batch size must be an integer."
+
+    def validate_backend(self, backend: str) -> Tuple[bool, str]:
+        """
+        Validates the inference backend name.
+
+        Args:
+            backend (str): 'eager', 'torchscript', 'onnxruntime' or 'opencv'.
+
+        Returns:
+            Tuple[bool, str]: A tuple where the first element is True if valid,
+                              False otherwise, and the second element is the error message.
+        """
+        if backend and backend.strip().lower() not in ("eager", "torchscript", "onnxruntime", "opencv"):
+            return False, "Backend must be 'eager', 'torchscript', 'onnxruntime' or 'opencv'."
+        return True, ""
+
+    def validate_precision(self, precision: str) -> Tuple[bool, str]:
+        """
+        Validates the numeric precision of the detector.
+
+        Args:
+            precision (str): 'fp32', 'int8' or 'bf16'.
+
+        Returns:
+            Tuple[bool, str]: A tuple where the first element is True if valid,
+                              False otherwise, and the second element is the error message.
+        """
+        if precision and precision.strip().lower() not in ("fp32", "int8", "bf16"):
+            return False, "Precision must be 'fp32', 'int8' or 'bf16'."
+        return True, ""
+
+    def validate_calibration_dir(self, path: str) -> Tuple[bool, str]:
+        """
+        Validates the directory (or video file) with INT8 calibration frames.
+
+        Args:
+            path (str): Path as a string; empty is allowed unless precision is 'int8'.
+
+        Returns:
+            Tuple[bool, str]: A tuple where the first element is True if valid,
+                              False otherwise, and the second element is the error message.
+        """
+        if path and not os.path.exists(path):
+            return False, f"Calibration path does not exist: {path}"
+        return True, ""
+
+    def validate_pipeline(self, value: str) -> Tuple[bool, str]:
+        """
+        Validates the flag that runs processing as overlapping pipeline stages.
+
+        Args:
+            value (str): 'true' or 'false'.
+
+        Returns:
+            Tuple[bool, str]: A tuple where the first element is True if valid,
+                              False otherwise, and the second element is the error message.
+        """
+        if str(value).strip().lower() not in ("", "true", "false", "1", "0"):
+            return False, "Pipeline must be 'true' or 'false'."
+        return True, ""
+
+    def validate_capture_process(self, value: str) -> Tuple[bool, str]:
+        """
+        Validates the flag that moves capture and decoding into a separate process.
+
+        Args:
+            value (str): 'true' or 'false'.
+
+        Returns:
+            Tuple[bool, str]: A tuple where the first element is True if valid,
+                              False otherwise, and the second element is the error message.
+        """
+        if str(value).strip().lower() not in ("", "true", "false", "1", "0"):
+            return False, "Capture process must be 'true' or 'false'."
+        return True, ""
+
+    def validate_min_fps(self, fps: str) -> Tuple[bool, str]:
+        """
+        Validates the lowest analysis rate of the adaptive rate scheduler.
+
+        Args:
+            fps (str): Frames per second as a string; empty means 1.
+
+        Returns:
+            Tuple[bool, str]: A tuple where the first element is True if valid,
+                              False otherwise, and the second element is the error message.
+        """
+        if not fps:
+            return True, ""
+
+        try:
+            if float(fps) <= 0:
+                return False, "Minimal FPS must be a positive number."
+            return True, ""
+        except ValueError:
+            return False, "Minimal FPS must be a number."
+
+    def validate_max_fps(self, fps: str) -> Tuple[bool, str]:
+        """
+        Validates the highest analysis rate of the adaptive rate scheduler.
+
+        Args:
+            fps (str): Frames per second as a string; empty means the "fps" setting.
+
+        Returns:
+            Tuple[bool, str]: A tuple where the first element is True if valid,
+                              False otherwise, and the second element is the error message.
+        """
+        if not fps:
+            return True, ""
+
+        try:
+            if float(fps) <= 0:
+                return False, "Maximal FPS must be a positive number."
+            return True, ""
+        except ValueError:
+            return False, "Maximal FPS must be a number."
+
+    def validate_detect_interval(self, interval: str) -> Tuple[bool, str]:
+        """
+        Validates the number of frames between detector runs (tracks are propagated in between).
+
+        Args:
+            interval (str): Interval in frames as a string; empty means every frame.
+
+        Returns:
+            Tuple[bool, str]: A tuple where the first element is True if valid,
+                              False otherwise, and the second element is the error message.
+        """
+        if not interval:
+            return True, ""
+
+        try:
+            interval_num = int(interval)
+            if not 1 <= interval_num <= 100:
+                return False, "Detection interval must be between 1 and 100 frames."
+            return True, ""
+        except ValueError:
+            return False, "Detection interval must be an integer."
+
+    def validate_cascade(self, value: str) -> Tuple[bool, str]:
+        """
+        Validates the flag that runs a heavy detector occasionally next to the always-on one.
+
+        Args:
+            value (str): 'true' or 'false'.
+
+        Returns:
+            Tuple[bool, str]: A tuple where the first element is True if valid,
+                              False otherwise, and the second element is the error message.
+        """
+        if str(value).strip().lower() not in ("", "true", "false", "1", "0"):
+            return False, "Cascade must be 'true' or 'false'."
+        return True, ""
+
+    def validate_heavy_model(self, model: str) -> Tuple[bool, str]:
+        """
+        Validates the name of the heavy detector of the cascade.
+
+        Args:
+            model (str): 'fasterrcnn_mobilenet', 'fasterrcnn_resnet50' or 'retinanet_resnet50'.
+
+        Returns:
+            Tuple[bool, str]: A tuple where the first element is True if valid,
+                              False otherwise, and the second element is the error message.
+        """
+        if model and model.strip().lower() not in ("fasterrcnn_mobilenet", "fasterrcnn_resnet50",
+                                                   "retinanet_resnet50"):
+            return False, ("Heavy model must be 'fasterrcnn_mobilenet', 'fasterrcnn_resnet50' "
+                           "or 'retinanet_resnet50'.")
+        return True, ""
+
+    def validate_heavy_duty_cycle(self, duty_cycle: str) -> Tuple[bool, str]:
+        """
+        Validates the share of time the heavy detector may run.
+
+        Args:
+            duty_cycle (str): Share as a string; empty means the default of 0.1.
+
+        Returns:
+            Tuple[bool, str]: A tuple where the first element is True if valid,
+                              False otherwise, and the second element is the error message.
+        """
+        if not duty_cycle:
+            return True, ""
+
+        try:
+            duty_cycle_num = float(duty_cycle)
+            if not 0.01 <= duty_cycle_num <= 1:
+                return False, "Heavy duty cycle must be between 0.01 and 1."
+            return True, ""
+        except ValueError:
+            return False, "Heavy duty cycle must be a number."
+
+    def validate_heavy_interval(self, interval: str) -> Tuple[bool, str]:
+        """
+        Validates the seconds between periodic heavy detector passes of a camera.
+
+        Args:
+            interval (str): Interval in seconds as a string; empty means the default of 300.
+
+        Returns:
+            Tuple[bool, str]: A tuple where the first element is True if valid,
+                              False otherwise, and the second element is the error message.
+        """
+        if not interval:
+            return True, ""
+
+        try:
+            interval_num = float(interval)
+            if not 1 <= interval_num <= 86400:
+                return False, "Heavy detector interval must be between 1 and 86400 seconds."
+            return True, ""
+        except ValueError:
+            return False, "Heavy detector interval must be a number."
+
+    def validate_model_arch(self, arch: str) -> Tuple[bool, str]:
+        """
+        Validates the detector architecture.
+
+        Args:
+            arch (str): 'ssdlite320', 'fasterrcnn_mobilenet_320', 'fasterrcnn_mobilenet' or
+                'auto' (the most accurate one within the latency budget).
+
+        Returns:
+            Tuple[bool, str]: A tuple where the first element is True if valid,
+                              False otherwise, and the second element is the error message.
+        """
+        if arch and arch.strip().lower() not in ("ssdlite320", "fasterrcnn_mobilenet_320",
+                                                 "fasterrcnn_mobilenet", "auto"):
+            return False, ("Model architecture must be 'ssdlite320', 'fasterrcnn_mobilenet_320', "
+                           "'fasterrcnn_mobilenet' or 'auto'.")
+        return True, ""
+
+    def validate_latency_budget_ms(self, budget: str) -> Tuple[bool, str]:
+        """
+        Validates the per-frame latency budget of the automatic architecture selection.
+
+        Args:
+            budget (str): Budget in milliseconds as a string; empty means the default of 100.
+
+        Returns:
+            Tuple[bool, str]: A tuple where the first element is True if valid,
+                              False otherwise, and the second element is the error message.
+        """
+        if not budget:
+            return True, ""
+
+        try:
+            budget_num = float(budget)
+            if not 1 <= budget_num <= 10000:
+                return False, "Latency budget must be between 1 and 10000 ms."
+            return True, ""
+        except ValueError:
+            return False, "Latency budget must be a number."
+
+    def validate_calibration_clip(self, path: str) -> Tuple[bool, str]:
+        """
+        Validates the video file or image directory the architectures are benchmarked on.
+
+        Args:
+            path (str): Path as a string; empty means synthetic frames.
+
+        Returns:
+            Tuple[bool, str]: A tuple where the first element is True if valid,
+                              False otherwise, and the second element is the error message.
+        """
+        if path and not os.path.exists(path):
+            return False, f"Calibration clip does not exist: {path}"
+        return True, ""
@@ -0,0 +1,23 @@
+# qimage.py
+import numpy as np
+from PySide6.QtGui import QImage
+
+
+def numpy_to_qimage(image):
+    """
+    Wraps an RGB uint8 frame in a QImage without copying the pixels.
+
+    The QImage keeps a reference to the array: PySide6 releases it only when
+    the last implicitly shared copy of the image is destroyed, including the
+    copies queued signals deliver to the GUI thread. The array must not be
+    modified once it is wrapped.
+
+    Args:
+        image (numpy.ndarray): HxWx3 uint8 RGB frame.
+
+    Returns:
+        QImage: RGB888 image sharing the array's memory.
+    """
+    image = np.ascontiguousarray(image)
+    h, w = image.shape[:2]
+    return QImage(image, w, h, image.strides[0], QImage.Format_RGB888)
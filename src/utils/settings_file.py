@@ -0,0 +1,32 @@
+# settings_file.py
+import json
+import os
+from pathlib import Path
+
+
+def merge_settings_file(path, settings):
+    """
+    Writes settings into a JSON file, keeping the settings the file already
+    holds that are not exposed in the UI (e.g. cameras, source_type,
+    analysis_width, crop).
+
+    A missing or unreadable file is treated as empty.
+
+    Args:
+        path (Path or str): The JSON settings file.
+        settings (dict): The settings to save; they replace existing values.
+    """
+    path = Path(path)
+    os.makedirs(path.parent, exist_ok=True)
+
+    merged = {}
+    if path.exists():
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                merged = json.load(f)
+        except (OSError, ValueError):
+            merged = {}
+    merged.update(settings)
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(merged, f, ensure_ascii=False, indent=4)
@@ -0,0 +1,11 @@
+# conftest.py
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# The modules import each other relative to src/, as when running src/main.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+# setup_logger() writes to ./logs, keep the log files out of the repository
+os.chdir(tempfile.mkdtemp(prefix="camera-tests-"))
@@ -0,0 +1,62 @@
+# test_annotated_frame.py
+import numpy as np
+
+from model import model_manager
+from model.model_manager import AnnotatedFrame, ModelManager
+from model.model_runner import FullFrame
+
+
+class CountingRenderer:
+    def __init__(self):
+        self.calls = 0
+
+    def draw(self, image, boxes, labels):
+        self.calls += 1
+        image[:] = 255
+        return image
+
+
+def make_frame(monkeypatch, boxes):
+    renderer = CountingRenderer()
+    monkeypatch.setattr(model_manager, "get_renderer", lambda **style: renderer)
+    bgr = np.zeros((40, 60, 3), np.uint8)
+    bgr[..., 0] = 10
+    frame = AnnotatedFrame(FullFrame(bgr), boxes, ["person"] * len(boxes))
+    return frame, renderer
+
+
+def test_annotation_drawn_once_on_request(monkeypatch):
+    frame, renderer = make_frame(monkeypatch, np.array([[5.0, 5.0, 20.0, 20.0]]))
+    assert renderer.calls == 0
+
+    original = frame.original()
+    assert renderer.calls == 0
+    annotated = frame.annotated()
+    assert frame.annotated() is annotated
+    assert renderer.calls == 1
+
+    # The original frame is not drawn on and is converted to RGB
+    assert original.pixelColor(0, 0).blue() == 10
+    assert annotated.pixelColor(0, 0).blue() == 255
+
+
+def test_no_boxes_reuse_original(monkeypatch):
+    frame, renderer = make_frame(monkeypatch, np.zeros((0, 4), np.float32))
+    assert frame.annotated() is frame.original()
+    assert renderer.calls == 0
+
+
+def test_annotation_only_while_model_view_shown(monkeypatch, tmp_path):
+    frame, renderer = make_frame(monkeypatch, np.array([[5.0, 5.0, 20.0, 20.0]]))
+    manager = ModelManager(settings_dir=tmp_path, connect=False)
+    manager._runners = {"0": None}
+    manager.images["0"] = frame
+
+    original, annotated = manager.get_images()
+    assert original is not None and annotated is None
+    assert renderer.calls == 0
+
+    manager.set_model_view(True)
+    assert manager.get_images()[1] is not None
+    assert renderer.calls == 1
+    manager._runners = {}
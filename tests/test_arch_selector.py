@@ -0,0 +1,54 @@
+# test_arch_selector.py
+from model import arch_selector
+from model.arch_selector import pick_architecture, resolve_architecture, select_architecture
+from model.architectures import DEFAULT_ARCHITECTURE
+
+MEASUREMENTS = {
+    "ssdlite320": {"ms_per_frame": 20.0, "box_map": 21.3},
+    "fasterrcnn_mobilenet_320": {"ms_per_frame": 60.0, "box_map": 22.8},
+    "fasterrcnn_mobilenet": {"ms_per_frame": 250.0, "box_map": 32.8},
+}
+
+
+def test_most_accurate_architecture_within_budget():
+    assert pick_architecture(MEASUREMENTS, 100.0) == "fasterrcnn_mobilenet_320"
+    assert pick_architecture(MEASUREMENTS, 250.0) == "fasterrcnn_mobilenet"
+    assert pick_architecture(MEASUREMENTS, 59.9) == "ssdlite320"
+
+
+def test_fastest_architecture_when_nothing_fits():
+    assert pick_architecture(MEASUREMENTS, 5.0) == "ssdlite320"
+
+
+def test_default_architecture_without_measurements():
+    assert pick_architecture({}, 100.0) == DEFAULT_ARCHITECTURE
+
+
+def test_fixed_architecture_is_kept(tmp_path):
+    settings = {"model_arch": "ssdlite320"}
+    assert resolve_architecture(settings, tmp_path / "cache.json") is settings
+
+
+def test_measurements_are_cached(tmp_path, monkeypatch):
+    calls = []
+
+    def benchmark(name, settings, frames):
+        calls.append(name)
+        return MEASUREMENTS.get(name, {"ms_per_frame": 500.0, "box_map": 0.0})
+
+    monkeypatch.setattr(arch_selector, "benchmark_architecture", benchmark)
+    monkeypatch.setattr(arch_selector, "BENCHMARK_FRAMES", 1)
+    cache_path = tmp_path / "cache.json"
+    settings = {"latency_budget_ms": 100.0}
+
+    assert select_architecture(settings, cache_path) == "fasterrcnn_mobilenet_320"
+    assert cache_path.exists()
+    benchmarked = len(calls)
+    arch_selector._measurements.clear()
+    assert select_architecture(settings, cache_path) == "fasterrcnn_mobilenet_320"
+    assert len(calls) == benchmarked
+
+
+def test_selection_falls_back_to_default(tmp_path):
+    settings = {"model_arch": "auto", "calibration_clip": str(tmp_path / "missing.mp4")}
+    assert resolve_architecture(settings, tmp_path / "cache.json")["model_arch"] == DEFAULT_ARCHITECTURE
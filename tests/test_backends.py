@@ -0,0 +1,66 @@
+# test_backends.py
+import json
+
+import pytest
+import torch
+from torchvision.models.detection import ssdlite320_mobilenet_v3_large
+
+from model import backends
+from model.backends import SSDCore, create_backend, ensure_export, stamp_path
+
+
+@pytest.fixture(scope="module")
+def core():
+    torch.manual_seed(0)
+    model = ssdlite320_mobilenet_v3_large(weights=None, weights_backbone=None).eval()
+    return SSDCore(model).eval()
+
+
+def images():
+    torch.manual_seed(1)
+    return torch.randn(2, 3, 320, 320)
+
+
+def check_matches_eager(backend, core):
+    with torch.no_grad():
+        expected = core(images())
+        outputs = backend.run(images())
+    for output, reference in zip(outputs, expected):
+        assert torch.allclose(output, reference, atol=1e-4)
+
+
+def test_torchscript_backend_matches_eager(core, tmp_path):
+    backend = create_backend("torchscript", core, tmp_path, model_name="test")
+    check_matches_eager(backend, core)
+    assert (tmp_path / "test_320x320.torchscript.pt").exists()
+
+
+@pytest.mark.parametrize("name", ["onnxruntime", "opencv"])
+def test_onnx_backends_match_eager(core, tmp_path, name):
+    pytest.importorskip("onnx")
+    if name == "onnxruntime":
+        pytest.importorskip("onnxruntime")
+    check_matches_eager(create_backend(name, core, tmp_path, model_name="test"), core)
+
+
+def test_export_is_reused_until_the_stamp_changes(core, tmp_path, monkeypatch):
+    exports = []
+
+    def export(core, path, image_size):
+        exports.append(path)
+        path.write_bytes(b"model")
+
+    path = tmp_path / "model.pt"
+    ensure_export(core, path, (320, 320), export)
+    ensure_export(core, path, (320, 320), export)
+    assert len(exports) == 1
+    assert json.loads(stamp_path(path).read_text())["export_version"] == backends.EXPORT_VERSION
+
+    monkeypatch.setattr(backends, "EXPORT_VERSION", backends.EXPORT_VERSION + 1)
+    ensure_export(core, path, (320, 320), export)
+    assert len(exports) == 2
+
+
+def test_unknown_backend(core):
+    with pytest.raises(ValueError):
+        create_backend("tensorrt", core)
@@ -0,0 +1,59 @@
+# test_box_renderer.py
+import numpy as np
+import torch
+
+from utils.box_renderer import BoxRenderer, get_renderer
+
+COLOR = (255, 0, 0)
+
+
+def test_draws_box_and_caption_in_place():
+    renderer = BoxRenderer(COLOR, thickness=2, font_height=12)
+    image = np.zeros((200, 200, 3), np.uint8)
+    result = renderer.draw(image, [[50, 80, 150, 180]], ["person"])
+
+    assert result is image
+    assert (image[130, 50] == COLOR).all()
+    assert (image[180, 100] == COLOR).all()
+    # The caption sits above the box
+    patch = renderer.caption("person")
+    ph, pw = patch.shape[:2]
+    assert (image[80 - ph:80, 50:50 + pw] == patch).all()
+    # Nothing is drawn inside the box
+    assert not image[100:160, 70:130].any()
+
+
+def test_caption_inside_box_at_top_border():
+    renderer = BoxRenderer(COLOR, thickness=1, font_height=12)
+    image = np.zeros((100, 100, 3), np.uint8)
+    renderer.draw(image, torch.tensor([[10.0, 0.0, 90.0, 90.0]]), ["car"])
+    patch = renderer.caption("car")
+    ph, pw = patch.shape[:2]
+    assert (image[0:ph, 10:10 + pw] == patch).all()
+
+
+def test_caption_cropped_at_image_border():
+    renderer = BoxRenderer(COLOR, thickness=1, font_height=20)
+    image = np.zeros((60, 40, 3), np.uint8)
+    renderer.draw(image, [[30, 40, 39, 59]], ["bicycle"])
+    patch = renderer.caption("bicycle")
+    ph = patch.shape[0]
+    assert (image[40 - ph:40, 30:40] == patch[:, :10]).all()
+
+
+def test_no_boxes_leaves_frame_unchanged():
+    image = np.zeros((50, 50, 3), np.uint8)
+    BoxRenderer().draw(image, np.zeros((0, 4), np.float32), [])
+    assert not image.any()
+
+
+def test_captions_are_rendered_once():
+    renderer = BoxRenderer(font_height=12)
+    assert renderer.caption("dog") is renderer.caption("dog")
+    renderer.clear()
+    assert renderer.caption("dog") is not None
+
+
+def test_renderer_shared_per_style():
+    assert get_renderer((0, 255, 0), 3, 20) is get_renderer((0, 255, 0), 3, 20)
+    assert get_renderer((0, 255, 0), 3, 20) is not get_renderer((0, 0, 255), 3, 20)
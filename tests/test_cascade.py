@@ -0,0 +1,150 @@
+# test_cascade.py
+from time import sleep
+
+import numpy as np
+import pytest
+import torch
+
+from model import cascade as cascade_module
+from model.cascade import Cascade, HeavyPassRequests, merge_detections
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeHeavy:
+    def __init__(self, clock, cost=1.0):
+        self.clock = clock
+        self.cost = cost
+        self.frames = []
+        self.fail = False
+
+    def predict(self, frames):
+        self.clock.now += self.cost
+        if self.fail:
+            raise RuntimeError("out of memory")
+        self.frames.append(len(frames))
+        return [(torch.zeros(0, 4), [], torch.zeros(0)) for _ in frames]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cascade_module, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def make_cascade(clock):
+    cascades = []
+
+    def make(cost=1.0, **settings):
+        cascade = Cascade(dict({"heavy_duty_cycle": 0.25, "heavy_interval": 300.0}, **settings),
+                          requests=HeavyPassRequests())
+        cascade.detector = FakeHeavy(clock, cost)
+        cascades.append(cascade)
+        return cascade
+
+    yield make
+    for cascade in cascades:
+        cascade.stop()
+
+
+def frame(value):
+    return np.full((48, 64, 3), value, np.uint8)
+
+
+def submit(cascade, camera_ids, frames):
+    """Submits the frames and waits for the pass they started, if any."""
+    passes, failures = cascade.passes, cascade.failures
+    cascade.submit(camera_ids, frames)
+    for _ in range(500):
+        if not cascade._busy:
+            break
+        sleep(0.01)
+    assert not cascade._busy
+    return cascade.passes > passes or cascade.failures > failures
+
+
+def test_passes_on_new_and_changed_scenes(make_cascade, clock):
+    cascade = make_cascade()
+    assert submit(cascade, ["0"], [frame(0)])
+    assert cascade.take_results("0") is not None
+    assert cascade.take_results("0") is None
+
+    clock.now += 100.0
+    assert not submit(cascade, ["0"], [frame(5)])
+    assert submit(cascade, ["0"], [frame(100)])
+
+
+def test_unchanged_scene_is_refreshed(make_cascade, clock):
+    cascade = make_cascade(heavy_interval=60.0)
+    submit(cascade, ["0"], [frame(0)])
+    clock.now += 58.0
+    assert not submit(cascade, ["0"], [frame(0)])
+    clock.now += 2.0
+    assert submit(cascade, ["0"], [frame(0)])
+
+
+def test_passes_stay_within_the_duty_cycle(make_cascade, clock):
+    # A 1 s pass at a 25% duty cycle is followed by 3 s without passes
+    cascade = make_cascade(cost=1.0, heavy_duty_cycle=0.25)
+    submit(cascade, ["0"], [frame(0)])
+    clock.now += 2.9
+    assert not submit(cascade, ["0"], [frame(200)])
+    clock.now += 0.1
+    assert submit(cascade, ["0"], [frame(200)])
+
+
+def test_request_covers_every_camera(make_cascade, clock):
+    cascade = make_cascade()
+    submit(cascade, ["0", "1"], [frame(0), frame(0)])
+    assert cascade.detector.frames == [2]
+
+    clock.now += 100.0
+    cascade.requests.request("cat")
+    assert submit(cascade, ["0"], [frame(0)])
+    clock.now += 100.0
+    # Camera 1 was not in the batch that consumed the request
+    assert submit(cascade, ["1"], [frame(0)])
+    clock.now += 100.0
+    assert not submit(cascade, ["0", "1"], [frame(0), frame(0)])
+
+
+def test_failures_back_off(make_cascade, clock):
+    cascade = make_cascade(cost=0.0)
+    cascade.detector.fail = True
+    assert submit(cascade, ["0"], [frame(0)])
+    assert cascade.get_stats()["failures"] == 1 and cascade.error_msg
+
+    for backoff in (Cascade.ERROR_BACKOFF, 2 * Cascade.ERROR_BACKOFF):
+        clock.now += backoff - 0.1
+        assert not submit(cascade, ["0"], [frame(0)])
+        clock.now += 0.1
+        assert submit(cascade, ["0"], [frame(0)])
+
+    cascade.detector.fail = False
+    clock.now += 4 * Cascade.ERROR_BACKOFF
+    assert submit(cascade, ["0"], [frame(0)])
+    assert cascade.failures == 0 and cascade.error_msg is None
+
+
+def test_merge_keeps_one_box_per_object():
+    primary = (torch.tensor([[0.0, 0.0, 10.0, 10.0]]), ["car"], torch.tensor([0.6]))
+    secondary = (torch.tensor([[1.0, 0.0, 11.0, 10.0], [0.0, 0.0, 10.0, 10.0]]),
+                 ["car", "person"], torch.tensor([0.9, 0.8]))
+    boxes, labels, scores = merge_detections(primary, secondary)
+    assert labels == ["car", "person"]
+    assert torch.equal(scores, torch.tensor([0.9, 0.8]))
+    assert torch.equal(boxes[0], secondary[0][0])
+
+
+def test_merge_without_detections():
+    empty = (torch.zeros(0, 4), [], torch.zeros(0))
+    boxes, labels, scores = merge_detections(empty, empty)
+    assert boxes.shape == (0, 4) and labels == []
@@ -0,0 +1,39 @@
+# test_database.py
+from database.DatabaseManager import DatabaseManager
+from database.tables.ObjectItem import ObjectItem
+
+
+def make_db(tmp_path, rows, track_ids=None):
+    db = DatabaseManager(str(tmp_path / "database.db"))
+    for (name, time, cam_id), track_id in zip(rows, track_ids or [None] * len(rows)):
+        db.push_objects(ObjectItem(None, name, time, "[0, 0, 1, 1]", 0, "photo.jpg", cam_id,
+                                   track_id))
+    db.connect_and_push()
+    return db
+
+
+def names(objects):
+    return sorted(item["Object"]["Name"] for item in objects)
+
+
+def test_all_objects_of_the_latest_frame_of_one_camera(tmp_path):
+    # Cameras of one batch share the timestamp
+    db = make_db(tmp_path, [
+        ("car", "2024-01-01 10:00:00", "0"),
+        ("person", "2024-01-01 10:00:01", "0"),
+        ("dog", "2024-01-01 10:00:01", "0"),
+        ("truck", "2024-01-01 10:00:01", "1"),
+    ])
+    assert {item["Object"]["CamID"] for item in db.get_all_objects()} in ({"0"}, {"1"})
+    assert names(db.get_all_objects("0")) == ["dog", "person"]
+    assert names(db.get_all_objects("1")) == ["truck"]
+    assert db.get_all_objects("2") is None
+
+
+def test_max_track_id(tmp_path):
+    db = make_db(tmp_path, [])
+    assert db.get_max_track_id() is None
+    db = make_db(tmp_path, [("car", "2024-01-01 10:00:00", "0"),
+                            ("dog", "2024-01-01 10:00:00", "0"),
+                            ("cat", "2024-01-01 10:00:01", "1")], [7, None, 3])
+    assert db.get_max_track_id() == 7
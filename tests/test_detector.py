@@ -0,0 +1,96 @@
+# test_detector.py
+import pytest
+import torch
+from torchvision.models.detection import (
+    fasterrcnn_mobilenet_v3_large_320_fpn,
+    ssdlite320_mobilenet_v3_large
+)
+
+from model.detector import Detector
+
+SETTINGS = {"score_thresh": 0.01, "nms_thresh": 0.5, "detections_per_image": 20}
+
+
+def reference_model(builder, architecture):
+    # Random weights, the pretrained ones cannot be downloaded in the tests
+    torch.manual_seed(0)
+    model = builder(weights=None, weights_backbone=None).eval()
+    if architecture == "ssdlite320":
+        model.score_thresh = SETTINGS["score_thresh"]
+        model.nms_thresh = SETTINGS["nms_thresh"]
+        model.detections_per_img = SETTINGS["detections_per_image"]
+    else:
+        model.roi_heads.score_thresh = SETTINGS["score_thresh"]
+        model.roi_heads.nms_thresh = SETTINGS["nms_thresh"]
+        model.roi_heads.detections_per_img = SETTINGS["detections_per_image"]
+    return model
+
+
+@pytest.mark.parametrize("architecture, builder", [
+    ("ssdlite320", ssdlite320_mobilenet_v3_large),
+    ("fasterrcnn_mobilenet_320", fasterrcnn_mobilenet_v3_large_320_fpn),
+])
+def test_predict_matches_torchvision(architecture, builder):
+    model = reference_model(builder, architecture)
+    detector = Detector(dict(SETTINGS, model_arch=architecture), model=model)
+
+    torch.manual_seed(1)
+    images = [torch.rand(3, 240, 320), torch.rand(3, 300, 200)]
+    with torch.no_grad():
+        expected = model(images)
+    results = detector.predict(images, with_scores=True)
+
+    assert len(results) == len(expected)
+    for (boxes, labels, scores), reference in zip(results, expected):
+        assert torch.allclose(boxes, reference["boxes"], atol=1e-3)
+        assert torch.allclose(scores, reference["scores"], atol=1e-5)
+        assert labels == [detector.categories[i] for i in reference["labels"]]
+
+
+def test_batched_predictions_match_single_frames():
+    model = reference_model(ssdlite320_mobilenet_v3_large, "ssdlite320")
+    detector = Detector(dict(SETTINGS, model_arch="ssdlite320"), model=model)
+
+    torch.manual_seed(2)
+    images = [torch.rand(3, 240, 320) for _ in range(3)]
+    batched = detector.predict(images, with_scores=True)
+    for image, (boxes, labels, scores) in zip(images, batched):
+        single_boxes, single_labels, single_scores = detector.predict([image], with_scores=True)[0]
+        assert torch.allclose(boxes, single_boxes, atol=1e-3)
+        assert torch.allclose(scores, single_scores, atol=1e-5)
+        assert labels == single_labels
+
+
+def test_torchscript_backend_predicts_like_eager(tmp_path):
+    model = reference_model(ssdlite320_mobilenet_v3_large, "ssdlite320")
+    eager = Detector(dict(SETTINGS, model_arch="ssdlite320"), model=model)
+    scripted = Detector(dict(SETTINGS, model_arch="ssdlite320", backend="torchscript",
+                             backend_dir=str(tmp_path)), model=model)
+
+    torch.manual_seed(3)
+    images = [torch.rand(3, 240, 320)]
+    (boxes, labels, scores), = eager.predict(images, with_scores=True)
+    (script_boxes, script_labels, script_scores), = scripted.predict(images, with_scores=True)
+    assert torch.allclose(boxes, script_boxes, atol=1e-3)
+    assert torch.allclose(scores, script_scores, atol=1e-4)
+    assert labels == script_labels
+
+
+def test_thresholds_change_without_rebuilding_the_model():
+    model = reference_model(ssdlite320_mobilenet_v3_large, "ssdlite320")
+    detector = Detector(dict(SETTINGS, model_arch="ssdlite320"), model=model)
+    backend = detector.backend
+
+    torch.manual_seed(4)
+    images = [torch.rand(3, 240, 320)]
+    boxes, labels, scores = detector.predict(images, with_scores=True)[0]
+    assert len(scores) == SETTINGS["detections_per_image"]
+
+    assert not detector.set_thresholds(SETTINGS)
+    assert detector.set_thresholds(dict(SETTINGS, detections_per_image=5))
+    assert len(detector.predict(images)[0][0]) == 5
+    # The scores of the random weights are all close to 1 / 91
+    assert detector.set_thresholds(dict(SETTINGS, score_thresh=0.5))
+    assert len(detector.predict(images)[0][0]) == 0
+    assert detector.backend is backend
+    assert detector.matches(dict(SETTINGS, model_arch="ssdlite320", score_thresh=0.9))
@@ -0,0 +1,81 @@
+# test_frame_buffer.py
+import numpy as np
+
+from model.frame_buffer import FrameRingBuffer
+
+SHAPE = (4, 6, 3)
+
+
+def publish(buffer, value, meta=None):
+    index, frame = buffer.acquire(SHAPE)
+    assert frame is not None
+    frame[:] = value
+    return buffer.commit(index, meta)
+
+
+def test_borrow_latest_without_frames():
+    assert FrameRingBuffer().borrow_latest() is None
+
+
+def test_borrow_latest_returns_newest_frame():
+    buffer = FrameRingBuffer(3)
+    publish(buffer, 1)
+    seq = publish(buffer, 2, meta="second")
+
+    with buffer.borrow_latest() as lease:
+        assert lease.seq == seq == buffer.latest_seq
+        assert lease.meta == "second"
+        assert (lease.frame == 2).all()
+        assert not lease.frame.flags.writeable
+
+
+def test_leased_slot_is_not_reused():
+    buffer = FrameRingBuffer(3)
+    publish(buffer, 1)
+    lease = buffer.borrow_latest()
+
+    # Every further frame lands in another slot while the lease is held
+    for value in range(2, 10):
+        publish(buffer, value)
+    assert (lease.frame == 1).all()
+    assert buffer.get_stats()["leased"] == 1
+
+    lease.release()
+    lease.release()
+    assert lease.frame is None
+    assert buffer.get_stats()["leased"] == 0
+
+
+def test_acquire_fails_when_every_slot_is_in_use():
+    buffer = FrameRingBuffer(2)
+    publish(buffer, 1)
+    lease = buffer.borrow_latest()
+    publish(buffer, 2)
+
+    # One slot is leased, the other one holds the latest frame
+    assert buffer.acquire(SHAPE) == (None, None)
+    assert buffer.get_stats()["busy"] == 1
+
+    lease.release()
+    index, frame = buffer.acquire(SHAPE)
+    assert frame is not None
+
+
+def test_overwritten_counts_frames_nobody_borrowed():
+    buffer = FrameRingBuffer(3)
+    publish(buffer, 1)
+    publish(buffer, 2)
+    publish(buffer, 3)
+    assert buffer.get_stats()["overwritten"] == 2
+
+    buffer.borrow_latest().release()
+    publish(buffer, 4)
+    assert buffer.get_stats()["overwritten"] == 2
+
+
+def test_slot_is_reallocated_on_shape_change():
+    buffer = FrameRingBuffer(2)
+    index, frame = buffer.acquire(SHAPE)
+    buffer.commit(index)
+    index, frame = buffer.acquire((8, 8, 3))
+    assert frame.shape == (8, 8, 3) and frame.dtype == np.uint8
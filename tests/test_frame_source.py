@@ -0,0 +1,70 @@
+# test_frame_source.py
+from time import monotonic
+
+import cv2
+import numpy as np
+import pytest
+
+from model.frame_source import ImageDirectorySource, SyntheticSource, open_frame_source
+
+
+def test_synthetic_frames_depend_only_on_seed_and_index():
+    first = open_frame_source({"source_type": "synthetic", "source_pacing": "fast",
+                               "source_resolution": (160, 120), "source_seed": 3})
+    second = SyntheticSource(160, 120, seed=3)
+    frames = [first.read()[1] for _ in range(3)]
+    assert frames[0].shape == (120, 160, 3)
+    assert not np.array_equal(frames[0], frames[1])
+    for frame in frames:
+        assert np.array_equal(second.read()[1], frame)
+
+
+def test_synthetic_source_decodes_into_the_given_buffer():
+    source = SyntheticSource(160, 120)
+    buffer = np.empty((120, 160, 3), np.uint8)
+    ok, frame = source.read(buffer)
+    assert ok and frame is buffer
+    source.release()
+    assert not source.isOpened()
+    assert source.read() == (False, None)
+
+
+def write_images(path, count):
+    frames = []
+    for i in range(count):
+        frame = np.full((24, 32, 3), 40 * i, np.uint8)
+        cv2.imwrite(str(path / f"{i:03d}.png"), frame)
+        frames.append(frame)
+    # Not an image, ignored
+    (path / "notes.txt").write_text("")
+    return frames
+
+
+def test_image_directory_is_replayed_in_name_order(tmp_path):
+    frames = write_images(tmp_path, 3)
+    source = ImageDirectorySource(str(tmp_path), loop=True)
+    for expected in frames + frames[:1]:
+        ok, frame = source.read()
+        assert ok and np.array_equal(frame, expected)
+
+
+def test_image_directory_without_loop_ends(tmp_path):
+    write_images(tmp_path, 2)
+    source = ImageDirectorySource(str(tmp_path), loop=False)
+    assert source.read()[0] and source.read()[0]
+    assert not source.isOpened()
+    assert source.read() == (False, None)
+
+
+def test_realtime_pacing_follows_the_frame_rate():
+    source = SyntheticSource(32, 24, fps=50.0, pacing="realtime")
+    started = monotonic()
+    for _ in range(6):
+        source.read()
+    # Frame 0 is due at once, frame 5 after 5 / 50 s
+    assert monotonic() - started >= 0.09
+
+
+def test_unknown_source_type():
+    with pytest.raises(ValueError):
+        open_frame_source({"source_type": "usb"})
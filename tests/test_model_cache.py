@@ -0,0 +1,51 @@
+# test_model_cache.py
+import pytest
+import torch
+from torchvision.models.detection import ssdlite320_mobilenet_v3_large
+
+from model.architectures import get_architecture
+from model.model_cache import DetectorCache
+
+SETTINGS = {"model_arch": "ssdlite320", "score_thresh": 0.5, "nms_thresh": 0.5,
+            "detections_per_image": 10}
+
+
+@pytest.fixture
+def cache():
+    cache = DetectorCache(max_entries=2)
+    # Random weights, the pretrained ones cannot be downloaded in the tests
+    torch.manual_seed(0)
+    model = ssdlite320_mobilenet_v3_large(weights=None, weights_backbone=None).eval()
+    cache._models[get_architecture("ssdlite320").model_name] = model
+    return cache
+
+
+def test_recreated_runners_get_the_cached_detector(cache):
+    detector = cache.get(SETTINGS)
+    assert cache.get(dict(SETTINGS, score_thresh=0.7)) is detector
+    assert detector.score_thresh == 0.7
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert SETTINGS in cache and len(cache) == 1
+
+
+def test_variants_share_the_network(cache, tmp_path):
+    eager = cache.get(SETTINGS)
+    scripted = cache.get(dict(SETTINGS, backend="torchscript", backend_dir=str(tmp_path)))
+    assert scripted is not eager
+    assert scripted.model is eager.model
+    assert cache.misses == 2
+
+
+def test_least_recently_used_detector_is_evicted(cache, tmp_path):
+    first = dict(SETTINGS)
+    second = dict(SETTINGS, precision="bf16")
+    third = dict(SETTINGS, backend="torchscript", backend_dir=str(tmp_path))
+    cache.get(first)
+    cache.get(second)
+    cache.get(first)
+    cache.get(third)
+    assert first in cache and third in cache and second not in cache
+    assert cache.evictions == 1
+
+    cache.clear()
+    assert len(cache) == 0 and not cache._models
@@ -0,0 +1,223 @@
+# test_model_runner.py
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+import torch
+
+from model.model_runner import FullFrame, ModelRunner
+
+
+def analysis_frame(frame, **settings):
+    return ModelRunner._analysis_frame(SimpleNamespace(settings=settings), frame)
+
+
+def test_analysis_frame_identity():
+    frame = np.zeros((720, 1280, 3), np.uint8)
+    analysis, transform = analysis_frame(frame)
+    assert analysis is frame
+    assert ModelRunner._is_identity(transform)
+
+
+def test_boxes_map_back_through_crop_and_downscale():
+    frame = np.zeros((1080, 1920, 3), np.uint8)
+    analysis, transform = analysis_frame(frame, crop=(200, 100, 1280, 720), analysis_width=640)
+    assert analysis.shape[:2] == (360, 640)
+    assert transform == pytest.approx((0.5, 0.5, 200, 100))
+
+    boxes = torch.tensor([[0.0, 0.0, 640.0, 360.0], [10.0, 20.0, 30.0, 40.0]])
+    full = ModelRunner._to_full_frame(boxes, transform)
+    expected = torch.tensor([[200.0, 100.0, 1480.0, 820.0], [220.0, 140.0, 260.0, 180.0]])
+    assert torch.allclose(full, expected)
+
+
+def test_crop_is_clamped_to_the_frame():
+    frame = np.zeros((480, 640, 3), np.uint8)
+    analysis, transform = analysis_frame(frame, crop=(600, 400, 200, 200))
+    assert analysis.shape[:2] == (80, 40)
+    assert transform == (1.0, 1.0, 600, 400)
+
+
+def test_full_frame_converts_once_and_releases_the_lease():
+    released = []
+    bgr = np.zeros((2, 2, 3), np.uint8)
+    bgr[..., 0] = 255
+    frame = FullFrame(bgr=bgr, lease=SimpleNamespace(release=lambda: released.append(True)))
+
+    rgb = frame.rgb()
+    assert (rgb[..., 2] == 255).all() and (rgb[..., 0] == 0).all()
+    assert frame.rgb() is rgb
+    assert released == [True]
+
+
+@pytest.fixture
+def make_runner(monkeypatch):
+    # Frames are fed by the tests instead of a capture thread
+    monkeypatch.setattr(ModelRunner, "_capture_frames", lambda self: None)
+    runners = []
+
+    def make(detector=None, frames_held=1, **settings):
+        runner = ModelRunner(settings, detector=detector or object(), frames_held=frames_held)
+        runners.append(runner)
+        return runner
+
+    yield make
+    for runner in runners:
+        runner.release()
+
+
+def random_frame(shape=(120, 160, 3), seed=0):
+    return np.random.default_rng(seed).integers(0, 256, shape, np.uint8)
+
+
+def feed(runner, frame):
+    def read(image=None):
+        if image is None or image.shape != frame.shape:
+            return True, frame.copy()
+        np.copyto(image, frame)
+        return True, image
+
+    assert runner._decode_into_buffer(read)
+    runner.frame_ready.set()
+
+
+@pytest.mark.parametrize("settings", [{}, {"crop": (10, 20, 100, 80), "analysis_width": 50}])
+def test_convert_on_consume_matches_converting_in_the_capture_thread(make_runner, settings):
+    frame = random_frame()
+    samples = []
+    for convert_on_consume in (False, True):
+        runner = make_runner(convert_on_consume=convert_on_consume, **settings)
+        feed(runner, frame)
+        samples.append(runner.grab_frame(timeout=0, use_motion_gate=False))
+
+    (rgb, transform, full), (rgb_consumed, transform_consumed, full_consumed) = samples
+    assert transform == transform_consumed
+    assert np.array_equal(rgb, rgb_consumed)
+    expected = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    assert np.array_equal(full.rgb(), expected)
+    assert np.array_equal(full_consumed.rgb(), expected)
+
+
+def test_convert_on_consume_keeps_the_decoded_bgr_frame(make_runner):
+    frame = random_frame()
+    runner = make_runner(convert_on_consume=True)
+    feed(runner, frame)
+    with runner.frame_buffer.borrow_latest() as lease:
+        assert np.array_equal(lease.frame, frame)
+
+
+@pytest.mark.parametrize("convert_on_consume", [False, True])
+def test_full_frame_of_a_crop_at_the_origin(make_runner, convert_on_consume):
+    frame = random_frame()
+    runner = make_runner(crop=(0, 0, 80, 60), convert_on_consume=convert_on_consume)
+    feed(runner, frame)
+    rgb, transform, full = runner.grab_frame(timeout=0, use_motion_gate=False)
+    assert rgb.shape[:2] == (60, 80)
+    assert np.array_equal(full.rgb(), cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+
+
+def test_grab_frame_returns_a_view_into_the_leased_slot(make_runner):
+    runner = make_runner()
+    feed(runner, random_frame())
+    rgb, transform, full = runner.grab_frame(timeout=0, use_motion_gate=False)
+
+    assert not rgb.flags.writeable
+    assert any(np.shares_memory(rgb, slot) for slot in runner.frame_buffer._buffers if slot is not None)
+    assert runner.frame_buffer.get_stats()["leased"] == 1
+    full.rgb()
+    assert runner.frame_buffer.get_stats()["leased"] == 0
+
+
+def test_full_frames_reuse_the_decode_buffers_of_their_slots(make_runner):
+    runner = make_runner(crop=(0, 0, 80, 60))
+    seen = set()
+    for seed in range(20):
+        frame = random_frame(seed=seed)
+        feed(runner, frame)
+        rgb, transform, full = runner.grab_frame(timeout=0, use_motion_gate=False)
+        assert np.array_equal(full.rgb(), cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        seen.update(id(buf) for buf in runner._raw_buffers + [runner._decode_buffer] if buf is not None)
+    # One decode buffer per slot plus the one being decoded into
+    assert len(seen) <= runner.frame_buffer.slots + 1
+
+
+def test_static_frames_are_not_handed_to_the_detector(make_runner):
+    runner = make_runner(motion_sensitivity=0.5)
+    frame = random_frame()
+    feed(runner, frame)
+    assert runner.grab_frame(timeout=0) is not None
+    feed(runner, frame)
+    assert runner.grab_frame(timeout=0) is ModelRunner.UNCHANGED
+    assert runner.get_frame_stats()["static"] == 1
+    # The rejected frame does not stay pinned
+    assert runner.frame_buffer.get_stats()["leased"] == 0
+
+
+class FakeCapture:
+    def __init__(self, frame):
+        self.frame = frame
+        self.grabbed = 0
+        self.retrieved = 0
+
+    def grab(self):
+        self.grabbed += 1
+        return True
+
+    def retrieve(self, image=None):
+        self.retrieved += 1
+        return True, self.frame.copy()
+
+    def release(self):
+        pass
+
+
+def test_grab_mode_decodes_only_requested_frames(make_runner):
+    runner = make_runner(capture_mode="grab")
+    runner.capture = FakeCapture(random_frame())
+
+    assert runner._grab_and_retrieve() == (True, False)
+    assert runner._grab_and_retrieve() == (True, False)
+    runner.request_frame()
+    assert runner._grab_and_retrieve() == (True, True)
+    assert runner._grab_and_retrieve() == (True, False)
+    assert (runner.capture.grabbed, runner.capture.retrieved) == (4, 1)
+    assert runner.frames_grabbed == 4
+
+
+class RecordingDetector:
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, images, with_scores=False):
+        self.batches.append(len(images))
+        return [(image, [], None) for image in images]
+
+
+@pytest.mark.parametrize("settings, batch_size, batches", [
+    ({}, None, [4, 4, 2]),
+    ({"batch_size": 3}, None, [3, 3, 3, 1]),
+    ({"batch_size": 3}, 5, [5, 5]),
+])
+def test_predict_batch_splits_the_frames(make_runner, settings, batch_size, batches):
+    detector = RecordingDetector()
+    runner = make_runner(detector=detector, **settings)
+    frames = [random_frame(seed=seed) for seed in range(10)]
+    results = runner.predict_batch(frames, batch_size)
+    assert detector.batches == batches
+    assert all(result[0] is frame for result, frame in zip(results, frames))
+
+
+def test_held_frames_do_not_starve_the_capture_thread(make_runner):
+    # E.g. the frames queued between the pipeline stages
+    runner = make_runner(frames_held=6)
+    held = []
+    for seed in range(6):
+        feed(runner, random_frame(seed=seed))
+        held.append(runner.grab_frame(timeout=0, use_motion_gate=False))
+    feed(runner, random_frame(seed=6))
+    stats = runner.get_frame_stats()
+    assert (stats["buffer_leased"], stats["buffer_busy"]) == (6, 0)
+    assert all(np.array_equal(rgb, cv2.cvtColor(random_frame(seed=seed), cv2.COLOR_BGR2RGB))
+               for seed, (rgb, transform, full) in enumerate(held))
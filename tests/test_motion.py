@@ -0,0 +1,47 @@
+# test_motion.py
+import numpy as np
+
+from model import motion
+from model.motion import MotionGate
+
+
+def frame(value=0):
+    image = np.full((120, 160, 3), 50, np.uint8)
+    if value:
+        image[:, :value] = 200
+    return image
+
+
+def test_disabled_gate_lets_every_frame_through():
+    gate = MotionGate(sensitivity=0.0)
+    assert all(gate.has_changed(frame()) for _ in range(3))
+
+
+def test_static_scene_is_rejected_until_it_changes(monkeypatch):
+    monkeypatch.setattr(motion, "monotonic", lambda: 0.0)
+    gate = MotionGate(sensitivity=0.5)
+    assert gate.has_changed(frame())
+    assert not gate.has_changed(frame())
+    # About 2% of the image, below the 5% required at sensitivity 0.5
+    assert not gate.has_changed(frame(3))
+    assert gate.has_changed(frame(40))
+    assert not gate.has_changed(frame(40))
+
+
+def test_higher_sensitivity_reacts_to_smaller_changes(monkeypatch):
+    monkeypatch.setattr(motion, "monotonic", lambda: 0.0)
+    gate = MotionGate(sensitivity=0.95)
+    gate.has_changed(frame())
+    assert gate.has_changed(frame(3))
+
+
+def test_static_scene_is_refreshed_after_the_interval(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(motion, "monotonic", lambda: now[0])
+    gate = MotionGate(sensitivity=0.5, refresh_interval=30.0)
+    gate.has_changed(frame())
+    now[0] = 29.0
+    assert not gate.has_changed(frame())
+    now[0] = 30.0
+    assert gate.has_changed(frame())
+    assert not gate.has_changed(frame())
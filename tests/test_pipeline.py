@@ -0,0 +1,86 @@
+# test_pipeline.py
+from threading import Event
+from time import monotonic, sleep
+
+from model.pipeline import LatestQueue, Pipeline
+
+
+def test_full_queue_drops_the_oldest_item():
+    queue = LatestQueue(maxsize=2)
+    for item in range(5):
+        queue.put(item)
+    assert (len(queue), queue.dropped, queue.put_count) == (2, 3, 5)
+    assert [queue.get(timeout=0), queue.get(timeout=0)] == [3, 4]
+
+
+def test_get_times_out_on_an_empty_queue():
+    queue = LatestQueue()
+    started = monotonic()
+    assert queue.get(timeout=0.05) is None
+    assert monotonic() - started >= 0.04
+
+
+def test_clear_drops_waiting_items():
+    queue = LatestQueue(maxsize=3)
+    queue.put(1)
+    queue.put(2)
+    queue.clear()
+    assert len(queue) == 0 and queue.get(timeout=0) is None
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = monotonic() + timeout
+    while not condition() and monotonic() < deadline:
+        sleep(0.01)
+    return condition()
+
+
+def test_items_flow_through_the_stages_and_failures_are_skipped():
+    source_items = iter(range(1, 7))
+    results = []
+    done = Event()
+
+    def source():
+        item = next(source_items, None)
+        if item is None:
+            done.set()
+        return item
+
+    def check(item):
+        if item == 3:
+            raise ValueError("broken item")
+        return item * 10
+
+    pipeline = Pipeline([("source", source), ("check", check), ("sink", results.append)],
+                        queue_sizes={"check": 8, "sink": 8})
+    pipeline.start()
+    try:
+        assert done.wait(5.0)
+        assert wait_until(lambda: len(results) == 5)
+    finally:
+        pipeline.stop()
+
+    assert results == [10, 20, 40, 50, 60]
+    stats = pipeline.get_stats()
+    assert stats["check"]["errors"] == 1
+    assert stats["check"]["processed"] == 6
+    assert not pipeline.running
+
+
+def test_a_slow_stage_sees_only_the_latest_items():
+    counter = iter(range(10 ** 6))
+    seen = []
+
+    def slow(item):
+        seen.append(item)
+        sleep(0.05)
+
+    pipeline = Pipeline([("source", lambda: next(counter)), ("slow", slow)])
+    pipeline.start()
+    try:
+        assert wait_until(lambda: len(seen) >= 3)
+    finally:
+        pipeline.stop()
+
+    assert all(later - earlier > 1 for earlier, later in zip(seen, seen[1:]))
+    assert pipeline.get_stats()["slow"]["dropped"] > 0
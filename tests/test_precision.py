@@ -0,0 +1,88 @@
+# test_precision.py
+import cv2
+import numpy as np
+import pytest
+import torch
+from torch import nn
+from torchvision.models.detection import ssdlite320_mobilenet_v3_large
+
+from model.backends import SSDCore
+from model.precision import apply_precision, calibration_batches, load_calibration_batches
+
+
+@pytest.fixture(scope="module")
+def model():
+    torch.manual_seed(0)
+    return ssdlite320_mobilenet_v3_large(weights=None, weights_backbone=None).eval()
+
+
+def frames(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, (240, 320, 3), np.uint8) for _ in range(count)]
+
+
+def run(core, batch):
+    with torch.no_grad():
+        return core(batch)
+
+
+def test_calibration_frames_are_preprocessed_in_batches(model):
+    batches = calibration_batches(frames(10), model.transform, batch_size=4)
+    assert [batch.shape for batch in batches] == [(4, 3, 320, 320)] * 2 + [(2, 3, 320, 320)]
+
+
+def test_calibration_frames_from_a_directory(model, tmp_path):
+    for i, frame in enumerate(frames(3)):
+        cv2.imwrite(str(tmp_path / f"{i}.png"), frame)
+    batches = load_calibration_batches(str(tmp_path), model.transform, max_frames=2)
+    assert [batch.shape[0] for batch in batches] == [2]
+    with pytest.raises(ValueError):
+        load_calibration_batches(str(tmp_path / "missing"), model.transform)
+
+
+def test_bf16_core_keeps_fp32_outputs_and_the_original_core(model):
+    core = SSDCore(model).eval()
+    batch = calibration_batches(frames(1), model.transform)[0]
+    reduced = apply_precision(core, "bf16")
+    outputs = run(reduced, batch)
+    assert all(output.dtype == torch.float32 for output in outputs)
+    assert next(core.parameters()).dtype == torch.float32
+    for output, reference in zip(outputs, run(core, batch)):
+        assert output.shape == reference.shape
+        assert torch.allclose(output, reference, atol=0.5, rtol=0.1)
+
+
+class TinyCore(nn.Module):
+    # Quantizing the whole SSD backbone takes minutes on a small machine
+    def __init__(self):
+        super().__init__()
+        self.backbone = nn.Sequential(nn.Conv2d(3, 8, 3, padding=1), nn.ReLU(),
+                                      nn.Conv2d(8, 8, 3, stride=2))
+
+    def forward(self, images):
+        return self.backbone(images)
+
+
+def test_int8_quantizes_the_backbone_on_the_calibration_frames():
+    torch.manual_seed(0)
+    core = TinyCore().eval()
+    batches = [torch.randn(2, 3, 32, 32) for _ in range(2)]
+    quantized = apply_precision(core, "int8", lambda: batches)
+
+    def is_quantized(module):
+        return any("quantized" in type(child).__module__ for child in module.backbone.modules())
+
+    assert is_quantized(quantized) and not is_quantized(core)
+    output, reference = run(quantized, batches[0]), run(core, batches[0])
+    assert output.dtype == torch.float32
+    assert torch.allclose(output, reference, atol=0.1)
+
+
+def test_int8_without_calibration_frames_fails(model):
+    with pytest.raises(ValueError):
+        apply_precision(SSDCore(model).eval(), "int8", lambda: [])
+
+
+def test_unknown_precision(model):
+    with pytest.raises(ValueError):
+        apply_precision(SSDCore(model).eval(), "fp16")
@@ -0,0 +1,49 @@
+# test_preprocess.py
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from model.preprocess import Preprocessor
+
+MEAN = [0.485, 0.456, 0.406]
+STD = [0.229, 0.224, 0.225]
+
+
+def frames(*shapes):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, shape, np.uint8) for shape in shapes]
+
+
+def reference(frame, size):
+    image = torch.from_numpy(frame).permute(2, 0, 1).float().div(255.0)
+    if tuple(image.shape[1:]) != size:
+        image = F.interpolate(image[None], size=size, mode="bilinear", align_corners=False)[0]
+    return (image - torch.tensor(MEAN).view(3, 1, 1)) / torch.tensor(STD).view(3, 1, 1)
+
+
+def test_frames_at_model_resolution_are_only_normalized():
+    frame, = frames((32, 48, 3))
+    inputs, sizes = Preprocessor((32, 48), MEAN, STD)([frame])
+    assert sizes == [(32, 48)]
+    assert torch.allclose(inputs[0], reference(frame, (32, 48)), atol=1e-5)
+
+
+def test_frames_are_resized_like_the_model_transform():
+    batch = frames((64, 96, 3), (40, 40, 3))
+    inputs, sizes = Preprocessor((32, 48), MEAN, STD)(batch)
+    assert inputs.shape == (2, 3, 32, 48)
+    assert sizes == [(64, 96), (40, 40)]
+    for image, frame in zip(inputs, batch):
+        # The uint8 resize rounds, so allow a couple of intensity levels
+        assert (image - reference(frame, (32, 48))).abs().mean() < 2.0 / 255 / min(STD)
+
+
+def test_buffers_are_reused_per_batch_size():
+    preprocess = Preprocessor((32, 48), MEAN, STD)
+    first, _ = preprocess(frames((64, 96, 3)))
+    second, _ = preprocess(frames((64, 96, 3)))
+    pair, _ = preprocess(frames((64, 96, 3), (64, 96, 3)))
+    assert second is first
+    assert pair is not first and pair.shape[0] == 2
+    preprocess.clear()
+    assert preprocess(frames((64, 96, 3)))[0] is not first
@@ -0,0 +1,31 @@
+# test_qimage.py
+import numpy as np
+from PySide6.QtGui import QImage
+
+from utils.qimage import numpy_to_qimage
+
+
+def test_wraps_frame_without_copy():
+    frame = np.zeros((48, 64, 3), np.uint8)
+    image = numpy_to_qimage(frame)
+
+    assert (image.width(), image.height()) == (64, 48)
+    assert image.format() == QImage.Format_RGB888
+    frame[10, 20] = (1, 2, 3)
+    color = image.pixelColor(20, 10)
+    assert (color.red(), color.green(), color.blue()) == (1, 2, 3)
+
+
+def test_wraps_cropped_frame():
+    frame = np.random.default_rng(0).integers(0, 256, (60, 80, 3), np.uint8)
+    crop = frame[10:50, 5:45]
+    image = numpy_to_qimage(crop)
+
+    assert (image.width(), image.height()) == (40, 40)
+    color = image.pixelColor(7, 3)
+    assert (color.red(), color.green(), color.blue()) == tuple(crop[3, 7])
+
+
+def test_image_outlives_array_reference():
+    image = numpy_to_qimage(np.full((8, 8, 3), 200, np.uint8))
+    assert image.pixelColor(4, 4).red() == 200
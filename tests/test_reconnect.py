@@ -0,0 +1,73 @@
+# test_reconnect.py
+from threading import Event, Lock, Thread
+from time import monotonic, sleep
+
+from model import reconnect
+from model.reconnect import ReconnectSupervisor
+
+
+def test_backoff_doubles_up_to_the_maximum():
+    supervisor = ReconnectSupervisor(base_delay=0.5, max_delay=3.0, jitter=0.0)
+    delays = []
+    for failures in range(6):
+        supervisor.failures = failures
+        delays.append(supervisor.next_delay())
+    assert delays == [0.0, 0.5, 1.0, 2.0, 3.0, 3.0]
+
+
+def test_jitter_spreads_the_delay():
+    supervisor = ReconnectSupervisor(base_delay=1.0, jitter=0.2)
+    supervisor.failures = 1
+    delays = [supervisor.next_delay() for _ in range(200)]
+    assert all(0.8 <= delay <= 1.2 for delay in delays)
+    assert max(delays) - min(delays) > 0.1
+
+
+def test_backoff_is_reset_only_after_a_stable_connection(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(reconnect, "monotonic", lambda: now[0])
+    supervisor = ReconnectSupervisor(base_delay=0.0, stable_after=10.0)
+
+    assert supervisor.reconnect(lambda: True)
+    assert supervisor.failures == 1
+    now[0] += 5.0
+    supervisor.mark_healthy()
+    assert supervisor.failures == 1
+    now[0] += 5.0
+    supervisor.mark_healthy()
+    assert supervisor.failures == 0
+
+
+def test_cancel_interrupts_the_backoff_wait():
+    cancel = Event()
+    supervisor = ReconnectSupervisor(base_delay=30.0, jitter=0.0, cancel_event=cancel)
+    supervisor.failures = 1
+    attempts = []
+    Thread(target=lambda: (sleep(0.1), cancel.set()), daemon=True).start()
+
+    started = monotonic()
+    assert not supervisor.reconnect(lambda: attempts.append(True) or True)
+    assert monotonic() - started < 5.0
+    assert attempts == []
+
+
+def test_concurrent_connection_attempts_are_capped():
+    lock = Lock()
+    running = [0, 0]
+
+    def connect():
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+        sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return False
+
+    threads = [Thread(target=ReconnectSupervisor(base_delay=0.0).reconnect, args=(connect,))
+               for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert running[1] == ReconnectSupervisor.MAX_CONCURRENT_CONNECTS
@@ -0,0 +1,73 @@
+# test_scheduler.py
+import pytest
+
+from model import scheduler
+from model.scheduler import RateScheduler
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(scheduler, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def rate_scheduler(clock):
+    rate_scheduler = RateScheduler(min_fps=1.0, max_fps=20.0)
+    # The load of the test machine must not matter
+    rate_scheduler.CPU_SAMPLE_INTERVAL = float("inf")
+    rate_scheduler.cpu.load = 0.0
+    return rate_scheduler
+
+
+def settle(rate_scheduler, seconds, rounds=100):
+    for _ in range(rounds):
+        rate_scheduler.record(seconds)
+    return rate_scheduler.rate
+
+
+def test_first_iteration_is_not_delayed(rate_scheduler):
+    assert rate_scheduler.delay() == 0.0
+
+
+def test_next_analysis_is_paced_from_the_last_one(rate_scheduler, clock):
+    rate_scheduler.start()
+    clock[0] += 0.02
+    assert rate_scheduler.delay() == pytest.approx(1 / 20 - 0.02)
+    clock[0] += 0.1
+    assert rate_scheduler.delay() == 0.0
+
+
+def test_iterations_without_analysis_are_paced_too(rate_scheduler, clock):
+    rate_scheduler.start()
+    clock[0] += 1.0
+    rate_scheduler.idle()
+    assert rate_scheduler.delay() == pytest.approx(1 / 20)
+
+
+def test_rate_follows_the_processing_cost(rate_scheduler):
+    # 80% duty cycle of a 100 ms analysis
+    assert settle(rate_scheduler, 0.1) == pytest.approx(8.0, rel=0.01)
+    assert settle(rate_scheduler, 0.001) == pytest.approx(20.0, rel=0.01)
+    assert settle(rate_scheduler, 10.0) == pytest.approx(1.0, rel=0.01)
+
+
+def test_busy_machine_lowers_the_rate(rate_scheduler):
+    rate_scheduler.cpu.load = 0.9
+    # Half of the 20% headroom reserve is left
+    assert settle(rate_scheduler, 0.1) == pytest.approx(4.0, rel=0.01)
+
+
+def test_limits_are_applied_to_the_current_rate(rate_scheduler):
+    rate_scheduler.configure(2.0, 5.0)
+    assert rate_scheduler.rate == 5.0
+    rate_scheduler.configure_from({"min_fps": 10.0, "max_fps": 3.0})
+    assert (rate_scheduler.min_fps, rate_scheduler.max_fps, rate_scheduler.rate) == (10.0, 10.0, 10.0)
+
+
+def test_achieved_rate(rate_scheduler, clock):
+    for _ in range(50):
+        rate_scheduler.start()
+        clock[0] += 0.25
+    assert rate_scheduler.get_stats()["achieved_fps"] == pytest.approx(4.0)
@@ -0,0 +1,108 @@
+# test_settings_store.py
+import json
+import os
+from types import MappingProxyType
+
+import pytest
+
+from model import settings_store
+from model.settings_store import SettingsStore, freeze, thaw
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(settings_store, "monotonic", clock)
+    path = tmp_path / "settings.json"
+    path.write_text(json.dumps({"fps": 10}))
+    loads = []
+
+    def load():
+        loads.append(1)
+        return json.loads(path.read_text())
+
+    store = SettingsStore([path], load)
+    return store, path, clock, loads
+
+
+def rewrite(path, settings):
+    """Writes the file with a modification time the store cannot have seen."""
+    stat = path.stat()
+    path.write_text(settings if isinstance(settings, str) else json.dumps(settings))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_loaded_on_creation(store):
+    store, path, clock, loads = store
+    assert store.snapshot.values["fps"] == 10
+    assert store.snapshot.version == 1
+    assert len(loads) == 1
+
+
+def test_unchanged_files_are_not_parsed(store):
+    store, path, clock, loads = store
+    clock.now += 5
+    assert not store.refresh()
+    assert len(loads) == 1
+
+
+def test_changed_file_reloaded_after_poll_interval(store):
+    store, path, clock, loads = store
+    first = store.snapshot
+    rewrite(path, {"fps": 20})
+
+    clock.now += store.POLL_INTERVAL / 2
+    assert not store.refresh()
+    assert store.snapshot is first
+
+    clock.now += store.POLL_INTERVAL
+    assert store.refresh()
+    assert store.snapshot.values["fps"] == 20
+    assert store.snapshot.version == 2
+    assert store.snapshot.hash != first.hash
+
+
+def test_load_error_clears_snapshot(store):
+    store, path, clock, loads = store
+    rewrite(path, "{")
+    clock.now += 5
+    assert store.refresh()
+    assert store.snapshot is None
+    assert store.error
+
+    rewrite(path, {"fps": 10})
+    clock.now += 5
+    assert store.refresh()
+    assert store.error is None
+    assert store.snapshot.values["fps"] == 10
+
+
+def test_equal_contents_have_equal_hash(store):
+    store, path, clock, loads = store
+    first = store.snapshot
+    assert store.refresh(force=True)
+    assert store.snapshot.hash == first.hash
+    assert store.snapshot.version == first.version + 1
+
+
+def test_freeze_and_thaw():
+    settings = {"cameras": [{"crop": [0, 0, 10, 10]}], "fps": 5}
+    frozen = freeze(settings)
+
+    assert isinstance(frozen, MappingProxyType)
+    assert frozen["cameras"][0]["crop"] == (0, 0, 10, 10)
+    with pytest.raises(TypeError):
+        frozen["fps"] = 6
+
+    thawed = thaw(frozen)
+    assert thawed == settings
+    thawed["cameras"][0]["crop"][0] = 1
+    assert frozen["cameras"][0]["crop"][0] == 0
@@ -0,0 +1,54 @@
+# test_settings_validators.py
+import pytest
+
+from utils.camera_settings_validator import CameraSettingsValidator
+from utils.model_settings_validator import ModelSettingsValidator
+
+MODEL_CASES = [
+    ("validate_analysis_width", ["", "0", "64", "1280"], ["32", "8000", "wide"]),
+    ("validate_crop", ["", "0,0,1280,720", " 10, 20, 30, 40 "], ["0,0,0,720", "1,2,3", "a,b,c,d"]),
+    ("validate_convert_on_consume", ["", "true", "False", "1"], ["yes"]),
+    ("validate_motion_sensitivity", ["", "0", "0.5", "1"], ["1.5", "-0.1", "high"]),
+    ("validate_motion_refresh_interval", ["", "30"], ["0", "-1", "soon"]),
+    ("validate_capture_mode", ["", "read", "GRAB"], ["decode"]),
+    ("validate_capture_process", ["", "false", "1"], ["off"]),
+    ("validate_batch_size", ["", "1", "64"], ["0", "65", "1.5"]),
+    ("validate_backend", ["", "eager", "torchscript", "onnxruntime", "opencv"], ["tensorrt"]),
+    ("validate_precision", ["", "fp32", "int8", "bf16"], ["fp16"]),
+    ("validate_pipeline", ["", "true", "0"], ["on"]),
+    ("validate_min_fps", ["", "0.5"], ["0", "slow"]),
+    ("validate_max_fps", ["", "30"], ["-5", "fast"]),
+    ("validate_detect_interval", ["", "1", "100"], ["0", "101", "2.5"]),
+    ("validate_cascade", ["", "true"], ["maybe"]),
+    ("validate_heavy_model", ["", "fasterrcnn_mobilenet", "retinanet_resnet50"], ["yolo"]),
+    ("validate_heavy_duty_cycle", ["", "0.01", "1"], ["0", "1.5", "half"]),
+    ("validate_heavy_interval", ["", "1", "86400"], ["0.5", "86401", "hourly"]),
+    ("validate_model_arch", ["", "auto", "ssdlite320", "fasterrcnn_mobilenet_320"], ["yolo"]),
+    ("validate_latency_budget_ms", ["", "1", "10000"], ["0.5", "10001", "fast"]),
+]
+
+
+def check(validator, method, valid, invalid):
+    validate = getattr(validator, method)
+    for value in valid:
+        assert validate(value) == (True, ""), value
+    for value in invalid:
+        ok, message = validate(value)
+        assert not ok and message, value
+
+
+@pytest.mark.parametrize("method, valid, invalid", MODEL_CASES)
+def test_model_settings(method, valid, invalid):
+    check(ModelSettingsValidator(), method, valid, invalid)
+
+
+@pytest.mark.parametrize("method", ["validate_calibration_dir", "validate_calibration_clip"])
+def test_model_settings_paths(method, tmp_path):
+    check(ModelSettingsValidator(), method, ["", str(tmp_path)], [str(tmp_path / "missing")])
+
+
+def test_camera_source_settings(tmp_path):
+    validator = CameraSettingsValidator()
+    check(validator, "validate_source_type", ["rtsp", "video", "Images", "synthetic"], ["usb"])
+    check(validator, "validate_source_path", [str(tmp_path)], ["", str(tmp_path / "missing")])
+    check(validator, "validate_source_pacing", ["fast", "realtime"], ["slow"])
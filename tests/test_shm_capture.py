@@ -0,0 +1,110 @@
+# test_shm_capture.py
+import numpy as np
+import pytest
+
+from model.shm_capture import SharedFrameChannel, SharedMemoryFrameSource
+
+SHAPE = (24, 32, 3)
+SYNTHETIC = {"source_type": "synthetic", "source_pacing": "fast", "source_resolution": (64, 48),
+             # Generous, the spawned process imports numpy and OpenCV first
+             "fps": 25, "capture_timeout": 30.0, "camera_id": "test"}
+
+
+@pytest.fixture
+def channel():
+    writer = SharedFrameChannel.create(SHAPE, slots=3)
+    writer.hand_over()
+    reader = SharedFrameChannel.attach(writer.name, writer.shape, writer.slots)
+    yield writer, reader
+    writer.close()
+    reader.close()
+
+
+def test_reader_gets_the_latest_frame(channel):
+    writer, reader = channel
+    assert reader.read_latest() == (0, None, None)
+    for value in (1, 2):
+        writer.publish(np.full(SHAPE, value, np.uint8), timestamp=float(value))
+
+    buffer = np.empty(SHAPE, np.uint8)
+    seq, frame, timestamp = reader.read_latest(buffer)
+    assert (seq, timestamp) == (2, 2.0)
+    assert frame is buffer and (frame == 2).all()
+
+
+def test_writer_never_overwrites_the_latest_slot(channel):
+    writer, reader = channel
+    writer.publish(np.zeros(SHAPE, np.uint8))
+    for _ in range(10):
+        latest = int(writer._header[writer._SLOT])
+        writer.publish(np.zeros(SHAPE, np.uint8))
+        assert int(writer._header[writer._SLOT]) != latest
+
+
+def test_torn_slot_is_not_returned(channel):
+    writer, reader = channel
+    writer.publish(np.ones(SHAPE, np.uint8))
+    # A writer in the middle of overwriting the slot (odd counter)
+    writer._slot_seqs[int(writer._header[writer._SLOT])] -= 1
+    assert reader.read_latest() == (0, None, None)
+
+
+def test_reader_unlinks_the_segment():
+    writer = SharedFrameChannel.create(SHAPE)
+    writer.hand_over()
+    reader = SharedFrameChannel.attach(writer.name, writer.shape, writer.slots)
+    writer.close()
+    reader.close()
+    with pytest.raises(FileNotFoundError):
+        SharedFrameChannel.attach(writer.name, SHAPE, 3)
+
+
+def test_frames_come_from_the_capture_process():
+    source = SharedMemoryFrameSource(SYNTHETIC)
+    try:
+        assert source.isOpened(), source.error
+        assert source.grab()
+        ok, frame = source.retrieve()
+        assert ok and frame.shape == (48, 64, 3)
+        assert source.timestamp is not None
+    finally:
+        source.release()
+    assert not source.isOpened()
+
+
+def test_failed_open_is_reported():
+    source = SharedMemoryFrameSource(dict(SYNTHETIC, source_type="usb"))
+    try:
+        assert not source.isOpened()
+        assert "usb" in source.error
+    finally:
+        source.release()
+
+
+class FakeControl:
+    def __init__(self, messages):
+        self.messages = list(messages)
+
+    def poll(self, timeout=0.0):
+        return bool(self.messages)
+
+    def recv(self):
+        return self.messages.pop(0)
+
+    def close(self):
+        pass
+
+
+def test_segment_that_cannot_be_attached_is_reported():
+    source = SharedMemoryFrameSource(SYNTHETIC)
+    control = source._control
+    try:
+        gone = SharedFrameChannel.create(SHAPE)
+        gone.close()
+        source._control = FakeControl([("segment", gone.name, SHAPE, 3)])
+        source._poll_control()
+        assert not source.isOpened()
+        assert gone.name in source.error
+    finally:
+        source._control = control
+        source.release()
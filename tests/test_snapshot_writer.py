@@ -0,0 +1,110 @@
+# test_snapshot_writer.py
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from model import snapshot_writer
+from model.snapshot_writer import SnapshotWriter
+
+
+@pytest.fixture
+def writer():
+    writer = SnapshotWriter(workers=2, max_pending=8)
+    yield writer
+    writer.close()
+
+
+def solid_frame(value):
+    return np.full((24, 32, 3), value, np.uint8)
+
+
+def read_value(path):
+    return int(cv2.imread(str(path))[12, 16, 0])
+
+
+def test_encoded_once_for_all_paths(writer, tmp_path, monkeypatch):
+    encodes = []
+    imencode = cv2.imencode
+
+    def counting_imencode(*args, **kwargs):
+        encodes.append(1)
+        return imencode(*args, **kwargs)
+
+    monkeypatch.setattr(snapshot_writer.cv2, "imencode", counting_imencode)
+    paths = [tmp_path / "person" / "1.jpg", tmp_path / "car" / "2.jpg", tmp_path / "car" / "2.jpg"]
+    assert writer.submit(solid_frame(200), paths)
+    assert writer.flush(5)
+
+    assert len(encodes) == 1
+    assert all(abs(read_value(path) - 200) <= 2 for path in paths)
+    assert writer.get_stats() == {"frames_written": 1, "frames_dropped": 0,
+                                  "files_written": 2, "errors": 0}
+
+
+def test_file_replaced_by_rename(writer, tmp_path, monkeypatch):
+    target = tmp_path / "person" / "1.jpg"
+    renames = []
+    replace = snapshot_writer.os.replace
+
+    def recording_replace(src, dst):
+        # The complete image exists before it takes the target's place
+        assert cv2.imread(str(src)) is not None
+        renames.append((src, dst))
+        replace(src, dst)
+
+    monkeypatch.setattr(snapshot_writer.os, "replace", recording_replace)
+    writer.submit(solid_frame(100), [target])
+    writer.flush(5)
+
+    assert len(renames) == 1
+    src, dst = renames[0]
+    assert dst == target and src.parent == target.parent
+    assert sorted(p.name for p in target.parent.iterdir()) == ["1.jpg"]
+
+
+def test_older_frame_does_not_replace_newer(writer, tmp_path):
+    target = tmp_path / "1.jpg"
+    writer._pending += 2
+    writer._write(solid_frame(250), [target], sequence=2)
+    writer._write(solid_frame(10), [target], sequence=1)
+
+    assert read_value(target) > 200
+    assert list(tmp_path.iterdir()) == [target]
+    assert writer.get_stats()["files_written"] == 1
+
+
+def test_frames_dropped_while_workers_busy(tmp_path, monkeypatch):
+    release = threading.Event()
+    imencode = cv2.imencode
+
+    def blocking_imencode(*args, **kwargs):
+        release.wait(5)
+        return imencode(*args, **kwargs)
+
+    monkeypatch.setattr(snapshot_writer.cv2, "imencode", blocking_imencode)
+    writer = SnapshotWriter(workers=1, max_pending=2)
+    try:
+        results = [writer.submit(solid_frame(i), [tmp_path / f"{i}.jpg"]) for i in range(4)]
+        assert results == [True, True, False, False]
+        release.set()
+        assert writer.flush(5)
+        assert writer.get_stats()["frames_dropped"] == 2
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["0.jpg", "1.jpg"]
+    finally:
+        release.set()
+        writer.close()
+
+
+def test_removed_directory_recreated(writer, tmp_path):
+    target = tmp_path / "person" / "1.jpg"
+    writer.submit(solid_frame(100), [target])
+    writer.flush(5)
+    target.unlink()
+    target.parent.rmdir()
+
+    writer.submit(solid_frame(100), [target])
+    writer.flush(5)
+    assert target.exists()
+    assert writer.get_stats()["errors"] == 0
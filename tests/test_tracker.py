@@ -0,0 +1,118 @@
+# test_tracker.py
+import numpy as np
+import pytest
+
+from model import tracker as tracker_module
+from model.tracker import Tracker, TrackIds
+
+
+def boxes(*rows):
+    return np.array(rows, np.float32).reshape(-1, 4)
+
+
+def update(tracker, rows, labels=None):
+    labels = labels or ["car"] * len(rows)
+    return tracker.update(boxes(*rows), labels, np.full(len(rows), 0.9))
+
+
+def test_track_ids_continue_after_the_seed():
+    ids = TrackIds()
+    assert [ids.next(), ids.next()] == [1, 2]
+    ids.seed(41)
+    assert ids.next() == 42
+    ids.seed(None)
+    ids.seed(10)
+    assert ids.next() == 43
+
+
+def test_trackers_sharing_the_ids_never_reuse_one():
+    ids = TrackIds()
+    first, second = Tracker(track_ids=ids), Tracker(track_ids=ids)
+    a = update(first, [(0, 0, 10, 10)])
+    b = update(second, [(0, 0, 10, 10)])
+    c = update(Tracker(track_ids=ids), [(0, 0, 10, 10)])
+    assert [a[0].track_id, b[0].track_id, c[0].track_id] == [1, 2, 3]
+
+
+def test_moving_object_keeps_its_id():
+    tracker = Tracker(track_ids=TrackIds())
+    track_id = update(tracker, [(0, 0, 20, 20)])[0].track_id
+    for step in range(1, 6):
+        tracks = update(tracker, [(2 * step, 0, 20 + 2 * step, 20)])
+        assert [track.track_id for track in tracks] == [track_id]
+
+
+def test_other_label_starts_a_new_track():
+    tracker = Tracker(track_ids=TrackIds())
+    update(tracker, [(0, 0, 20, 20)])
+    tracks = update(tracker, [(0, 0, 20, 20)], ["person"])
+    assert [(track.track_id, track.label) for track in tracks] == [(2, "person")]
+
+
+def test_missed_track_is_dropped():
+    tracker = Tracker(track_ids=TrackIds())
+    update(tracker, [(0, 0, 20, 20)])
+    for _ in range(Tracker.MAX_MISSES):
+        assert update(tracker, []) == []
+    assert tracker.tracks == []
+
+
+def test_detected_frames_report_the_detected_box():
+    tracker = Tracker(track_ids=TrackIds())
+    update(tracker, [(0, 0, 20, 20)])
+    track, = update(tracker, [(4, 0, 24, 20)])
+    # The Kalman estimate lags behind the measurement
+    assert not np.allclose(track.box, (4, 0, 24, 20))
+    assert np.array_equal(track.reported_box, boxes((4, 0, 24, 20))[0])
+
+    track, = tracker.propagate()
+    assert np.array_equal(track.reported_box, track.box)
+
+
+def test_detector_runs_every_interval():
+    tracker = Tracker(detect_interval=3, track_ids=TrackIds())
+    assert tracker.needs_detection()
+    update(tracker, [(0, 0, 20, 20)])
+    for _ in range(2):
+        assert not tracker.needs_detection()
+        tracker.propagate()
+    assert tracker.needs_detection()
+
+
+def test_uncertain_track_forces_a_detection():
+    tracker = Tracker(detect_interval=100, track_ids=TrackIds())
+    update(tracker, [(0, 0, 20, 20)])
+    frames = 0
+    while not tracker.needs_detection():
+        tracker.propagate()
+        frames += 1
+    assert 0 < frames < 100
+
+
+def test_changes_and_heartbeat(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(tracker_module, "monotonic", lambda: now[0])
+    tracker = Tracker(track_ids=TrackIds())
+
+    update(tracker, [(0, 0, 20, 20)])
+    assert tracker.consume_changes()
+    update(tracker, [(1, 0, 21, 20)])
+    assert not tracker.consume_changes()
+    update(tracker, [(12, 0, 32, 20)])
+    assert tracker.consume_changes()
+
+    now[0] = Tracker.HEARTBEAT_INTERVAL - 1
+    update(tracker, [(12, 0, 32, 20)])
+    assert not tracker.consume_changes()
+    now[0] = Tracker.HEARTBEAT_INTERVAL
+    assert tracker.consume_changes()
+    assert not tracker.consume_changes()
+
+
+def test_empty_scene_has_no_heartbeat(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(tracker_module, "monotonic", lambda: now[0])
+    tracker = Tracker(track_ids=TrackIds())
+    assert tracker.consume_changes()
+    now[0] = 10 * Tracker.HEARTBEAT_INTERVAL
+    assert not tracker.consume_changes()